@@ -0,0 +1,220 @@
+"""Historical analog search over the daily archive.
+
+Every archive day is described by the standardized temperature anomalies and
+rain of the ``window`` days ending on it. A query is compared with every
+candidate day of the same season in one matrix product, and the k nearest
+analogs come back with the days that followed them.
+"""
+
+from dataclasses import dataclass, field, fields
+from datetime import date
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from backend import weather_climatology, weather_storage
+
+ANALOG_WINDOW = 7
+# Candidates end within this many calendar slots of the query day
+SEASON_WINDOW = 30
+# Days on each side pooled into the per-slot temperature normal
+NORMAL_WINDOW = 15
+FEATURE_VARIABLES = ["temperature_2m_mean", "rain_sum"]
+
+
+@dataclass
+class Analogs:
+    """The k nearest analogs of a query, closest first."""
+
+    dates: np.ndarray
+    distances: np.ndarray
+    followed: np.ndarray
+
+    def at_lead(self, lead: int) -> np.ndarray:
+        """Values ``lead`` days after each analog, shape (analog, variable)."""
+        return self.followed[:, :, lead - 1]
+
+
+@dataclass
+class AnalogIndex:
+    """Feature vectors of every archive day and the archive they came from.
+
+    ``values`` holds the raw (variable, day) archive in FEATURE_VARIABLES order,
+    so the days after an analog can be read back directly.
+    """
+
+    start: np.ndarray
+    values: np.ndarray
+    normal: np.ndarray
+    scale: np.ndarray
+    window: int
+    _features: np.ndarray | None = field(default=None, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        dates: np.ndarray,
+        values: Dict[str, np.ndarray],
+        window: int = ANALOG_WINDOW,
+    ) -> "AnalogIndex":
+        """Standardize the archive once; features are sliced from it on demand."""
+        dates = np.asarray(dates).astype("datetime64[D]")
+        stacked = np.stack(
+            [np.asarray(values[variable], dtype=np.float32) for variable in FEATURE_VARIABLES]
+        )
+        slots = weather_climatology.day_of_year_slots(dates)
+
+        temperature = stacked[0].astype(np.float64)
+        observed = ~np.isnan(temperature)
+        kernel = np.ones(2 * NORMAL_WINDOW + 1)
+
+        def pooled(per_slot: np.ndarray) -> np.ndarray:
+            padded = np.concatenate(
+                [per_slot[-NORMAL_WINDOW:], per_slot, per_slot[:NORMAL_WINDOW]]
+            )
+            return np.convolve(padded, kernel, mode="valid")
+
+        days = weather_climatology.CALENDAR_DAYS
+        totals = pooled(np.bincount(slots, np.where(observed, temperature, 0.0), minlength=days))
+        counts = pooled(np.bincount(slots, observed.astype(np.float64), minlength=days))
+        normal = totals / np.maximum(counts, 1.0)
+
+        with np.errstate(invalid="ignore"):
+            scale = np.array([
+                np.nanstd(temperature - normal[slots]),
+                np.nanstd(np.log1p(stacked[1])),
+            ])
+        return cls(
+            start=dates[0],
+            values=stacked,
+            normal=normal.astype(np.float32),
+            scale=np.maximum(np.nan_to_num(scale, nan=1.0), 1e-6).astype(np.float32),
+            window=window,
+        )
+
+    @property
+    def dates(self) -> np.ndarray:
+        """datetime64[D] date of every archive day."""
+        return self.start + np.arange(self.values.shape[1])
+
+    def _standardized(self, dates: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """(variable, day) temperature anomalies and log rain in units of their spread."""
+        slots = weather_climatology.day_of_year_slots(dates)
+        return np.stack([
+            (values[0] - self.normal[slots]) / self.scale[0],
+            np.log1p(values[1]) / self.scale[1],
+        ])
+
+    def window_feature(
+        self,
+        dates: np.ndarray,
+        values: Dict[str, np.ndarray],
+    ) -> np.ndarray:
+        """Feature vector of the last ``window`` days of a series.
+
+        The days may be newer than the index, e.g. the latest archive days.
+        """
+        dates = np.asarray(dates).astype("datetime64[D]")
+        if dates.size < self.window:
+            raise ValueError(f"A query needs {self.window} days, got {dates.size}.")
+        stacked = np.stack([
+            np.asarray(values[variable], dtype=np.float32)[-self.window:]
+            for variable in FEATURE_VARIABLES
+        ])
+        return self._standardized(dates[-self.window:], stacked).ravel()
+
+    def features(self) -> np.ndarray:
+        """Feature vector of every day with a full window behind it, shape (day, feature).
+
+        Built on first use and kept, so later queries are one matrix product.
+        """
+        if self._features is None:
+            windows = np.lib.stride_tricks.sliding_window_view(
+                self._standardized(self.dates, self.values), self.window, axis=1
+            )
+            self._features = np.ascontiguousarray(
+                windows.transpose(1, 0, 2).reshape(windows.shape[1], -1)
+            )
+        return self._features
+
+    def query(
+        self,
+        end_date: date,
+        k: int = 10,
+        horizon: int = 14,
+        season_window: int = SEASON_WINDOW,
+        feature: np.ndarray | None = None,
+    ) -> Analogs:
+        """Find the k days most like the window ending on ``end_date``.
+
+        The query is the archive window ending on ``end_date`` unless a
+        ``feature`` vector (e.g. built from a forecast) is given. Candidates
+        must end in the same season, have no missing day and be followed by
+        ``horizon`` archived days; the query window itself is excluded.
+        """
+        features = self.features()
+        end_index = (np.datetime64(end_date, "D") - self.start).astype(np.int64)
+        if feature is None:
+            if not self.window - 1 <= end_index < features.shape[0] + self.window - 1:
+                raise ValueError(
+                    f"No {self.window}-day window of the archive ends on {end_date}."
+                )
+            feature = features[end_index - self.window + 1]
+        if np.isnan(feature).any():
+            raise ValueError(f"The window ending on {end_date} has missing days.")
+
+        ends = np.arange(features.shape[0]) + self.window - 1
+        slots = weather_climatology.day_of_year_slots(self.dates[ends])
+        centre = int(weather_climatology.day_of_year_slots(np.datetime64(end_date, "D")))
+        distance = np.abs(slots - centre)
+        distance = np.minimum(distance, weather_climatology.CALENDAR_DAYS - distance)
+        candidate = (
+            (distance <= season_window)
+            & ~np.isnan(features).any(axis=1)
+            & (ends + horizon < self.values.shape[1])
+            & (np.abs(ends - end_index) > horizon)
+        )
+        candidates = np.flatnonzero(candidate)
+        if candidates.size == 0:
+            raise ValueError("No analog candidates in the archive.")
+
+        # |a - q|² = |a|² - 2 a·q + |q|², one matrix-vector product for all candidates
+        matrix = features[candidates]
+        squared = (
+            np.einsum("ij,ij->i", matrix, matrix) - 2.0 * matrix @ feature + feature @ feature
+        )
+        k = min(k, candidates.size)
+        nearest = np.argpartition(squared, k - 1)[:k]
+        nearest = nearest[np.argsort(squared[nearest])]
+
+        analog_ends = ends[candidates[nearest]]
+        following = analog_ends[:, None] + np.arange(1, horizon + 1)[None, :]
+        return Analogs(
+            dates=self.dates[analog_ends],
+            distances=np.sqrt(np.maximum(squared[nearest], 0.0)),
+            followed=self.values[:, following].transpose(1, 0, 2),
+        )
+
+    def save(self, path: Path) -> None:
+        """Persist the index to an ``.npz`` file."""
+        weather_storage.save_npz(
+            path,
+            **{
+                item.name: getattr(self, item.name)
+                for item in fields(self)
+                if not item.name.startswith("_")
+            },
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "AnalogIndex":
+        """Load an index written by save."""
+        with np.load(path) as data:
+            return cls(
+                start=data["start"],
+                values=data["values"],
+                normal=data["normal"],
+                scale=data["scale"],
+                window=int(data["window"]),
+            )
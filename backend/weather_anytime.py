@@ -0,0 +1,97 @@
+"""Deadline-aware estimates that answer fast and refine in the background."""
+
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeout
+from datetime import date
+from typing import Any, Callable, Dict
+
+from backend import weather_historic
+
+# Fidelity tiers, cheapest first; a pending estimate has no values yet
+FIDELITY_PENDING = "pending"
+FIDELITY_TILE = "tile"
+FIDELITY_CACHED = "cached"
+FIDELITY_FULL = "full"
+FIDELITY_TIERS = [FIDELITY_PENDING, FIDELITY_TILE, FIDELITY_CACHED, FIDELITY_FULL]
+# Time the UI waits for the full model before showing a cheaper tier
+DEFAULT_BUDGET = 0.1
+
+
+def _quick_estimate(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+) -> Dict[str, Any] | None:
+    """Best estimate that needs no request, tagged with its fidelity tier."""
+    estimate = weather_historic.estimate_from_cache(latitude, longitude, specified_date)
+    if estimate is not None:
+        estimate["Fidelity"] = FIDELITY_CACHED
+        return estimate
+    estimate = weather_historic.estimate_from_tiles(latitude, longitude, specified_date)
+    if estimate is not None:
+        estimate["Fidelity"] = FIDELITY_TILE
+    return estimate
+
+
+def _full_estimate(latitude: float, longitude: float, specified_date: date) -> Dict[str, Any]:
+    """The full calculate_forecast, tagged with its tier; runs as a background job."""
+    # The quick tier already covers tiles, so the worker always runs the full model
+    result = weather_historic.calculate_forecast(
+        latitude, longitude, specified_date, prefer_tiles=False
+    )
+    result["Fidelity"] = FIDELITY_FULL
+    return result
+
+
+def estimate_anytime(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+    budget: float = DEFAULT_BUDGET,
+    on_refine: Callable[[Dict[str, Any]], None] | None = None,
+    on_error: Callable[[str], None] | None = None,
+) -> Dict[str, Any] | None:
+    """Estimate within ``budget`` seconds, refining later if the full model is slower.
+
+    The full calculate_forecast runs as a background job per grid cell and
+    date, so repeated calls share the running job instead of starting another.
+    If it finishes within the budget its result is returned. Otherwise the
+    cheapest available tier (cached models, then climatology tile) is returned,
+    or a FIDELITY_PENDING placeholder without temperature and rain when there
+    is none, and ``on_refine`` receives the full result once it is ready. Every
+    result carries its tier under "Fidelity". Returns None if the full model
+    fails within the budget and there is no cheaper tier.
+    """
+    started = time.monotonic()
+    grid_latitude, grid_longitude = weather_historic.grid_cell(latitude, longitude)
+    future, _ = weather_historic.background_job(
+        ("anytime", grid_latitude, grid_longitude, specified_date),
+        _full_estimate, grid_latitude, grid_longitude, specified_date,
+    )
+    quick = _quick_estimate(latitude, longitude, specified_date)
+
+    try:
+        return dict(future.result(max(budget - (time.monotonic() - started), 0.0)))
+    except FuturesTimeout:
+        pass
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        if on_error:
+            on_error(str(error))
+        return quick
+
+    def refined(job: Future) -> None:
+        error = job.exception()
+        if error is not None:
+            if on_error:
+                on_error(f"Refining the estimate failed: {error}")
+        elif on_refine:
+            on_refine(dict(job.result()))
+
+    future.add_done_callback(refined)
+    if quick is not None:
+        return quick
+    return {
+        "Fidelity": FIDELITY_PENDING,
+        "Grid Latitude": grid_latitude,
+        "Grid Longitude": grid_longitude,
+    }
@@ -0,0 +1,363 @@
+"""Rolling-origin backtests of the estimate methods over many sites.
+
+Origins are placed every ORIGIN_STEP_DAYS over the evaluation years. At each
+origin an estimator only sees the archive up to that day and forecasts the
+BACKTEST_LEADS days after it. Estimators are registered by name and receive
+every origin of a site at once, so they can advance state incrementally or
+solve all origins in one batch. (site, estimator) tasks run in a process pool
+over one shared archive block (see weather_pool), fetched through the chunk
+cache. Accuracy is scored with weather_verification against the same block.
+
+Run ``python -m backend.weather_backtest`` for the default 10-site, 5-year
+backtest.
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from backend import (
+    weather_analogs,
+    weather_climatology,
+    weather_historic,
+    weather_holtwinters,
+    weather_pool,
+    weather_tuning,
+    weather_verification,
+)
+
+BACKTEST_YEARS = 5
+ORIGIN_STEP_DAYS = 14
+# Lead days across the six-month window the app estimates
+BACKTEST_LEADS = (7, 14, 30, 60, 90, 180)
+# Fourier pairs of the annual cycle in the harmonic estimator
+HARMONICS = 3
+PERSISTENCE_DAYS = 7
+BACKTEST_SITES = [
+    (52.52, 13.41),    # Berlin
+    (51.51, -0.13),    # London
+    (40.42, -3.70),    # Madrid
+    (59.33, 18.07),    # Stockholm
+    (41.89, 12.48),    # Rome
+    (40.71, -74.01),   # New York
+    (35.68, 139.69),   # Tokyo
+    (-33.87, 151.21),  # Sydney
+    (1.35, 103.82),    # Singapore
+    (-23.55, -46.63),  # São Paulo
+]
+
+# Estimators take the dates (day,) and values (variable, day) of a site in
+# POOL_VARIABLES order, the index of the last known day at every origin and
+# the leads. They return (origin, 3, lead): temperature, rain and chance of
+# rain in [0, 1] (NaN when the method has none).
+Estimator = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+ESTIMATORS: Dict[str, Estimator] = {}
+
+
+def register(name: str) -> Callable[[Estimator], Estimator]:
+    """Register an estimator under a name."""
+    def decorator(estimator: Estimator) -> Estimator:
+        ESTIMATORS[name] = estimator
+        return estimator
+    return decorator
+
+
+def _empty(origins: np.ndarray, leads: np.ndarray) -> np.ndarray:
+    """NaN result array of an estimator."""
+    return np.full((origins.size, 3, leads.size), np.nan)
+
+
+@register("holt_winters")
+def holt_winters_estimator(
+    dates: np.ndarray, values: np.ndarray, origins: np.ndarray, leads: np.ndarray
+) -> np.ndarray:
+    """Holt-Winters as the app serves it, without seeing past any origin.
+
+    The smoothing parameters are tuned and the state fitted on the FIT_YEARS
+    up to an origin, like smoothing_for and the state refit, then the state is
+    smoothed origin to origin until the next refit STATE_REFIT_DAYS later.
+    """
+    del dates
+    result = _empty(origins, leads)
+    state, refit_origin = None, None
+    for index, origin in enumerate(origins):
+        if refit_origin is None or origin - refit_origin >= weather_historic.STATE_REFIT_DAYS:
+            history = values[:, max(origin + 1 - weather_historic.FIT_YEARS * 365, 0):origin + 1]
+            try:
+                smoothing = weather_tuning.SmoothingParameters.tune(
+                    history, weather_historic.SEASONAL_PERIODS
+                )
+            except ValueError:
+                smoothing = weather_tuning.SmoothingParameters.default(
+                    weather_historic.TEMP_SMOOTHING, weather_historic.RAIN_SMOOTHING
+                )
+            state = weather_holtwinters.fit(
+                history,
+                weather_historic.SEASONAL_PERIODS,
+                alpha=smoothing.alpha,
+                gamma=smoothing.gamma,
+            )
+            refit_origin = origin
+        else:
+            weather_holtwinters.smooth(state, values[:, origins[index - 1] + 1:origin + 1])
+        result[index, :2] = weather_holtwinters.forecast(state, int(leads.max()))[:, leads - 1]
+    return result
+
+
+@register("climatology")
+def climatology_estimator(
+    dates: np.ndarray, values: np.ndarray, origins: np.ndarray, leads: np.ndarray
+) -> np.ndarray:
+    """Day-of-year climatology of the history up to each origin."""
+    result = _empty(origins, leads)
+    for index, origin in enumerate(origins):
+        climatology = weather_climatology.Climatology.build(
+            dates[:origin + 1],
+            dict(zip(weather_pool.POOL_VARIABLES, values[:, :origin + 1])),
+        )
+        summary = climatology.summary(
+            dates[origin] + leads, weather_historic.CLIMATOLOGY_WINDOW, percentiles=[]
+        )
+        result[index, 0] = summary["temperature_2m_mean mean"]
+        result[index, 1] = summary["rain_sum mean"]
+        result[index, 2] = summary["wet_day_frequency"]
+    return result
+
+
+@register("harmonic")
+def harmonic_estimator(
+    dates: np.ndarray, values: np.ndarray, origins: np.ndarray, leads: np.ndarray
+) -> np.ndarray:
+    """Least-squares annual harmonics over the FIT_YEARS before each origin.
+
+    The normal equations of every origin's window are differences of running
+    sums, so all origins are solved in one batched ``np.linalg.solve``.
+    """
+    days = dates.astype(np.int64).astype(np.float64)
+    targets = np.stack([
+        values[0],
+        values[1],
+        (values[1] >= weather_climatology.WET_DAY_THRESHOLD).astype(np.float64),
+    ]).astype(np.float64)
+    targets[2][np.isnan(values[1])] = np.nan
+
+    def design(day: np.ndarray) -> np.ndarray:
+        angle = 2.0 * np.pi * day[..., None] * np.arange(1, HARMONICS + 1) / 365.25
+        return np.concatenate(
+            [np.ones(day.shape + (1,)), np.cos(angle), np.sin(angle)], axis=-1
+        )
+
+    basis = design(days)
+    observed = ~np.isnan(targets)
+    filled = np.where(observed, targets, 0.0)
+    # Running sums of X'X and X'y per variable, with a leading zero row
+    gram = np.cumsum(
+        observed[:, :, None, None] * basis[None, :, :, None] * basis[None, :, None, :], axis=1
+    )
+    moment = np.cumsum(filled[:, :, None] * basis[None, :, :], axis=1)
+    gram = np.concatenate([np.zeros_like(gram[:, :1]), gram], axis=1)
+    moment = np.concatenate([np.zeros_like(moment[:, :1]), moment], axis=1)
+
+    end = origins + 1
+    start = np.maximum(end - weather_historic.FIT_YEARS * 365, 0)
+    ridge = 1e-6 * np.eye(basis.shape[1])
+    coefficients = np.linalg.solve(
+        gram[:, end] - gram[:, start] + ridge,
+        (moment[:, end] - moment[:, start])[..., None],
+    )[..., 0]
+    forecast = np.einsum("olk,vok->ovl", design(days[origins][:, None] + leads), coefficients)
+    forecast[:, 1] = np.maximum(forecast[:, 1], 0.0)
+    forecast[:, 2] = np.clip(forecast[:, 2], 0.0, 1.0)
+    return forecast
+
+
+@register("analogs")
+def analogs_estimator(
+    dates: np.ndarray, values: np.ndarray, origins: np.ndarray, leads: np.ndarray
+) -> np.ndarray:
+    """ANALOG_COUNT historical analogs of the week before each origin."""
+    result = _empty(origins, leads)
+    for index, origin in enumerate(origins):
+        analog_index = weather_analogs.AnalogIndex.build(
+            dates[:origin + 1],
+            dict(zip(weather_pool.POOL_VARIABLES, values[:, :origin + 1])),
+        )
+        try:
+            analogs = analog_index.query(
+                dates[origin].item(), weather_historic.ANALOG_COUNT, horizon=int(leads.max())
+            )
+        except ValueError:
+            continue
+        # (analog, variable, lead), variables in FEATURE_VARIABLES order
+        followed = analogs.followed[:, :, leads - 1]
+        temperature = followed[:, weather_analogs.FEATURE_VARIABLES.index("temperature_2m_mean")]
+        rain = followed[:, weather_analogs.FEATURE_VARIABLES.index("rain_sum")]
+        with np.errstate(invalid="ignore"):
+            result[index, 0] = np.nanmean(temperature, axis=0)
+            result[index, 1] = np.nanmean(rain, axis=0)
+            result[index, 2] = np.mean(rain >= weather_climatology.WET_DAY_THRESHOLD, axis=0)
+    return result
+
+
+@register("persistence")
+def persistence_estimator(
+    dates: np.ndarray, values: np.ndarray, origins: np.ndarray, leads: np.ndarray
+) -> np.ndarray:
+    """The mean of the PERSISTENCE_DAYS before each origin, at every lead; a baseline."""
+    del dates
+    windows = np.lib.stride_tricks.sliding_window_view(values, PERSISTENCE_DAYS, axis=1)
+    recent = windows[:, origins - PERSISTENCE_DAYS + 1]
+    with np.errstate(invalid="ignore"):
+        means = np.nanmean(recent, axis=2).T
+        wet = np.nanmean(recent[1] >= weather_climatology.WET_DAY_THRESHOLD, axis=1)
+    return np.repeat(
+        np.stack([means[:, 0], means[:, 1], wet], axis=1)[:, :, None], leads.size, axis=2
+    )
+
+
+def _run_task(task: Tuple[int, str, np.ndarray, np.ndarray]) -> Tuple[np.ndarray, float]:
+    """Worker: run one estimator on one site of the shared archive, with its CPU time."""
+    cell, name, origins, leads = task
+    archive, dates = weather_pool.attached_archive()
+    started = time.process_time()
+    forecast = ESTIMATORS[name](dates, archive[cell], origins, leads)
+    return forecast, time.process_time() - started
+
+
+@dataclass
+class BacktestResult:
+    """Scores per (estimator, cell, lead) and runtime per estimator."""
+
+    scores: weather_verification.Scores
+    runtime: Dict[str, Dict[str, float]]
+    wall_seconds: float
+
+    def accuracy_rows(self) -> List[Dict[str, Any]]:
+        """Accuracy per estimator and lead, pooled over sites."""
+        return self.scores.regroup(["source", "lead"]).rows()
+
+    def runtime_rows(self) -> List[Dict[str, Any]]:
+        """CPU time per estimator."""
+        return [{"source": name, **row} for name, row in self.runtime.items()]
+
+
+def backtest(
+    sites: Sequence[Tuple[float, float]] = BACKTEST_SITES,
+    years: int = BACKTEST_YEARS,
+    estimators: Sequence[str] | None = None,
+    leads: Sequence[int] = BACKTEST_LEADS,
+    step_days: int = ORIGIN_STEP_DAYS,
+    processes: int | None = None,
+) -> BacktestResult:
+    """Backtest the registered estimators over the last ``years`` of every site.
+
+    The archive covers FIT_YEARS of training before the first origin; the
+    last origin leaves room for the longest lead before the published end.
+    """
+    started = time.perf_counter()
+    names = list(estimators or ESTIMATORS)
+    leads_array = np.asarray(leads, dtype=np.int64)
+    cells = list(dict.fromkeys(
+        weather_historic.grid_cell(latitude, longitude) for latitude, longitude in sites
+    ))
+    end_date = date.today() - relativedelta(days=5)
+    first_origin = end_date - relativedelta(years=years)
+    start_date = first_origin - relativedelta(years=weather_historic.FIT_YEARS)
+    last_origin = end_date - relativedelta(days=int(leads_array.max()))
+    origins = np.arange(
+        (first_origin - start_date).days, (last_origin - start_date).days + 1, step_days
+    )
+
+    archive = weather_pool.fetch_archives(cells, start_date, end_date)
+    tasks = [(cell, name, origins, leads_array) for cell in range(len(cells)) for name in names]
+    with weather_pool.archive_pool(archive, start_date, processes) as executor:
+        outputs = list(executor.map(_run_task, tasks))
+
+    columns: Dict[str, List[Any]] = {
+        "sources": [], "latitudes": [], "longitudes": [], "leads": [], "valid": [],
+        "temperature": [], "rain": [], "chance": [],
+    }
+    observed: Dict[str, List[np.ndarray]] = {
+        name: [] for name in weather_verification.ESTIMATE_OBSERVED_VARIABLES
+    }
+    seconds = {name: 0.0 for name in names}
+    targets = origins[:, None] + leads_array[None, :]
+    for (cell, name, _, _), (forecast, cpu_seconds) in zip(tasks, outputs):
+        seconds[name] += cpu_seconds
+        columns["sources"].append(np.full(targets.size, name))
+        columns["latitudes"].append(np.full(targets.size, cells[cell][0]))
+        columns["longitudes"].append(np.full(targets.size, cells[cell][1]))
+        columns["leads"].append(np.broadcast_to(leads_array, targets.shape).ravel())
+        columns["valid"].append((np.datetime64(start_date, "D") + targets).ravel())
+        columns["temperature"].append(forecast[:, 0].ravel())
+        columns["rain"].append(forecast[:, 1].ravel())
+        columns["chance"].append(forecast[:, 2].ravel())
+        for name, variable in weather_verification.ESTIMATE_OBSERVED_VARIABLES.items():
+            row = weather_pool.POOL_VARIABLES.index(variable)
+            observed[name].append(archive[cell, row, targets].ravel())
+
+    forecasts = weather_verification.ForecastSet.from_columns(
+        {name: np.concatenate(parts) for name, parts in columns.items()}
+    )
+    scores = weather_verification.Scores.compute(
+        forecasts, {name: np.concatenate(parts) for name, parts in observed.items()}
+    )
+    n_forecasts = len(cells) * origins.size
+    runtime = {
+        name: {
+            "CPU Seconds": round(seconds[name], 3),
+            "ms per Origin": round(1e3 * seconds[name] / max(n_forecasts, 1), 3),
+            "Sites": len(cells),
+            "Origins": int(origins.size),
+        }
+        for name in names
+    }
+    return BacktestResult(scores, runtime, time.perf_counter() - started)
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Plain-text table of dict rows sharing their keys."""
+    if not rows:
+        return "(no rows)"
+    headers = list(rows[0])
+    cells = [
+        [f"{value:.3f}" if isinstance(value, float) else str(value) for value in row.values()]
+        for row in rows
+    ]
+    widths = [
+        max(len(header), *(len(line[index]) for line in cells))
+        for index, header in enumerate(headers)
+    ]
+    lines = ["  ".join(header.rjust(width) for header, width in zip(headers, widths))]
+    lines += ["  ".join(value.rjust(width) for value, width in zip(line, widths)) for line in cells]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Run a backtest and print its accuracy and runtime tables."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=BACKTEST_YEARS)
+    parser.add_argument("--step-days", type=int, default=ORIGIN_STEP_DAYS)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--estimators", nargs="*", choices=sorted(ESTIMATORS), default=None)
+    args = parser.parse_args()
+
+    result = backtest(
+        years=args.years,
+        estimators=args.estimators,
+        step_days=args.step_days,
+        processes=args.processes,
+    )
+    print(format_table(result.accuracy_rows()))
+    print()
+    print(format_table(result.runtime_rows()))
+    print(f"\nWall time: {result.wall_seconds:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
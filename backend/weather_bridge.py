@@ -2,7 +2,7 @@
 
 from typing import List
 
-from PySide6.QtCore import Property, QObject, Signal, Slot
+from PySide6.QtCore import Property, QObject, Qt, Signal, Slot
 from backend import weather_forecast
 
 class WeatherBridge(QObject):
@@ -23,11 +23,23 @@ class WeatherBridge(QObject):
     cinnamoroll_source_changed = Signal()
 
     error_message = Signal(str)
+    # Emitted from the estimate worker thread with (request, result), handled in the GUI thread
+    estimate_refined = Signal(object, object)
+    # Emitted from the ensemble worker thread with (request, summary), handled in the GUI thread
+    ensemble_ready = Signal(object, object)
 
     def __init__(self, parent: QObject = None) -> None:  # type: ignore
         """Initialize the WeatherBridge."""
         super().__init__(parent)
         self.weather_data = weather_forecast.WeatherData()
+        self.estimate_refined.connect(
+            self.on_estimate_refined, Qt.ConnectionType.QueuedConnection
+        )
+        self.weather_data.on_estimate_refined = self.estimate_refined.emit
+        self.ensemble_ready.connect(
+            self.on_ensemble_ready, Qt.ConnectionType.QueuedConnection
+        )
+        self.weather_data.on_ensemble_ready = self.ensemble_ready.emit
         self.update_current_status()
 
         self._daily_dates: List[str] = []
@@ -48,6 +60,24 @@ class WeatherBridge(QObject):
         except Exception as e:
             self.emit_error_message(str(e))
 
+    @Slot(object, object)
+    def on_estimate_refined(self, request: tuple, result: dict) -> None:
+        """Show the refined estimate in place of the fast one."""
+        if not self.weather_data.apply_refined_estimate(request, result):
+            return
+        self.weather_message_changed.emit()
+        self.cinnamoroll_source_changed.emit()
+        self.cinnamoroll_message_changed.emit()
+
+    @Slot(object, object)
+    def on_ensemble_ready(self, request: tuple, summary: object) -> None:
+        """Show the ensemble chance of rain once its members are fetched."""
+        if not self.weather_data.apply_ensemble(request, summary):
+            return
+        self.weather_message_changed.emit()
+        self.cinnamoroll_source_changed.emit()
+        self.cinnamoroll_message_changed.emit()
+
     @Property(str, notify=ip_message_changed)
     def ip_message(self) -> str:
         """Getter."""
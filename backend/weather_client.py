@@ -0,0 +1,68 @@
+"""Process-wide Open-Meteo client with a configurable HTTP cache."""
+
+import os
+import threading
+from pathlib import Path
+
+import openmeteo_requests
+import requests_cache
+from retry_requests import retry
+
+from backend import weather_storage
+
+# "memory", "sqlite" (WAL journal, safe for the archive thread pool) or "filesystem"
+HTTP_CACHE_BACKEND = os.environ.get("WEATHER_HTTP_CACHE", "sqlite")
+HTTP_CACHE_DIR = weather_storage.CACHE_DIR / "http"
+HTTP_CACHE_EXPIRE = 3600
+
+_client: openmeteo_requests.Client | None = None
+_client_lock = threading.Lock()
+
+
+def _cache_backend(backend: str, cache_dir: Path) -> requests_cache.BaseCache:
+    """Build the requests-cache backend for a backend name."""
+    if backend == "memory":
+        return requests_cache.BaseCache()
+    if backend == "sqlite":
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return requests_cache.SQLiteCache(cache_dir / "open_meteo.sqlite", wal=True)
+    if backend == "filesystem":
+        return requests_cache.FileCache(cache_dir / "open_meteo")
+    raise ValueError(
+        f"Unknown HTTP cache backend {backend!r}, expected memory, sqlite or filesystem."
+    )
+
+
+def _build_client(
+    backend: str,
+    cache_dir: Path,
+    expire_after: int,
+) -> openmeteo_requests.Client:
+    """Setup the Open-Meteo API client with cache and retry on error."""
+    cache_session = requests_cache.CachedSession(
+        backend=_cache_backend(backend, cache_dir), expire_after=expire_after
+    )
+    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+    return openmeteo_requests.Client(session=retry_session)
+
+
+def configure_client(
+    backend: str = HTTP_CACHE_BACKEND,
+    cache_dir: Path = HTTP_CACHE_DIR,
+    expire_after: int = HTTP_CACHE_EXPIRE,
+) -> openmeteo_requests.Client:
+    """Replace the shared client, e.g. to move the cache or switch backend."""
+    global _client
+    client = _build_client(backend, cache_dir, expire_after)
+    with _client_lock:
+        _client = client
+    return client
+
+
+def get_client() -> openmeteo_requests.Client:
+    """Shared client, created on first use so setup is paid once per process."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = _build_client(HTTP_CACHE_BACKEND, HTTP_CACHE_DIR, HTTP_CACHE_EXPIRE)
+        return _client
@@ -0,0 +1,111 @@
+"""Day-of-year climatology over a daily archive."""
+
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Sequence
+
+import numpy as np
+
+from backend import weather_storage
+
+# 366 slots so that 29 February keeps its own place; other years skip slot 59
+CALENDAR_DAYS = 366
+LEAP_DAY_SLOT = 59
+# Same limit as validate_est_feelings uses for "No Rain"
+WET_DAY_THRESHOLD = 1.0
+
+
+def day_of_year_slots(dates: np.ndarray) -> np.ndarray:
+    """Map datetime64 dates to calendar slots 0..365 shared by all years."""
+    days = np.asarray(dates).astype("datetime64[D]")
+    years = days.astype("datetime64[Y]")
+    day_of_year = (days - years.astype("datetime64[D]")).astype(np.int64)
+    year_number = years.astype(np.int64) + 1970
+    is_leap = (year_number % 4 == 0) & ((year_number % 100 != 0) | (year_number % 400 == 0))
+    return np.where(~is_leap & (day_of_year >= LEAP_DAY_SLOT), day_of_year + 1, day_of_year)
+
+
+@dataclass
+class Climatology:
+    """Archive values regrouped as (calendar slot, year) tables per variable.
+
+    Missing days are NaN, so any window of slots can be gathered with one fancy
+    index and reduced with NaN-aware NumPy functions.
+    """
+
+    first_year: int
+    tables: Dict[str, np.ndarray]
+
+    @classmethod
+    def build(cls, dates: np.ndarray, values: Dict[str, np.ndarray]) -> "Climatology":
+        """Index a daily archive by day of year once."""
+        days = np.asarray(dates).astype("datetime64[D]")
+        years = days.astype("datetime64[Y]").astype(np.int64) + 1970
+        first_year = int(years.min())
+        year_index = years - first_year
+        slots = day_of_year_slots(days)
+
+        tables = {}
+        for name, series in values.items():
+            table = np.full((CALENDAR_DAYS, int(year_index.max()) + 1), np.nan, np.float32)
+            table[slots, year_index] = series
+            tables[name] = table
+        return cls(first_year=first_year, tables=tables)
+
+    @property
+    def variables(self) -> list[str]:
+        """Names of the indexed variables."""
+        return list(self.tables.keys())
+
+    def samples(
+        self,
+        variable: str,
+        targets: Sequence[date],
+        window: int,
+    ) -> np.ndarray:
+        """All archive values within ±window days of each target, shape (targets, samples)."""
+        centre = day_of_year_slots(np.array(targets, dtype="datetime64[D]"))
+        slots = (centre[:, None] + np.arange(-window, window + 1)[None, :]) % CALENDAR_DAYS
+        return self.tables[variable][slots].reshape(len(centre), -1)
+
+    def summary(
+        self,
+        targets: Sequence[date],
+        window: int = 7,
+        percentiles: Iterable[float] = (10, 50, 90),
+        wet_threshold: float = WET_DAY_THRESHOLD,
+        rain_variable: str = "rain_sum",
+    ) -> Dict[str, np.ndarray]:
+        """Mean, percentiles and wet-day frequency per variable for every target.
+
+        Keys are ``"<variable> mean"``, ``"<variable> p<q>"`` and, for the rain
+        variable, ``"wet_day_frequency"`` in [0, 1]. Each value has one entry per
+        target.
+        """
+        percentiles = list(percentiles)
+        result: Dict[str, np.ndarray] = {}
+        with np.errstate(invalid="ignore"):
+            for variable in self.tables:
+                samples = self.samples(variable, targets, window)
+                result[f"{variable} mean"] = np.nanmean(samples, axis=1)
+                if percentiles:
+                    bands = np.nanpercentile(samples, percentiles, axis=1)
+                    for q, band in zip(percentiles, bands):
+                        result[f"{variable} p{q:g}"] = band
+                if variable == rain_variable:
+                    observed = np.count_nonzero(~np.isnan(samples), axis=1)
+                    wet = np.count_nonzero(samples >= wet_threshold, axis=1)
+                    result["wet_day_frequency"] = wet / np.maximum(observed, 1)
+        return result
+
+    def save(self, path: Path) -> None:
+        """Persist the tables to an ``.npz`` file."""
+        weather_storage.save_npz(path, first_year=np.int64(self.first_year), **self.tables)
+
+    @classmethod
+    def load(cls, path: Path) -> "Climatology":
+        """Load tables written by save."""
+        with np.load(path) as data:
+            tables = {name: data[name] for name in data.files if name != "first_year"}
+            return cls(first_year=int(data["first_year"]), tables=tables)
@@ -0,0 +1,216 @@
+"""Quantized codec for archive series.
+
+Values are stored as int16 multiples of a fixed per-variable scale (0.1 °C,
+0.1 mm, ...). Smooth series such as temperature are delta encoded into int8
+steps, and the rare larger jumps are kept as exceptions holding the value itself. Precipitation-like series are
+run-length encoded as (dry run, wet amount) pairs, since most days are dry.
+Missing days, rare outside the unpublished tail, are kept as positions.
+Decoding is a handful of vectorized NumPy operations per series.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, Mapping
+
+import numpy as np
+
+DEFAULT_SCALE = 0.1
+SCALES = {
+    "snowfall_sum": 0.01,
+    "snowfall": 0.01,
+}
+RUN_LENGTH_VARIABLES = {
+    "rain_sum",
+    "precipitation_sum",
+    "snowfall_sum",
+    "rain",
+    "precipitation",
+    "snowfall",
+}
+DELTA = "delta"
+RUNS = "runs"
+# Longest dry run one uint8 step can hold; longer runs get explicit zero entries
+MAX_RUN = np.iinfo(np.uint8).max
+MAX_STEP = np.iinfo(np.int8).max
+# Key separator of the flat arrays written to ``.npz`` files
+SEPARATOR = "__"
+# Files written in another layout are read as holding no series
+FORMAT_VERSION = 2
+# Array fields of EncodedSeries and the dtype they are concatenated in
+PACKED_ARRAYS = {
+    "missing": np.int32,
+    "steps": np.uint8,
+    "values": np.int16,
+    "positions": np.int32,
+}
+
+
+@dataclass
+class EncodedSeries:
+    """One quantized series; ``decode`` returns the float32 values.
+
+    ``values`` holds the wet amounts of a run-length series, or the values at
+    ``positions`` where a delta series jumps further than an int8 step.
+    """
+
+    kind: str
+    scale: float
+    length: int
+    missing: np.ndarray
+    steps: np.ndarray
+    values: np.ndarray
+    positions: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the encoded arrays."""
+        return sum(
+            getattr(self, field.name).nbytes
+            for field in fields(self)
+            if isinstance(getattr(self, field.name), np.ndarray)
+        )
+
+    def decode(self) -> np.ndarray:
+        """Decode back to float32, NaN where the archive had no value."""
+        if self.kind == DELTA:
+            # Steps are zero at jumps, where the sum restarts from the stored value
+            steps = np.cumsum(self.steps, dtype=np.int32)
+            anchors = np.searchsorted(self.positions, np.arange(self.length), side="right")
+            bases = np.concatenate([[0], self.values.astype(np.int32) - steps[self.positions]])
+            quantized = steps + bases[anchors]
+        else:
+            quantized = np.zeros(self.length, dtype=np.int32)
+            wet = np.cumsum(self.steps.astype(np.int64) + 1) - 1
+            quantized[wet] = self.values
+        decoded = (quantized * self.scale).astype(np.float32)
+        decoded[self.missing] = np.nan
+        return decoded
+
+
+def _quantize(values: np.ndarray, scale: float) -> tuple[np.ndarray, np.ndarray]:
+    """Integer multiples of ``scale`` (0 where missing) and the missing mask."""
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    quantized = np.round(np.where(missing, 0.0, values) / scale).astype(np.int64)
+    return quantized, missing
+
+
+def encode_series(variable: str, values: np.ndarray) -> EncodedSeries:
+    """Quantize and encode one series with the scheme suited to the variable."""
+    scale = SCALES.get(variable, DEFAULT_SCALE)
+    quantized, missing = _quantize(values, scale)
+    int16 = np.iinfo(np.int16)
+    if quantized.size and (quantized.min() < int16.min or quantized.max() > int16.max):
+        raise ValueError(f"{variable} does not fit int16 at a scale of {scale}.")
+
+    if variable in RUN_LENGTH_VARIABLES:
+        wet = np.flatnonzero(quantized)
+        runs = np.diff(wet, prepend=-1) - 1
+        fillers = runs // (MAX_RUN + 1)
+        last = np.cumsum(fillers + 1) - 1
+        steps = np.full(last[-1] + 1 if wet.size else 0, MAX_RUN, dtype=np.uint8)
+        amounts = np.zeros(steps.size, dtype=np.int16)
+        steps[last] = runs % (MAX_RUN + 1)
+        amounts[last] = quantized[wet]
+        return EncodedSeries(
+            kind=RUNS,
+            scale=scale,
+            length=quantized.size,
+            missing=np.flatnonzero(missing).astype(np.int32),
+            steps=steps,
+            values=amounts,
+            positions=np.zeros(0, dtype=np.int32),
+        )
+
+    # Missing days repeat the previous value, so they cost a zero step
+    observed = np.where(~missing, np.arange(quantized.size), 0)
+    filled = quantized[np.maximum.accumulate(observed)] if quantized.size else quantized
+    deltas = np.diff(filled, prepend=0)
+    jumps = np.abs(deltas) > MAX_STEP
+    return EncodedSeries(
+        kind=DELTA,
+        scale=scale,
+        length=quantized.size,
+        missing=np.flatnonzero(missing).astype(np.int32),
+        steps=np.where(jumps, 0, deltas).astype(np.int8),
+        values=filled[jumps].astype(np.int16),
+        positions=np.flatnonzero(jumps).astype(np.int32),
+    )
+
+
+def encode(values: Mapping[str, np.ndarray]) -> Dict[str, EncodedSeries]:
+    """Encode every series of a {variable: values} mapping."""
+    return {variable: encode_series(variable, series) for variable, series in values.items()}
+
+
+def decode(encoded: Mapping[str, EncodedSeries]) -> Dict[str, np.ndarray]:
+    """Decode every series of a {variable: EncodedSeries} mapping."""
+    return {variable: series.decode() for variable, series in encoded.items()}
+
+
+def to_arrays(encoded: Mapping[str, EncodedSeries]) -> Dict[str, np.ndarray]:
+    """Pack encoded series into a fixed set of concatenated arrays for ``np.savez``.
+
+    Every member of an ``.npz`` file has a cost to open, so the number of arrays
+    does not grow with the number of variables.
+    """
+    series = list(encoded.values())
+    arrays = {
+        "variables": np.array(list(encoded.keys()), dtype=str),
+        "kinds": np.array([item.kind for item in series], dtype=str),
+        "scales": np.array([item.scale for item in series], dtype=np.float64),
+        "lengths": np.array([item.length for item in series], dtype=np.int64),
+        "version": np.array(FORMAT_VERSION),
+    }
+    for name, dtype in PACKED_ARRAYS.items():
+        parts = [getattr(item, name).astype(dtype) for item in series]
+        arrays[f"{name}_sizes"] = np.array([part.size for part in parts], dtype=np.int64)
+        arrays[name] = np.concatenate(parts + [np.zeros(0, dtype)])
+    return {f"codec{SEPARATOR}{name}": array for name, array in arrays.items()}
+
+
+def load_arrays(data: Mapping[str, np.ndarray]) -> Dict[str, EncodedSeries]:
+    """Encoded series of arrays written by to_arrays, without decoding them.
+
+    Arrays of another codec version, or plain float arrays written before the
+    codec existed, give no series.
+    """
+    prefix = f"codec{SEPARATOR}"
+    if f"{prefix}version" not in data.keys() or int(data[f"{prefix}version"]) != FORMAT_VERSION:
+        return {}
+
+    parts: Dict[str, list] = {}
+    for name in PACKED_ARRAYS:
+        bounds = np.concatenate([[0], np.cumsum(data[f"{prefix}{name}_sizes"])])
+        packed = data[f"{prefix}{name}"]
+        parts[name] = [packed[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    kinds = data[f"{prefix}kinds"].tolist()
+    scales = data[f"{prefix}scales"].tolist()
+    lengths = data[f"{prefix}lengths"].tolist()
+    return {
+        variable: EncodedSeries(
+            kind=kinds[index],
+            scale=scales[index],
+            length=lengths[index],
+            missing=parts["missing"][index],
+            steps=parts["steps"][index].view(np.int8 if kinds[index] == DELTA else np.uint8),
+            values=parts["values"][index],
+            positions=parts["positions"][index],
+        )
+        for index, variable in enumerate(data[f"{prefix}variables"].tolist())
+    }
+
+
+def from_arrays(data: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Decode arrays written by to_arrays back to float32 series.
+
+    Plain float arrays, as written before the codec existed, are passed through.
+    """
+    prefix = f"codec{SEPARATOR}"
+    decoded = {
+        key: np.asarray(data[key], dtype=np.float32)
+        for key in data.keys()
+        if not key.startswith(prefix)
+    }
+    decoded.update(decode(load_arrays(data)))
+    return decoded
@@ -0,0 +1,324 @@
+"""Ensemble forecasts from the Open-Meteo ensemble endpoint.
+
+Every member of every requested variable is decoded into one (member, hour,
+variable) float32 array. Exceedance probabilities and percentiles are then
+reductions over the member axis for all hours at once, and daily values are
+``np.add.reduceat`` sums over the hours of each local day. The reduced
+summary is cached per grid cell and model run: within a run slot no request
+is made, and a new slot whose members are unchanged (the run is not published
+yet) reuses the previous summary.
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from backend import (
+    weather_client,
+    weather_climatology,
+    weather_historic,
+    weather_hourly,
+    weather_storage,
+)
+
+ENSEMBLE_API = "https://ensemble-api.open-meteo.com/v1/ensemble"
+# Ensemble counterpart of each forecast model; others fall back to DEFAULT_ENSEMBLE_MODEL
+ENSEMBLE_MODELS = {
+    "ecmwf_ifs": "ecmwf_ifs025",
+    "gfs_seamless": "gfs_seamless",
+    "icon_global": "icon_global",
+}
+DEFAULT_ENSEMBLE_MODEL = "ecmwf_ifs025"
+ENSEMBLE_VARIABLES = ["temperature_2m", "precipitation"]
+ENSEMBLE_DAYS = 16
+# Global ensembles start a run every this many hours (UTC)
+RUN_HOURS = 6
+PERCENTILES = (10, 50, 90)
+# Exceedance thresholds of hourly and of daily values
+HOURLY_THRESHOLDS = {"precipitation": weather_hourly.WET_HOUR_THRESHOLD}
+DAILY_THRESHOLDS = {"precipitation": weather_climatology.WET_DAY_THRESHOLD}
+# How hours are combined into a daily value
+DAILY_REDUCTIONS = {"temperature_2m": "mean", "precipitation": "sum"}
+# Dict fields of EnsembleSummary, stored as "<group>__<variable>" arrays
+SUMMARY_GROUPS = ("hourly_chance", "daily_chance", "hourly_bands", "daily_bands")
+SEPARATOR = "__"
+
+# In-memory summaries: (cell key, ensemble model) -> (run slot, members digest, summary)
+_SUMMARIES: Dict[Tuple[str, str], Tuple[str, str, "EnsembleSummary"]] = {}
+_SUMMARIES_LOCK = threading.Lock()
+
+
+def _exceedance(values: np.ndarray, threshold: float) -> np.ndarray:
+    """Share of members (axis 0) reaching the threshold, NaN where none reported."""
+    reported = np.count_nonzero(~np.isnan(values), axis=0)
+    reaching = np.count_nonzero(values >= threshold, axis=0)
+    return np.where(reported > 0, reaching / np.maximum(reported, 1), np.nan)
+
+
+@dataclass
+class EnsembleForecast:
+    """Decoded members of one ensemble run, ``members`` shaped (member, hour, variable)."""
+
+    times: np.ndarray
+    variables: List[str]
+    members: np.ndarray
+
+    @classmethod
+    def decode(cls, response: Any, variables: List[str]) -> "EnsembleForecast":
+        """Decode an hourly ensemble response, times on the local calendar.
+
+        Each variable comes once per member; they are told apart by
+        ``EnsembleMember()`` and assigned to ``variables`` in order of first
+        appearance, which is the requested order.
+        """
+        hourly = response.Hourly()
+        kinds: Dict[Tuple[int, int], int] = {}
+        entries = []
+        for index in range(hourly.VariablesLength()):
+            variable = hourly.Variables(index)
+            kind = kinds.setdefault((variable.Variable(), variable.Altitude()), len(kinds))
+            entries.append((variable.EnsembleMember(), kind, variable.ValuesAsNumpy()))
+        if len(kinds) != len(variables):
+            raise ValueError(f"Expected {len(variables)} variables, got {len(kinds)}.")
+
+        n_members = max(member for member, _, _ in entries) + 1
+        n_hours = entries[0][2].size
+        members = np.full((n_members, n_hours, len(variables)), np.nan, dtype=np.float32)
+        for member, kind, values in entries:
+            members[member, :, kind] = values
+        seconds = (
+            hourly.Time() + response.UtcOffsetSeconds() + hourly.Interval() * np.arange(n_hours)
+        )
+        return cls(
+            times=seconds.astype("datetime64[s]").astype("datetime64[h]"),
+            variables=list(variables),
+            members=members,
+        )
+
+    def exceedance(self, variable: str, threshold: float) -> np.ndarray:
+        """Share of members reaching the threshold every hour, NaN where none reported."""
+        return _exceedance(self.members[:, :, self.variables.index(variable)], threshold)
+
+    def daily(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Local dates and the (member, day, variable) daily values of DAILY_REDUCTIONS."""
+        days = self.times.astype("datetime64[D]")
+        dates, starts = np.unique(days, return_index=True)
+        observed = ~np.isnan(self.members)
+        totals = np.add.reduceat(np.where(observed, self.members, 0.0), starts, axis=1)
+        counts = np.add.reduceat(observed, starts, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = totals / counts
+        reduced = np.stack(
+            [
+                means[:, :, index] if DAILY_REDUCTIONS.get(variable) == "mean"
+                else np.where(counts[:, :, index] > 0, totals[:, :, index], np.nan)
+                for index, variable in enumerate(self.variables)
+            ],
+            axis=2,
+        )
+        return dates, reduced.astype(np.float32)
+
+    def digest(self) -> str:
+        """Hash of the members, equal for two fetches of the same run."""
+        return hashlib.sha1(self.times.tobytes() + self.members.tobytes()).hexdigest()
+
+    def summarize(self, percentiles: Tuple[float, ...] = PERCENTILES) -> "EnsembleSummary":
+        """Reduce over the member axis in one pass per statistic."""
+        dates, daily = self.daily()
+        with np.errstate(invalid="ignore"):
+            # (percentile, hour or day, variable)
+            hourly_bands = np.nanpercentile(self.members, percentiles, axis=0)
+            daily_bands = np.nanpercentile(daily, percentiles, axis=0)
+
+        def exceeding(values: np.ndarray, thresholds: Dict[str, float]) -> Dict[str, np.ndarray]:
+            return {
+                variable: _exceedance(values[:, :, self.variables.index(variable)], threshold)
+                for variable, threshold in thresholds.items()
+                if variable in self.variables
+            }
+
+        return EnsembleSummary(
+            times=self.times,
+            dates=dates,
+            n_members=self.members.shape[0],
+            percentiles=np.asarray(percentiles, dtype=np.float64),
+            hourly_chance=exceeding(self.members, HOURLY_THRESHOLDS),
+            daily_chance=exceeding(daily, DAILY_THRESHOLDS),
+            hourly_bands={
+                variable: hourly_bands[:, :, index] for index, variable in enumerate(self.variables)
+            },
+            daily_bands={
+                variable: daily_bands[:, :, index] for index, variable in enumerate(self.variables)
+            },
+        )
+
+
+@dataclass
+class EnsembleSummary:
+    """Exceedance probabilities (0-1) and percentile bands of one ensemble run.
+
+    ``*_chance`` map a variable to its probability per hour or day of reaching
+    HOURLY_THRESHOLDS / DAILY_THRESHOLDS. ``*_bands`` map a variable to its
+    (percentile, hour or day) values.
+    """
+
+    times: np.ndarray
+    dates: np.ndarray
+    n_members: int
+    percentiles: np.ndarray
+    hourly_chance: Dict[str, np.ndarray]
+    daily_chance: Dict[str, np.ndarray]
+    hourly_bands: Dict[str, np.ndarray]
+    daily_bands: Dict[str, np.ndarray]
+
+    def hour_index(self, local_time: str) -> int | None:
+        """Index of a local ``YYYY-MM-DDTHH:MM`` time, or None outside the run."""
+        matches = np.flatnonzero(self.times == np.datetime64(local_time, "h"))
+        return int(matches[0]) if matches.size else None
+
+    def day_index(self, local_date: str) -> int | None:
+        """Index of a local ``YYYY-MM-DD`` date, or None outside the run."""
+        matches = np.flatnonzero(self.dates == np.datetime64(local_date, "D"))
+        return int(matches[0]) if matches.size else None
+
+    def save(self, path: Path, **metadata: str) -> None:
+        """Persist the summary and string metadata to an ``.npz`` file."""
+        arrays = {
+            "times": self.times,
+            "dates": self.dates,
+            "n_members": np.int64(self.n_members),
+            "percentiles": self.percentiles,
+            "metadata_keys": np.array(list(metadata.keys()), dtype=str),
+            "metadata_values": np.array(list(metadata.values()), dtype=str),
+        }
+        for group in SUMMARY_GROUPS:
+            for variable, values in getattr(self, group).items():
+                arrays[f"{group}{SEPARATOR}{variable}"] = values
+        weather_storage.save_npz(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["EnsembleSummary", Dict[str, str]]:
+        """Load a summary written by save together with its metadata."""
+        with np.load(path) as data:
+            groups: Dict[str, Dict[str, np.ndarray]] = {group: {} for group in SUMMARY_GROUPS}
+            for name in data.files:
+                if SEPARATOR in name:
+                    group, variable = name.split(SEPARATOR, 1)
+                    groups[group][variable] = data[name]
+            summary = cls(
+                times=data["times"],
+                dates=data["dates"],
+                n_members=int(data["n_members"]),
+                percentiles=data["percentiles"],
+                **groups,
+            )
+            metadata = dict(
+                zip(data["metadata_keys"].tolist(), data["metadata_values"].tolist())
+            )
+        return summary, metadata
+
+
+def ensemble_model(weather_models: str) -> str:
+    """Ensemble model matching a forecast model code."""
+    return ENSEMBLE_MODELS.get(weather_models, DEFAULT_ENSEMBLE_MODEL)
+
+
+def run_slot(now: datetime | None = None) -> str:
+    """UTC start of the RUN_HOURS slot of a time, the cache key of a model run."""
+    utc = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    return f"{utc:%Y-%m-%d}T{utc.hour // RUN_HOURS * RUN_HOURS:02d}"
+
+
+def fetch_ensemble(
+    latitude: float,
+    longitude: float,
+    model: str,
+    variables: List[str] | None = None,
+    forecast_days: int = ENSEMBLE_DAYS,
+) -> EnsembleForecast:
+    """Request every member of an ensemble model for a location."""
+    variables = list(variables or ENSEMBLE_VARIABLES)
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "hourly": variables,
+        "models": model,
+        "forecast_days": forecast_days,
+        "timezone": "auto",
+    }
+    responses = weather_client.get_client().weather_api(ENSEMBLE_API, params=params)
+    return EnsembleForecast.decode(responses[0], variables)
+
+
+def _cached(
+    key: str,
+    model: str,
+    path: Path,
+) -> Tuple[str, str, "EnsembleSummary"] | None:
+    """(run slot, members digest, summary) of a cell from memory or disk, None if absent."""
+    with _SUMMARIES_LOCK:
+        cached = _SUMMARIES.get((key, model))
+    if cached is None and path.exists():
+        try:
+            summary, metadata = EnsembleSummary.load(path)
+            cached = (metadata["slot"], metadata["digest"], summary)
+        except (OSError, KeyError, ValueError):
+            cached = None
+        else:
+            with _SUMMARIES_LOCK:
+                _SUMMARIES[(key, model)] = cached
+    return cached
+
+
+def cached_summary(
+    latitude: float,
+    longitude: float,
+    weather_models: str,
+    now: datetime | None = None,
+) -> EnsembleSummary | None:
+    """Summary of the current run slot at a location if it is cached, without any request."""
+    model = ensemble_model(weather_models)
+    key = weather_storage.location_key(*weather_historic.grid_cell(latitude, longitude))
+    cached = _cached(key, model, weather_storage.cache_path("ensemble", model, f"{key}.npz"))
+    if cached is not None and cached[0] == run_slot(now):
+        return cached[2]
+    return None
+
+
+def summary_for(
+    latitude: float,
+    longitude: float,
+    weather_models: str,
+    now: datetime | None = None,
+) -> EnsembleSummary:
+    """Reduced ensemble of a location's grid cell, cached per model run.
+
+    The summary of the current run slot is served from memory or disk. In a
+    new slot the members are fetched; if they hash like the cached run's,
+    its summary is kept, otherwise they are reduced and stored.
+    """
+    latitude, longitude = weather_historic.grid_cell(latitude, longitude)
+    model = ensemble_model(weather_models)
+    key = weather_storage.location_key(latitude, longitude)
+    slot = run_slot(now)
+    path = weather_storage.cache_path("ensemble", model, f"{key}.npz")
+
+    cached = _cached(key, model, path)
+    if cached is not None and cached[0] == slot:
+        return cached[2]
+
+    forecast = fetch_ensemble(latitude, longitude, model)
+    digest = forecast.digest()
+    if cached is not None and cached[1] == digest:
+        summary = cached[2]
+    else:
+        summary = forecast.summarize()
+    summary.save(path, slot=slot, digest=digest)
+    with _SUMMARIES_LOCK:
+        _SUMMARIES[(key, model)] = (slot, digest, summary)
+    return summary
@@ -0,0 +1,170 @@
+"""Precomputed tail statistics per calendar slot.
+
+For every calendar slot the job keeps a quantile curve of the daily values in
+a ±window of days, dense in the upper tail, and a Gumbel fit to the yearly
+maxima of that window. Lookups then answer "how likely is more than 20 mm on
+this day" or "what is the 10-year event" with an interpolation instead of a
+scan of the history.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+from backend import weather_climatology, weather_storage
+
+EXTREME_WINDOW = 15
+EXTREME_VARIABLES = ["rain_sum", "temperature_2m_mean"]
+# Quantile levels stored per slot, every 2 % up to the 90th and every 0.2 % above
+LEVELS = np.concatenate([np.arange(0.0, 0.9, 0.02), np.linspace(0.9, 1.0, 51)])
+EULER_GAMMA = 0.5772156649
+
+
+def _quantile_curves(samples: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """NaN-aware quantiles of every row with one sort, shape (row, level)."""
+    ordered = np.sort(samples, axis=1)
+    counts = np.count_nonzero(~np.isnan(samples), axis=1)
+    positions = levels[None, :] * np.maximum(counts - 1, 0)[:, None]
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(counts - 1, 0)[:, None])
+    weight = positions - lower
+    curves = (
+        (1.0 - weight) * np.take_along_axis(ordered, lower, axis=1)
+        + weight * np.take_along_axis(ordered, upper, axis=1)
+    )
+    curves[counts == 0] = np.nan
+    return curves
+
+
+def _gumbel_moments(maxima: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Method-of-moments Gumbel location and scale of every row, and the years used."""
+    observed = ~np.isnan(maxima)
+    years = observed.sum(axis=1)
+    filled = np.where(observed, maxima, 0.0)
+    mean = filled.sum(axis=1) / np.maximum(years, 1)
+    variance = (np.where(observed, maxima - mean[:, None], 0.0) ** 2).sum(axis=1) / np.maximum(
+        years - 1, 1
+    )
+    scale = np.sqrt(6.0 * variance) / np.pi
+    location = mean - EULER_GAMMA * scale
+    no_fit = years < 2
+    location[no_fit] = np.nan
+    scale[no_fit] = np.nan
+    return location, scale, years
+
+
+@dataclass
+class ExtremeStatistics:
+    """Quantile curves and Gumbel fits, arrays shaped (variable, slot, ...)."""
+
+    variables: List[str]
+    quantiles: np.ndarray
+    gumbel_location: np.ndarray
+    gumbel_scale: np.ndarray
+    years: np.ndarray
+    window: int
+
+    @classmethod
+    def build(
+        cls,
+        climatology: weather_climatology.Climatology,
+        window: int = EXTREME_WINDOW,
+        variables: Sequence[str] = EXTREME_VARIABLES,
+    ) -> "ExtremeStatistics":
+        """Fit every calendar slot of every variable in one vectorized pass each."""
+        variables = [variable for variable in variables if variable in climatology.tables]
+        slots = (
+            np.arange(weather_climatology.CALENDAR_DAYS)[:, None]
+            + np.arange(-window, window + 1)[None, :]
+        ) % weather_climatology.CALENDAR_DAYS
+
+        quantiles, locations, scales, years = [], [], [], []
+        for variable in variables:
+            # (slot, window day, year)
+            windows = climatology.tables[variable][slots].astype(np.float64)
+            quantiles.append(
+                _quantile_curves(windows.reshape(windows.shape[0], -1), LEVELS)
+            )
+            yearly = np.where(np.isnan(windows), -np.inf, windows).max(axis=1)
+            location, scale, used = _gumbel_moments(np.where(np.isinf(yearly), np.nan, yearly))
+            locations.append(location)
+            scales.append(scale)
+            years.append(used)
+
+        return cls(
+            variables=variables,
+            quantiles=np.array(quantiles, dtype=np.float32),
+            gumbel_location=np.array(locations, dtype=np.float32),
+            gumbel_scale=np.array(scales, dtype=np.float32),
+            years=np.array(years, dtype=np.int32),
+            window=window,
+        )
+
+    def _slot(self, variable: str, target: date) -> tuple[int, int]:
+        """Index of the variable and calendar slot of the target day."""
+        slot = int(weather_climatology.day_of_year_slots(np.datetime64(target, "D")))
+        return self.variables.index(variable), slot
+
+    def _yearly_cdf(self, index: int, slot: int, threshold: float) -> float:
+        """Gumbel probability that the window maximum of a year stays below threshold."""
+        location = self.gumbel_location[index, slot]
+        scale = max(float(self.gumbel_scale[index, slot]), 1e-6)
+        return float(np.exp(-np.exp(-(threshold - location) / scale)))
+
+    def exceedance_probability(self, variable: str, target: date, threshold: float) -> float:
+        """Probability that one day around the target reaches the threshold.
+
+        Inside the stored quantile curve this is empirical. Beyond its top the
+        Gumbel fit of the yearly window maxima is converted to a daily rate, as
+        if the window days exceeded independently.
+        """
+        index, slot = self._slot(variable, target)
+        curve = self.quantiles[index, slot]
+        if np.isnan(curve).all():
+            return float("nan")
+        if threshold <= curve[-1]:
+            return float(1.0 - np.interp(threshold, curve, LEVELS))
+        days = 2 * self.window + 1
+        return float(-np.log(max(self._yearly_cdf(index, slot, threshold), 1e-300)) / days)
+
+    def return_period(self, variable: str, target: date, threshold: float) -> float:
+        """Years between seasons in which some day around the target reaches the threshold."""
+        index, slot = self._slot(variable, target)
+        exceed = 1.0 - self._yearly_cdf(index, slot, threshold)
+        return float(1.0 / exceed) if exceed > 0 else float("inf")
+
+    def return_level(self, variable: str, target: date, years: float) -> float:
+        """Value reached around the target once every ``years`` seasons on average."""
+        index, slot = self._slot(variable, target)
+        return float(
+            self.gumbel_location[index, slot]
+            - self.gumbel_scale[index, slot] * np.log(-np.log(1.0 - 1.0 / years))
+        )
+
+    def save(self, path: Path) -> None:
+        """Persist the statistics to an ``.npz`` file."""
+        weather_storage.save_npz(
+            path,
+            variables=np.array(self.variables, dtype=str),
+            quantiles=self.quantiles,
+            gumbel_location=self.gumbel_location,
+            gumbel_scale=self.gumbel_scale,
+            years=self.years,
+            window=np.int64(self.window),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "ExtremeStatistics":
+        """Load statistics written by save."""
+        with np.load(path) as data:
+            return cls(
+                variables=data["variables"].tolist(),
+                quantiles=data["quantiles"],
+                gumbel_location=data["gumbel_location"],
+                gumbel_scale=data["gumbel_scale"],
+                years=data["years"],
+                window=int(data["window"]),
+            )
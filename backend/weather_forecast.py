@@ -1,14 +1,17 @@
 """Backend to fetch weather data from API."""
 
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from zoneinfo import ZoneInfo
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
 from typing import Dict, Any, Callable, List, Tuple
+import numpy as np
+import openmeteo_requests
 import requests
 
-from backend import weather_historic
+from backend import weather_anytime, weather_ensemble, weather_forecast_store, weather_historic
 
 
 IP_LOCATION_API = "http://ip-api.com/json/"
@@ -20,6 +23,27 @@ MODEL_MAP = {
     "DWD ICON": "icon_global",
     "Météo-France": "arpege_world"
 }
+# Seconds the UI waits before showing a cheaper estimate tier
+ESTIMATE_BUDGET = 0.1
+# Days served by the forecast endpoint; estimates inside it come from the model run
+FORECAST_DAYS = 16
+# Fidelity of estimates read from the fetched forecast instead of the archive models
+FIDELITY_FORECAST = "forecast"
+# Estimate keys besides temperature and rain that validate_feelings needs; archive
+# estimates have no UV index, which then counts as 0
+CONDITION_KEYS = ["Wind Speed", "Cloud Cover", "Sum snowfall"]
+# Estimate key and daily forecast variable of every value estimate_from_forecast reports
+FORECAST_ESTIMATE_KEYS = {
+    "Temperature": "temperature_2m_mean",
+    "Rainfall": "precipitation_sum",
+    "Chance of Rain": "precipitation_probability_max",
+    "Max Temperature of Day": "temperature_2m_max",
+    "Min Temperature of Day": "temperature_2m_min",
+    "Wind Speed": "wind_speed_10m_mean",
+    "Cloud Cover": "cloud_cover_mean",
+    "Sum snowfall": "snowfall_sum",
+    "UV Index": "uv_index_max",
+}
 
 def fetch_api_data(
     url: str,
@@ -66,7 +90,17 @@ def lookup_live_weather(
     params = {
         "latitude": latitude,
         "longitude": longitude,
-        "daily": "temperature_2m_max,temperature_2m_min",
+        "daily": (
+            "temperature_2m_max,"
+            "temperature_2m_min,"
+            "temperature_2m_mean,"
+            "precipitation_sum,"
+            "precipitation_probability_max,"
+            "wind_speed_10m_mean,"
+            "cloud_cover_mean,"
+            "snowfall_sum,"
+            "uv_index_max"
+        ),
         "hourly": (
             "temperature,"
             "windspeed,"
@@ -76,10 +110,19 @@ def lookup_live_weather(
             "cloudcover"
         ),
         "timezone": "auto",
+        "forecast_days": FORECAST_DAYS,
         "model": weather_models,
     }
     data = fetch_api_data(WEATHER_API, params=params, error_msg=error_msg)
     if data:
+        # Keep every run so forecasts for a day can be compared later, off the GUI thread;
+        # a refresh while the previous run of the location is still written is skipped
+        weather_historic.background_job(
+            ("record_forecast", latitude, longitude, weather_models),
+            weather_forecast_store.record_forecast,
+            data,
+            weather_models,
+        )
         return data
     if error_msg:
         error_msg(
@@ -89,6 +132,73 @@ def lookup_live_weather(
     return None
 
 
+def lookup_ensemble(
+    latitude: float,
+    longitude: float,
+    weather_models: str,
+) -> weather_ensemble.EnsembleSummary | None:
+    """Ensemble summary of a location, or None when the ensemble endpoint fails.
+
+    Callers then keep the single model's precipitation probability.
+    """
+    try:
+        return weather_ensemble.summary_for(latitude, longitude, weather_models)
+    except (openmeteo_requests.OpenMeteoRequestsError, requests.RequestException, ValueError):
+        return None
+
+
+def _ensemble_percent(chance: np.ndarray | None, index: int | None) -> float | None:
+    """An ensemble probability as a rounded percentage, None if it is unknown."""
+    if chance is None or index is None or np.isnan(chance[index]):
+        return None
+    return float(np.round(100 * chance[index]))
+
+
+def estimate_from_forecast(
+    weather_data: Dict[str, Any],
+    target_date: str,
+    ensemble: weather_ensemble.EnsembleSummary | None = None,
+) -> Dict[str, Any] | None:
+    """Shape the daily forecast of target_date like an estimate, or None beyond the horizon.
+
+    With an ensemble summary covering the day, the chance of rain is the share
+    of members with a wet day, and its percentile bands are added. Days where
+    the model has no value for one of FORECAST_ESTIMATE_KEYS also give None, so
+    the estimate falls back to the archive models instead of showing gaps.
+    """
+    daily = weather_data.get("daily", {})
+    try:
+        daily_idx = daily["time"].index(target_date)
+    except (KeyError, ValueError):
+        return None
+
+    result = {
+        key: daily[variable][daily_idx] if variable in daily else None
+        for key, variable in FORECAST_ESTIMATE_KEYS.items()
+    }
+    result["Grid Latitude"] = weather_data.get("latitude")
+    result["Grid Longitude"] = weather_data.get("longitude")
+    result["Fidelity"] = FIDELITY_FORECAST
+
+    ensemble_idx = ensemble.day_index(target_date) if ensemble is not None else None
+    chance = _ensemble_percent(
+        ensemble.daily_chance.get("precipitation") if ensemble is not None else None,
+        ensemble_idx,
+    )
+    if chance is not None:
+        percentiles = ensemble.percentiles.tolist()
+        temperature_bands = ensemble.daily_bands["temperature_2m"][:, ensemble_idx]
+        rain_bands = ensemble.daily_bands["precipitation"][:, ensemble_idx]
+        result["Chance of Rain"] = chance
+        if 10 in percentiles and 90 in percentiles:
+            result["Temperature P10"] = np.round(temperature_bands[percentiles.index(10)], 3)
+            result["Temperature P90"] = np.round(temperature_bands[percentiles.index(90)], 3)
+            result["Rainfall P90"] = np.round(rain_bands[percentiles.index(90)], 3)
+    if any(result[key] is None for key in FORECAST_ESTIMATE_KEYS):
+        return None
+    return result
+
+
 def retrieve_local_infos(
     city: str | None,
     country: str | None,
@@ -197,6 +307,103 @@ def model_ui_list() -> list[str]:
     return list(MODEL_MAP.keys())
 
 
+# Message of every expression validate_feelings can pick
+FEELINGS_MESSAGES = {
+    "Rainy": (
+        "Oh no, it will get wet ⛈️🌧️.\n"
+        "Remember to take an umbrella, wear raincoat and your favorite rainny boot!"
+    ),
+    "Rainy Night": (
+        "Raindrops are singing lullabies outside ⛈️🌧️…\n"
+        "Perfect time to cuddle and long nap 💤."
+    ),
+    "Windy": (
+        "Wooosh 💨...I'm a windmill on this day with my ears alone!\n"
+        "Hold onto your hat (and maybe me too) so we don't blow away 🍃!"
+    ),
+    "Hot": (
+        "Oh noo I have melt into a cinamon bun puddle 🫠🥮.\n"
+        "Stay cool with shade, fans, and cold lemonade!"
+    ),
+    "Hot Night": (
+        "Phew… it's still burningly hot 🌙🔥.\n"
+        "Evening watermelon and Moon gazing make the best summer night!"
+    ),
+    "Cold": (
+        "Brrr… I'm turning into a cinnamon ice cube ❄️!\n"
+        "Maybe a great condition to a build snowman, tho ☃️🌨️!\n"
+        "Keep your body warm with Mulled Wine, fluffy sock, and warm honey Cinnamon Roll."
+    ),
+    "Sunny": (
+        "Yippee! Happy non-depressive time has arrived!.\n"
+        "Blue skies, gentle breeze...let's chase clouds on the green lavender field 🪻🌾!\n"
+        "Remember to wear sunscreen and sunglasses 🕶️!"
+    ),
+    "Clear Night": (
+        "The night sky is clear and full of stars 🌗🌌.\n"
+        "I wonder what is on the other side of blackhole 🕳️?"
+    ),
+    "Cloudy": (
+        "I'm dreamy on this day. Some clouds are drifting by to say Hello ☁️.\n"
+        "Feeling cozy and soft, like a fluffy candy and marshmallow 🍡!"
+    ),
+    "Neutral": (
+        "Hmm…I feel kinda in-between ☁️.\n"
+        "Not too bad, not too great...I want to lie around all day long 🐦‍⬛."
+    ),
+    "No Idea": (
+        "My knowledge of weather at your place is like blackhole, it's magic 🕳️."
+    ),
+}
+
+
+def classify_feelings(
+    hour: Any,
+    temp: Any,
+    precipitation: Any,
+    windspeed: Any,
+    cloudcover: Any,
+    snowfall: Any,
+    uv_index: Any,
+) -> np.ndarray:
+    """Cinnamoroll's expression for arrays of weather conditions, checked in order.
+
+    Inputs broadcast against each other, so one call classifies every hour of a
+    forecast or every estimated day at once.
+    """
+    hour, temp, precipitation, windspeed, cloudcover, snowfall, uv_index = np.broadcast_arrays(
+        *(
+            np.asarray(value, dtype=np.float64)
+            for value in (hour, temp, precipitation, windspeed, cloudcover, snowfall, uv_index)
+        )
+    )
+    is_daytime = (6 <= hour) & (hour < 18)
+    # At night, UV index is always low
+    # No need sunscreen, assume 0
+    uv_index = np.where(is_daytime, uv_index, 0)
+
+    conditions = [
+        precipitation >= 40,
+        windspeed >= 30,
+        (temp >= 30) | (uv_index >= 6),
+        (temp <= 7) | (snowfall > 0),
+        (16 <= temp) & (temp <= 28) & (precipitation < 20) & (windspeed < 20)
+        & (uv_index <= 5) & (cloudcover < 30),
+        (cloudcover >= 30) & (precipitation < 20),
+        (precipitation < 20) & (((7 < temp) & (temp < 16)) | (temp > 28)),
+    ]
+    choices = [
+        np.where(is_daytime, "Rainy", "Rainy Night"),
+        "Windy",
+        np.where(is_daytime, "Hot", "Hot Night"),
+        "Cold",
+        np.where(is_daytime, "Sunny", "Clear Night"),
+        "Cloudy",
+        "Neutral",
+    ]
+    return np.select(conditions, choices, default="No Idea")
+
+
 def validate_feelings(
     current_time: datetime,
     temp: int | float,
@@ -207,91 +414,12 @@ def validate_feelings(
     uv_index: int | float,
 ) -> tuple[str, str]:
     """Cinnamoroll's emotional state based on the weather."""
-
-    emotional_state = ""
-    emotional_message = ""
-
-    hour = current_time.hour
-    is_daytime = 6 <= hour < 18
-
-    if not is_daytime:
-        # At night, UV index is always low
-        # No need sunscreen, assume 0
-        uv_index = 0
-
-    if precipitation >= 40:
-        emotional_state = "Rainy" if is_daytime else "Rainy Night"
-        emotional_message = (
-            "Oh no, it will get wet ⛈️🌧️.\n"
-            "Remember to take an umbrella, wear raincoat and your favorite rainny boot!"
-            if is_daytime else
-            "Raindrops are singing lullabies outside ⛈️🌧️…\n"
-            "Perfect time to cuddle and long nap 💤."
-        )
-
-    elif windspeed >= 30:
-        emotional_state = "Windy"
-        emotional_message = (
-            "Wooosh 💨...I'm a windmill on this day with my ears alone!\n"
-            "Hold onto your hat (and maybe me too) so we don't blow away 🍃!"
-        )
-
-    elif temp >= 30 or uv_index >= 6:
-        emotional_state = "Hot" if is_daytime else "Hot Night"
-        emotional_message = (
-            "Oh noo I have melt into a cinamon bun puddle 🫠🥮.\n"
-            "Stay cool with shade, fans, and cold lemonade!"
-            if is_daytime else
-            "Phew… it's still burningly hot 🌙🔥.\n"
-            "Evening watermelon and Moon gazing make the best summer night!"
+    emotional_state = str(
+        classify_feelings(
+            current_time.hour, temp, precipitation, windspeed, cloudcover, snowfall, uv_index
         )
-
-    elif temp <= 7 or snowfall > 0:
-        emotional_state = "Cold"
-        emotional_message = (
-            "Brrr… I'm turning into a cinnamon ice cube ❄️!\n"
-            "Maybe a great condition to a build snowman, tho ☃️🌨️!\n"
-            "Keep your body warm with Mulled Wine, fluffy sock, and warm honey Cinnamon Roll."
-        )
-
-    elif (
-        16 <= temp <= 28
-        and precipitation < 20
-        and windspeed < 20
-        and uv_index <= 5
-        and cloudcover < 30
-    ):
-        emotional_state = "Sunny" if is_daytime else "Clear Night"
-        emotional_message = (
-            "Yippee! Happy non-depressive time has arrived!.\n"
-            "Blue skies, gentle breeze...let's chase clouds on the green lavender field 🪻🌾!\n"
-            "Remember to wear sunscreen and sunglasses 🕶️!"
-            if is_daytime else
-            "The night sky is clear and full of stars 🌗🌌.\n"
-            "I wonder what is on the other side of blackhole 🕳️?"
-        )
-
-    elif cloudcover >= 30 and precipitation < 20:
-        emotional_state = "Cloudy"
-        emotional_message = (
-            "I'm dreamy on this day. Some clouds are drifting by to say Hello ☁️.\n"
-            "Feeling cozy and soft, like a fluffy candy and marshmallow 🍡!"
-        )
-
-    elif precipitation < 20 and (7 < temp < 16 or temp > 28):
-        emotional_state = "Neutral"
-        emotional_message = (
-            "Hmm…I feel kinda in-between ☁️.\n"
-            "Not too bad, not too great...I want to lie around all day long 🐦‍⬛."
-        )
-
-    else:
-        emotional_state = "No Idea"
-        emotional_message = (
-            "My knowledge of weather at your place is like blackhole, it's magic 🕳️."
-        )
-
-    return emotional_state, emotional_message
+    )
+    return emotional_state, FEELINGS_MESSAGES[emotional_state]
 
 
 def validate_est_feelings(
@@ -419,11 +547,26 @@ class WeatherData:
     weather_models: str = "ecmwf_ifs"
 
     weather_cache: Dict[str, Any] = None
+    # Raw response of the last forecast lookup, reused for estimates inside its horizon
+    forecast_cache: Dict[str, Any] | None = None
+    # Ensemble summary of the same location, for member-based chances of rain
+    ensemble_cache: weather_ensemble.EnsembleSummary | None = None
     est_weather_cache: Dict[str, Any] = None
     est_temp_expression: str = ""
     est_rain_expression: str = ""
     cinnamoroll_source: str = ""
     cinnamoroll_message: str = ""
+    # Called from the estimate worker thread with (request, refined result); the
+    # owner passes both to apply_refined_estimate on its own thread
+    on_estimate_refined: Callable[[Tuple[float, float, str], Dict[str, Any]], None] | None = None
+    _est_request: Tuple[float, float, str] | None = field(init=False, default=None)
+    # Called from the ensemble worker thread with (request, summary or None); the
+    # owner passes both to apply_ensemble. Without it the ensemble is fetched inline
+    on_ensemble_ready: Callable[
+        [Tuple[float, float, str], weather_ensemble.EnsembleSummary | None], None
+    ] | None = None
+    _ensemble_request: Tuple[float, float, str] | None = field(init=False, default=None)
+    _ensemble_pending: Tuple[float, float, str] | None = field(init=False, default=None)
 
     def __post_init__(self) -> None:
         """When first starting the app, the input for est date should be the start limit instead of empty string."""
@@ -528,6 +671,7 @@ class WeatherData:
             return None
 
         weather, daily_time, hourly_time = returned_weather
+        self.forecast_cache = weather
 
         current_time = self.get_live_local_time()
         time_format = current_time.replace(minute=0, second=0, microsecond=0)
@@ -554,11 +698,22 @@ class WeatherData:
         snowfall = weather["hourly"]["snowfall"][hourly_idx]
         uv_index = weather["hourly"]["uv_index"][hourly_idx]
 
+        # Share of ensemble members with a wet hour, rather than one model's probability
+        self.ensemble_cache = self.current_ensemble()
+        if self.ensemble_cache is not None:
+            ensemble_prob = _ensemble_percent(
+                self.ensemble_cache.hourly_chance.get("precipitation"),
+                self.ensemble_cache.hour_index(hourly_time[hourly_idx]),
+            )
+            if ensemble_prob is not None:
+                precip_prob = ensemble_prob
+
         max_temp_of_day = weather["daily"]["temperature_2m_max"][daily_idx]
         min_temp_of_day = weather["daily"]["temperature_2m_min"][daily_idx]
 
         return {
             "Today": daily_time[0],
+            "Hour": hourly_time[hourly_idx],
             "Temperature": temperature,
             "Max Temperature of Day": max_temp_of_day,
             "Min Temperature of Day": min_temp_of_day,
@@ -569,6 +724,67 @@ class WeatherData:
             "UV Index": uv_index,
         }
 
+    def current_ensemble(self) -> weather_ensemble.EnsembleSummary | None:
+        """Ensemble summary of the current run if cached, else None while it is fetched.
+
+        The fetch runs on a worker thread, at most one per request, and its
+        summary is handed to on_ensemble_ready and applied by apply_ensemble.
+        Without on_ensemble_ready it is fetched here.
+        """
+        request = (self.latitude, self.longitude, self.weather_models)
+        self._ensemble_request = request
+        summary = weather_ensemble.cached_summary(*request)
+        if summary is not None:
+            return summary
+        if self.on_ensemble_ready is None:
+            return lookup_ensemble(*request)
+        if self._ensemble_pending != request:
+            self._ensemble_pending = request
+            threading.Thread(target=self._ensemble_fetched, args=(request,), daemon=True).start()
+        return None
+
+    def _ensemble_fetched(self, request: Tuple[float, float, str]) -> None:
+        """Worker side of an ensemble fetch: only hand the summary over, never touch state here."""
+        summary = None
+        try:
+            summary = lookup_ensemble(*request)
+        finally:
+            self.on_ensemble_ready(request, summary)
+
+    def apply_ensemble(
+        self,
+        request: Tuple[float, float, str],
+        summary: weather_ensemble.EnsembleSummary | None,
+    ) -> bool:
+        """Use a fetched ensemble summary for the chance of rain, unless the request changed.
+
+        Call on the thread that owns this object. Returns whether it was applied.
+        """
+        if request == self._ensemble_pending:
+            self._ensemble_pending = None
+        if summary is None or request != self._ensemble_request or self.weather_cache is None:
+            return False
+        self.ensemble_cache = summary
+        ensemble_prob = _ensemble_percent(
+            summary.hourly_chance.get("precipitation"),
+            summary.hour_index(self.weather_cache["Hour"]),
+        )
+        if ensemble_prob is not None:
+            self.weather_cache["Chance of Rain"] = ensemble_prob
+
+        if not self.est_input_date_check:
+            self.update_live_message()
+        elif self._est_request is None and self.forecast_cache is not None:
+            # The shown estimate was read from the forecast, so it takes the members too
+            forecast_estimate = estimate_from_forecast(
+                self.forecast_cache, self.est_input_date, summary
+            )
+            if forecast_estimate is not None:
+                self.est_weather_cache = forecast_estimate
+                self.update_est_message()
+        self.cinnamoroll_emotions()
+        return True
+
     def est_date_range(
         self,
         error_msg: Callable[[str], None] | None = None
@@ -599,15 +815,94 @@ class WeatherData:
 
     def est_weather_data(
         self,
+        error_msg: Callable[[str], None] | None = None,
     ) -> Dict[str, Any] | None:
-        """Estimate weather from another model after 7 days, instead of using open-meteo like live_weather_data."""
+        """Estimate weather from another model after 7 days, instead of using open-meteo like live_weather_data.
+
+        Dates inside the FORECAST_DAYS horizon are read from the already fetched
+        forecast. Beyond it, returns within ESTIMATE_BUDGET from the cheapest
+        available source when the full model is slow, or a pending placeholder
+        when there is none; the refined estimate is handed to on_estimate_refined
+        and applied by apply_refined_estimate.
+        """
         if self.est_input_date is None:
             return None
 
-        return weather_historic.calculate_forecast(
+        if self.forecast_cache is not None:
+            forecast_estimate = estimate_from_forecast(
+                self.forecast_cache, self.est_input_date, self.ensemble_cache
+            )
+            if forecast_estimate is not None:
+                self._est_request = None
+                return forecast_estimate
+
+        self._est_request = (self.latitude, self.longitude, self.est_input_date)
+        return weather_anytime.estimate_anytime(
             self.latitude,
             self.longitude,
-            datetime.strptime(self.est_input_date, '%Y-%m-%d').date()
+            datetime.strptime(self.est_input_date, '%Y-%m-%d').date(),
+            budget=ESTIMATE_BUDGET,
+            on_refine=lambda result, request=self._est_request: self._estimate_refined(
+                request, result
+            ),
+            on_error=error_msg,
+        )
+
+    def _estimate_refined(
+        self,
+        request: Tuple[float, float, str],
+        result: Dict[str, Any],
+    ) -> None:
+        """Worker side of a refinement: only hand the result over, never touch state here."""
+        if self.on_estimate_refined:
+            self.on_estimate_refined(request, result)
+
+    def apply_refined_estimate(
+        self,
+        request: Tuple[float, float, str],
+        result: Dict[str, Any],
+    ) -> bool:
+        """Replace the shown estimate with the refined one, unless the request changed.
+
+        Call on the thread that owns this object. Returns whether it was applied.
+        """
+        if request != self._est_request or not self.est_input_date_check:
+            return False
+        self.est_weather_cache = result
+        self.update_est_message()
+        self.cinnamoroll_emotions()
+        return True
+
+    def update_est_message(self) -> None:
+        """Compose the estimated weather message and expressions from est_weather_cache."""
+        day_name = datetime.strptime(self.est_input_date, '%Y-%m-%d').strftime('%A')
+        if self.est_weather_cache.get("Fidelity") == weather_anytime.FIDELITY_PENDING:
+            # Nothing cached for this cell yet; the full estimate is applied when it arrives
+            self.est_temp_expression, self.est_rain_expression = "", ""
+            self.weather_message = (
+                f"Est. weather on {day_name}, {self.est_input_date}\n"
+                f"Estimating 🔎 grid cell {self.est_weather_cache['Grid Latitude']}, "
+                f"{self.est_weather_cache['Grid Longitude']}...\n"
+            )
+            return
+        self.est_temp_expression, self.est_rain_expression, self.cinnamoroll_message = validate_est_feelings(
+            self.get_live_local_time(),
+            self.est_weather_cache["Temperature"],
+            self.est_weather_cache["Rainfall"]
+        )
+
+        self.weather_message = (
+            f"Est. weather on {day_name}, {self.est_input_date}\n"
+            f"{self.est_temp_expression}, {self.est_rain_expression}\n"
+            f"Temperature 🌡️: {self.est_weather_cache['Temperature']} °C\n"
+            f"Rainfall ⛈️☔🌧️: {self.est_weather_cache['Rainfall']} mm\n"
+            f"Heavy rain risk ⚠️: {self.est_weather_cache.get('Chance of Heavy Rain', '-')} %\n"
+            f"Cloud ☁️: {self.est_weather_cache.get('Cloud Cover', '-')} %\n"
+            f"Wind speed 🍃: {self.est_weather_cache.get('Wind Speed', '-')} km/h\n"
+            f"Snowfall ☃️❄️: {self.est_weather_cache.get('Sum snowfall', '-')} cm\n"
+            f"UV Index 🔆: {self.est_weather_cache.get('UV Index', '-')}\n"
+            f"Grid cell 🗺️: {self.est_weather_cache['Grid Latitude']}, {self.est_weather_cache['Grid Longitude']}\n"
+            f"Estimate from 🔎: {self.est_weather_cache.get('Fidelity', weather_anytime.FIDELITY_FULL)}\n"
         )
 
     def auto_weather_update(
@@ -624,38 +919,30 @@ class WeatherData:
             return None
 
         if self.est_input_date_check:
-            day_name = datetime.strptime(self.est_input_date, '%Y-%m-%d').strftime('%A')
-            self.est_weather_cache = self.est_weather_data()
+            self.est_weather_cache = self.est_weather_data(error_msg)
             if self.est_weather_cache is None:
                 if error_msg:
                     error_msg("Failed to fetch estimated weather data.")
                 return None
 
-            self.est_temp_expression, self.est_rain_expression, self.cinnamoroll_message = validate_est_feelings(
-                self.get_live_local_time(),
-                self.est_weather_cache["Temperature"],
-                self.est_weather_cache["Chance of Rain"]
-            )
-
-            self.weather_message = (
-                f"Est. weather on {day_name}, {self.est_input_date}\n"
-                f"{self.est_temp_expression}, {self.est_rain_expression}\n"
-                f"Temperature 🌡️: {self.est_weather_cache['Temperature']} °C\n"
-                f"Rainfall ⛈️☔🌧️: {self.est_weather_cache['Rainfall']} mm\n"
-            )
+            self.update_est_message()
         else:
-            day_name = datetime.strptime(self.selected_date, '%Y-%m-%d').strftime('%A')
-            self.weather_message = (
-                f"Weather on {day_name}, {self.selected_date}\n"
-                f"Temperature 🌡️: {self.weather_cache['Temperature']} °C\n"
-                f"Min. 🌡️: {self.weather_cache['Min Temperature of Day']} °C\n"
-                f"Max. 🌡️: {self.weather_cache['Max Temperature of Day']} °C\n"
-                f"Cloud ☁️: {self.weather_cache['Cloud Cover']} %\n"
-                f"Precipitation ☔🌧️: {self.weather_cache['Chance of Rain']} %\n"
-                f"Wind speed 🍃: {self.weather_cache['Wind Speed']} km/h\n"
-                f"Snowfall ☃️❄️: {self.weather_cache['Sum snowfall']} cm\n"
-                f"UV Index 🔆: {self.weather_cache['UV Index']}"
-            )
+            self.update_live_message()
+
+    def update_live_message(self) -> None:
+        """Compose the live weather message from weather_cache."""
+        day_name = datetime.strptime(self.selected_date, '%Y-%m-%d').strftime('%A')
+        self.weather_message = (
+            f"Weather on {day_name}, {self.selected_date}\n"
+            f"Temperature 🌡️: {self.weather_cache['Temperature']} °C\n"
+            f"Min. 🌡️: {self.weather_cache['Min Temperature of Day']} °C\n"
+            f"Max. 🌡️: {self.weather_cache['Max Temperature of Day']} °C\n"
+            f"Cloud ☁️: {self.weather_cache['Cloud Cover']} %\n"
+            f"Precipitation ☔🌧️: {self.weather_cache['Chance of Rain']} %\n"
+            f"Wind speed 🍃: {self.weather_cache['Wind Speed']} km/h\n"
+            f"Snowfall ☃️❄️: {self.weather_cache['Sum snowfall']} cm\n"
+            f"UV Index 🔆: {self.weather_cache['UV Index']}"
+        )
 
     def get_live_local_time(self) -> datetime:
         """Update the live local time of user's location input every 1 second."""
@@ -671,8 +958,25 @@ class WeatherData:
                 error_msg("Failed to fetch weather data.")
             return None
 
-        if self.est_input_date_check:
-            # Check temp emotion for now only
+        if (
+            self.est_input_date_check
+            and self.est_weather_cache is not None
+            and all(self.est_weather_cache.get(key) is not None for key in CONDITION_KEYS)
+        ):
+            # Estimates with every condition go through the same classifier as live data
+            expression, self.cinnamoroll_message = validate_feelings(
+                self.get_live_local_time(),
+                self.est_weather_cache["Temperature"],
+                self.est_weather_cache["Chance of Rain"],
+                self.est_weather_cache["Wind Speed"],
+                self.est_weather_cache["Cloud Cover"],
+                self.est_weather_cache["Sum snowfall"],
+                self.est_weather_cache.get("UV Index", 0),
+            )
+            self.cinnamoroll_source = f"../resources/cinnamoroll/{expression}.png"
+
+        elif self.est_input_date_check:
+            # Tile estimates only have temperature and rain
             if self.est_temp_expression == "Very Cold":
                 self.cinnamoroll_source = f"../resources/cinnamoroll/Rainy.png"
             elif self.est_temp_expression == "Cold":
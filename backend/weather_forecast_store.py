@@ -0,0 +1,313 @@
+"""Append-only history of fetched forecasts in SQLite.
+
+Every forecast response becomes one row per (cell, model, run time), where the
+cell is the model grid point Open-Meteo answered for and the run time is when
+it was fetched. The hourly block is kept as one zlib-compressed float32
+(variable, hour) blob, with its valid time span in indexed columns; the daily
+block, on the local calendar of the location, is kept the same way. A response
+identical to the latest stored run of the same cell and model is not stored
+again, so polling does not grow the store.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from backend import weather_storage
+
+STORE_PATH = weather_storage.CACHE_DIR / "forecasts" / "history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    cell TEXT NOT NULL,
+    model TEXT NOT NULL,
+    run_time INTEGER NOT NULL,
+    valid_start INTEGER NOT NULL,
+    valid_end INTEGER NOT NULL,
+    interval INTEGER NOT NULL,
+    variables TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    daily_start INTEGER,
+    daily_variables TEXT,
+    daily_payload BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_by_run ON runs (cell, model, run_time);
+CREATE INDEX IF NOT EXISTS runs_by_valid ON runs (cell, model, valid_start, valid_end);
+"""
+# Columns added after the first version of the schema, with their SQL type
+_ADDED_COLUMNS = {
+    "daily_start": "INTEGER",
+    "daily_variables": "TEXT",
+    "daily_payload": "BLOB",
+}
+
+
+@dataclass
+class ForecastRange:
+    """Forecasts of one variable from several runs on a shared hourly axis.
+
+    ``values`` has shape (run, valid time); hours a run did not cover are NaN.
+    Times are UTC datetime64[s].
+    """
+
+    run_times: np.ndarray
+    valid_times: np.ndarray
+    values: np.ndarray
+
+
+@dataclass
+class DailyRun:
+    """The daily block of one stored run; ``values`` has shape (variable, day)."""
+
+    run_time: np.datetime64
+    start: np.datetime64
+    variables: List[str]
+    values: np.ndarray
+
+    def series(self, variable: str) -> np.ndarray:
+        """One daily variable, NaN if the run did not include it."""
+        if variable not in self.variables:
+            return np.full(self.values.shape[1], np.nan, dtype=np.float32)
+        return self.values[self.variables.index(variable)]
+
+
+def _pack(block: Dict[str, Any]) -> Tuple[List[str], bytes]:
+    """Variable names and compressed float32 (variable, time) payload of a block."""
+    variables = [name for name in block if name != "time"]
+    values = np.array([block[name] for name in variables], dtype=np.float32)
+    return variables, zlib.compress(values.tobytes())
+
+
+def _unpack(variables: str, payload: bytes) -> Tuple[List[str], np.ndarray]:
+    """Inverse of _pack, with the variable list as stored JSON."""
+    names = json.loads(variables)
+    block = np.frombuffer(zlib.decompress(payload), dtype=np.float32)
+    return names, block.reshape(len(names), -1)
+
+
+def _epoch(local_time: str, utc_offset: int) -> int:
+    """UTC epoch seconds of an Open-Meteo local ISO time."""
+    naive = datetime.fromisoformat(local_time).replace(tzinfo=timezone.utc)
+    return int(naive.timestamp()) - utc_offset
+
+
+def cell_of(weather_data: Dict[str, Any]) -> str:
+    """Key of the model grid point a forecast response was computed for."""
+    return weather_storage.location_key(weather_data["latitude"], weather_data["longitude"])
+
+
+class ForecastStore:
+    """Thread-safe handle on the forecast history database."""
+
+    def __init__(self, path: Path = STORE_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+            existing = {row[1] for row in self._connection.execute("PRAGMA table_info(runs)")}
+            for column, sql_type in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    self._connection.execute(f"ALTER TABLE runs ADD COLUMN {column} {sql_type}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def record(
+        self,
+        weather_data: Dict[str, Any],
+        model: str,
+        fetched_at: datetime | None = None,
+    ) -> int:
+        """Store the hourly block of a forecast response and return its run id.
+
+        If it equals the latest stored run of the same cell and model, that
+        run's id is returned and nothing is written.
+        """
+        hourly = weather_data["hourly"]
+        variables, payload = _pack(hourly)
+        utc_offset = int(weather_data.get("utc_offset_seconds", 0))
+        times = hourly["time"]
+        valid_start = _epoch(times[0], utc_offset)
+        valid_end = _epoch(times[-1], utc_offset)
+        interval = (valid_end - valid_start) // max(len(times) - 1, 1)
+
+        header = json.dumps([variables, valid_start, interval]).encode()
+        digest = hashlib.sha1(header + payload).hexdigest()
+        cell = cell_of(weather_data)
+        run_time = int((fetched_at or datetime.now(timezone.utc)).timestamp())
+        daily_start, daily_variables, daily_payload = None, None, None
+        if weather_data.get("daily", {}).get("time"):
+            daily = weather_data["daily"]
+            daily_start = int(np.datetime64(daily["time"][0], "D").astype(np.int64))
+            names, daily_payload = _pack(daily)
+            daily_variables = json.dumps(names)
+
+        with self._lock, self._connection:
+            latest = self._connection.execute(
+                "SELECT run_id, digest FROM runs WHERE cell = ? AND model = ?"
+                " ORDER BY run_time DESC LIMIT 1",
+                (cell, model),
+            ).fetchone()
+            if latest is not None and latest[1] == digest:
+                return int(latest[0])
+            cursor = self._connection.execute(
+                "INSERT INTO runs (cell, model, run_time, valid_start, valid_end, interval,"
+                " variables, digest, payload, daily_start, daily_variables, daily_payload)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    cell,
+                    model,
+                    run_time,
+                    valid_start,
+                    valid_end,
+                    interval,
+                    json.dumps(variables),
+                    digest,
+                    payload,
+                    daily_start,
+                    daily_variables,
+                    daily_payload,
+                ),
+            )
+            return int(cursor.lastrowid)
+
+    def runs(
+        self,
+        cell: str,
+        model: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> List[Tuple[int, datetime]]:
+        """Run ids and fetch times of a cell and model, oldest first."""
+        low = int(since.timestamp()) if since else 0
+        high = int(until.timestamp()) if until else 2 ** 62
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT run_id, run_time FROM runs WHERE cell = ? AND model = ?"
+                " AND run_time BETWEEN ? AND ? ORDER BY run_time",
+                (cell, model, low, high),
+            ).fetchall()
+        return [
+            (int(run_id), datetime.fromtimestamp(run_time, timezone.utc))
+            for run_id, run_time in rows
+        ]
+
+    def range(
+        self,
+        cell: str,
+        model: str,
+        variable: str,
+        valid_from: datetime,
+        valid_to: datetime,
+        runs_since: datetime | None = None,
+    ) -> ForecastRange:
+        """Every stored run's forecast of a variable between two valid times.
+
+        Only runs whose valid span overlaps the window are read, through the
+        valid-time index. The result shows how the forecast for the window
+        evolved from run to run.
+        """
+        low, high = int(valid_from.timestamp()), int(valid_to.timestamp())
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT run_time, valid_start, interval, variables, payload FROM runs"
+                " WHERE cell = ? AND model = ? AND valid_start <= ? AND valid_end >= ?"
+                " AND run_time >= ? ORDER BY run_time",
+                (cell, model, high, low, int(runs_since.timestamp()) if runs_since else 0),
+            ).fetchall()
+
+        step = rows[0][2] if rows else 3600
+        first = low - low % step
+        valid_times = np.arange(first, high + 1, step)
+        values = np.full((len(rows), valid_times.size), np.nan, dtype=np.float32)
+        for index, (_, valid_start, interval, variables, payload) in enumerate(rows):
+            names, block = _unpack(variables, payload)
+            if variable not in names:
+                continue
+            series = block[names.index(variable)]
+            series_times = valid_start + interval * np.arange(series.size)
+            position = np.searchsorted(valid_times, series_times)
+            inside = (position < valid_times.size) & (
+                valid_times[np.minimum(position, valid_times.size - 1)] == series_times
+            )
+            values[index, position[inside]] = series[inside]
+
+        return ForecastRange(
+            run_times=np.array([row[0] for row in rows], dtype="datetime64[s]"),
+            valid_times=valid_times.astype("datetime64[s]"),
+            values=values,
+        )
+
+    def daily_runs(
+        self,
+        cell: str,
+        model: str,
+        since: datetime | None = None,
+    ) -> List[DailyRun]:
+        """Daily blocks of every run of a cell and model, oldest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT run_time, daily_start, daily_variables, daily_payload FROM runs"
+                " WHERE cell = ? AND model = ? AND run_time >= ? AND daily_payload IS NOT NULL"
+                " ORDER BY run_time",
+                (cell, model, int(since.timestamp()) if since else 0),
+            ).fetchall()
+        runs = []
+        for run_time, daily_start, variables, payload in rows:
+            names, values = _unpack(variables, payload)
+            runs.append(DailyRun(
+                run_time=np.datetime64(run_time, "s"),
+                start=np.datetime64(daily_start, "D"),
+                variables=names,
+                values=values,
+            ))
+        return runs
+
+    def cells(self) -> List[Tuple[str, str]]:
+        """Every (cell, model) pair with stored runs."""
+        with self._lock:
+            return [
+                (cell, model)
+                for cell, model in self._connection.execute(
+                    "SELECT DISTINCT cell, model FROM runs ORDER BY cell, model"
+                )
+            ]
+
+
+_STORE: ForecastStore | None = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> ForecastStore:
+    """The process-wide forecast store, opened on first use."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ForecastStore()
+        return _STORE
+
+
+def record_forecast(weather_data: Dict[str, Any], model: str) -> int | None:
+    """Record a fetched forecast in the shared store; best effort.
+
+    A failing store must never break the live weather path, so database
+    errors and malformed responses are swallowed and None is returned.
+    """
+    try:
+        return get_store().record(weather_data, model)
+    except (sqlite3.Error, OSError, KeyError, TypeError, ValueError):
+        return None
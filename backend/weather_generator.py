@@ -0,0 +1,208 @@
+"""Stochastic daily weather generator fitted to an archive.
+
+Wet/dry days follow a first-order Markov chain, wet-day amounts a gamma
+distribution and temperature anomalies an AR(1) process. Every parameter
+varies with the calendar slot of weather_climatology.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable
+
+import numpy as np
+
+from backend import weather_climatology, weather_storage
+
+CALENDAR_DAYS = weather_climatology.CALENDAR_DAYS
+# Beyond this lead the chain has forgotten the last observed day, so the
+# simulation starts this many days before the target from climatology
+BURN_IN_DAYS = 30
+HEAVY_RAIN = 10.0
+
+
+def _window_sum(per_slot: np.ndarray, window: int) -> np.ndarray:
+    """Circular sum over ±window calendar slots."""
+    kernel = np.ones(2 * window + 1)
+    padded = np.concatenate([per_slot[-window:], per_slot, per_slot[:window]])
+    return np.convolve(padded, kernel, mode="valid")
+
+
+def _slot_sum(slots: np.ndarray, weights: np.ndarray, window: int) -> np.ndarray:
+    """Sum of weights per calendar slot, pooled over ±window slots."""
+    return _window_sum(np.bincount(slots, weights, minlength=CALENDAR_DAYS), window)
+
+
+@dataclass
+class GeneratorParameters:
+    """Per-slot generator parameters, each array of length CALENDAR_DAYS."""
+
+    p_wet_after_dry: np.ndarray
+    p_wet_after_wet: np.ndarray
+    gamma_shape: np.ndarray
+    gamma_scale: np.ndarray
+    temperature_mean: np.ndarray
+    temperature_std: np.ndarray
+    temperature_lag1: float
+    last_date: date
+    last_wet: bool
+    last_anomaly: float
+
+    @classmethod
+    def fit(
+        cls,
+        dates: np.ndarray,
+        temperature: np.ndarray,
+        rain: np.ndarray,
+        window: int = 15,
+        wet_threshold: float = weather_climatology.WET_DAY_THRESHOLD,
+    ) -> "GeneratorParameters":
+        """Fit all parameters with bincount reductions over the daily archive."""
+        dates = np.asarray(dates).astype("datetime64[D]")
+        temperature = np.asarray(temperature, dtype=np.float64)
+        rain = np.asarray(rain, dtype=np.float64)
+        slots = weather_climatology.day_of_year_slots(dates)
+
+        # Markov chain transitions, counted on the slot of the second day
+        has_rain = ~np.isnan(rain)
+        wet = has_rain & (rain >= wet_threshold)
+        pair = has_rain[1:] & has_rain[:-1]
+        after_dry = (pair & ~wet[:-1]).astype(np.float64)
+        after_wet = (pair & wet[:-1]).astype(np.float64)
+        wet_today = wet[1:].astype(np.float64)
+        next_slots = slots[1:]
+        p_wet_after_dry = (
+            (_slot_sum(next_slots, after_dry * wet_today, window) + 0.5)
+            / (_slot_sum(next_slots, after_dry, window) + 1.0)
+        )
+        p_wet_after_wet = (
+            (_slot_sum(next_slots, after_wet * wet_today, window) + 0.5)
+            / (_slot_sum(next_slots, after_wet, window) + 1.0)
+        )
+
+        # Gamma amounts with Thom's approximate maximum likelihood estimator
+        excess = np.where(wet, rain - wet_threshold, 0.0) + 1e-3
+        wet_count = np.maximum(_slot_sum(slots, wet.astype(np.float64), window), 1.0)
+        mean = _slot_sum(slots, np.where(wet, excess, 0.0), window) / wet_count
+        log_mean = _slot_sum(slots, np.where(wet, np.log(excess), 0.0), window) / wet_count
+        spread = np.maximum(np.log(np.maximum(mean, 1e-3)) - log_mean, 1e-3)
+        gamma_shape = (1.0 + np.sqrt(1.0 + 4.0 * spread / 3.0)) / (4.0 * spread)
+        gamma_scale = np.maximum(mean, 1e-3) / gamma_shape
+
+        # Temperature mean/std per slot and lag-1 correlation of the anomalies
+        has_temp = ~np.isnan(temperature)
+        filled = np.where(has_temp, temperature, 0.0)
+        count = np.maximum(_slot_sum(slots, has_temp.astype(np.float64), window), 1.0)
+        temperature_mean = _slot_sum(slots, filled, window) / count
+        variance = _slot_sum(slots, filled ** 2, window) / count - temperature_mean ** 2
+        temperature_std = np.sqrt(np.maximum(variance, 1e-6))
+        anomaly = (temperature - temperature_mean[slots]) / temperature_std[slots]
+        both = has_temp[1:] & has_temp[:-1]
+        temperature_lag1 = (
+            float(np.corrcoef(anomaly[:-1][both], anomaly[1:][both])[0, 1])
+            if both.sum() > 2 else 0.0
+        )
+
+        last = int(np.flatnonzero(has_rain & has_temp)[-1])
+        return cls(
+            p_wet_after_dry=p_wet_after_dry,
+            p_wet_after_wet=p_wet_after_wet,
+            gamma_shape=gamma_shape,
+            gamma_scale=gamma_scale,
+            temperature_mean=temperature_mean,
+            temperature_std=temperature_std,
+            temperature_lag1=temperature_lag1,
+            last_date=dates[last].item(),
+            last_wet=bool(wet[last]),
+            last_anomaly=float(anomaly[last]),
+        )
+
+    def wet_frequency(self) -> np.ndarray:
+        """Stationary wet-day probability of the chain per slot."""
+        return self.p_wet_after_dry / (
+            1.0 - self.p_wet_after_wet + self.p_wet_after_dry
+        )
+
+    def simulate(
+        self,
+        target: date,
+        realizations: int = 10_000,
+        seed: int | None = None,
+    ) -> Dict[str, np.ndarray]:
+        """Simulate the target day, vectorized across realizations.
+
+        Returns ``"rain"`` (mm) and ``"temperature"`` (°C) arrays with one value
+        per realization.
+        """
+        rng = np.random.default_rng(seed)
+        lead = (target - self.last_date).days
+        if lead < 1:
+            raise ValueError(f"{target} is not after the archive end {self.last_date}.")
+
+        start = max(lead - BURN_IN_DAYS, 0)
+        days = np.arange(start + 1, lead + 1).astype("timedelta64[D]")
+        slots = weather_climatology.day_of_year_slots(
+            np.datetime64(self.last_date, "D") + days
+        )
+        if start == 0:
+            wet = np.full(realizations, self.last_wet)
+            anomaly = np.full(realizations, self.last_anomaly)
+        else:
+            first_slot = slots[0]
+            wet = rng.random(realizations) < self.wet_frequency()[first_slot]
+            anomaly = rng.standard_normal(realizations)
+
+        phi = self.temperature_lag1
+        innovation = np.sqrt(max(1.0 - phi ** 2, 0.0))
+        for slot in slots:
+            p_wet = np.where(wet, self.p_wet_after_wet[slot], self.p_wet_after_dry[slot])
+            wet = rng.random(realizations) < p_wet
+            anomaly = phi * anomaly + innovation * rng.standard_normal(realizations)
+
+        slot = slots[-1]
+        amounts = rng.gamma(self.gamma_shape[slot], self.gamma_scale[slot], realizations)
+        rain = np.where(wet, weather_climatology.WET_DAY_THRESHOLD + amounts, 0.0)
+        temperature = self.temperature_mean[slot] + self.temperature_std[slot] * anomaly
+        return {"rain": rain, "temperature": temperature}
+
+    def save(self, path: Path) -> None:
+        """Persist the parameters to an ``.npz`` file."""
+        values = {field.name: getattr(self, field.name) for field in fields(self)}
+        values["last_date"] = np.datetime64(self.last_date, "D")
+        weather_storage.save_npz(path, **values)
+
+    @classmethod
+    def load(cls, path: Path) -> "GeneratorParameters":
+        """Load parameters written by save."""
+        with np.load(path) as data:
+            return cls(
+                p_wet_after_dry=data["p_wet_after_dry"],
+                p_wet_after_wet=data["p_wet_after_wet"],
+                gamma_shape=data["gamma_shape"],
+                gamma_scale=data["gamma_scale"],
+                temperature_mean=data["temperature_mean"],
+                temperature_std=data["temperature_std"],
+                temperature_lag1=float(data["temperature_lag1"]),
+                last_date=data["last_date"].item(),
+                last_wet=bool(data["last_wet"]),
+                last_anomaly=float(data["last_anomaly"]),
+            )
+
+
+def rain_risk(
+    simulation: Dict[str, np.ndarray],
+    thresholds: Iterable[float] = (weather_climatology.WET_DAY_THRESHOLD, HEAVY_RAIN),
+    percentiles: Iterable[float] = (10, 50, 90),
+) -> Dict[str, float]:
+    """Reduce simulated realizations to exceedance probabilities and bands."""
+    rain, temperature = simulation["rain"], simulation["temperature"]
+    percentiles = list(percentiles)
+    risk = {
+        f"P(rain >= {threshold:g} mm)": float(np.mean(rain >= threshold))
+        for threshold in thresholds
+    }
+    for q, value in zip(percentiles, np.percentile(rain, percentiles)):
+        risk[f"rain p{q:g}"] = float(value)
+    for q, value in zip(percentiles, np.percentile(temperature, percentiles)):
+        risk[f"temperature p{q:g}"] = float(value)
+    return risk
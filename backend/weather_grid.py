@@ -0,0 +1,36 @@
+"""Snap coordinates to the grid of the reanalysis behind the archive."""
+
+from typing import Tuple
+
+# Grid spacing in degrees. ERA5-Land backs the archive over land, ERA5 elsewhere
+GRID_RESOLUTION = {
+    "era5": 0.25,
+    "era5_land": 0.1,
+    "none": 0.0,
+}
+
+
+def snap_to_grid(
+    latitude: float,
+    longitude: float,
+    grid: str = "era5_land",
+) -> Tuple[float, float]:
+    """Nearest node of the grid, i.e. the coordinate rounded to the grid spacing.
+
+    Grid nodes are where the reanalysis has its values, so every coordinate
+    within half a spacing of a node shares its cached archives and fits.
+    The ``"none"`` grid keeps full precision.
+    """
+    if grid not in GRID_RESOLUTION:
+        raise ValueError(
+            f"Unknown grid {grid!r}, expected one of {', '.join(GRID_RESOLUTION)}."
+        )
+    resolution = GRID_RESOLUTION[grid]
+    if resolution <= 0:
+        return latitude, longitude
+
+    snapped_latitude = min(max(round(latitude / resolution) * resolution, -90.0), 90.0)
+    snapped_longitude = round(longitude / resolution) * resolution
+    snapped_longitude = (snapped_longitude + 180.0) % 360.0 - 180.0
+    # Rounding strips float noise such as 52.50000000000001 from cache keys
+    return round(snapped_latitude, 4), round(snapped_longitude, 4)
@@ -1,87 +1,1301 @@
+import os
+import threading
+import time
+import warnings
+import zlib
 import openmeteo_requests
 
 import numpy as np
-import pandas as pd
-import requests_cache
-from retry_requests import retry
-from typing import Dict
-
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
 
 from datetime import date
 from dateutil.relativedelta import relativedelta
 
+from backend import (
+    weather_analogs,
+    weather_client,
+    weather_climatology,
+    weather_codec,
+    weather_extremes,
+    weather_generator,
+    weather_grid,
+    weather_holtwinters,
+    weather_storage,
+    weather_tiles,
+    weather_tuning,
+)
+
 WEATHER_HISTORY_API = "https://archive-api.open-meteo.com/v1/archive"
+# Every input of the emotion engine, fetched together in one archive request
+DAILY_VARIABLES = [
+    "rain_sum",
+    "temperature_2m_mean",
+    "wind_speed_10m_mean",
+    "cloud_cover_mean",
+    "snowfall_sum",
+]
+# live_weather_data key and archive variable of the climatological conditions,
+# reported as the window median like the typical hourly value live data shows
+# (daily mean wind, not its gusty maximum). The archive has no UV index.
+CONDITION_VARIABLES = [
+    ("Wind Speed", "wind_speed_10m_mean"),
+    ("Cloud Cover", "cloud_cover_mean"),
+    ("Sum snowfall", "snowfall_sum"),
+]
+# Archive ingestion: year chunks in parallel; the shared client retries each request
+ARCHIVE_WORKERS = 4
+ARCHIVE_TIMEOUT = 30
+# Reanalysis days younger than this may still be revised, so they are not cached
+ARCHIVE_FINAL_DAYS = 90
+# Final history is fetched and cached in aligned blocks of this many years
+ARCHIVE_CHUNK_YEARS = 10
+# First day of the ERA5 reanalysis served by the archive
+ERA5_START = date(1940, 1, 1)
+SEASONAL_PERIODS = 365
+DEFAULT_HISTORY_YEARS = 10
 
-def calculate_forecast(
-    latitude: float,
-    longitude: float,
-    specified_date: date
+
+def _history_years(depth: str) -> int:
+    """Years of history from a WEATHER_HISTORY_YEARS value.
+
+    A positive count, or "all" for everything since ERA5_START. Anything else
+    warns and falls back to DEFAULT_HISTORY_YEARS instead of failing the import.
+    """
+    if depth.strip().lower() == "all":
+        return date.today().year - ERA5_START.year + 1
+    try:
+        years = int(depth)
+    except ValueError:
+        years = 0
+    if years < 1:
+        warnings.warn(
+            f"WEATHER_HISTORY_YEARS={depth!r} is neither a positive number of years nor "
+            f"'all', using {DEFAULT_HISTORY_YEARS}.",
+            stacklevel=2,
+        )
+        return DEFAULT_HISTORY_YEARS
+    return years
+
+
+# Years behind the climatology and generator statistics; "all" reaches back to ERA5_START
+HISTORY_YEARS = _history_years(
+    os.environ.get("WEATHER_HISTORY_YEARS", str(DEFAULT_HISTORY_YEARS))
+)
+# Holt-Winters only needs a few cycles and its recursion is sequential in time
+FIT_YEARS = 10
+# A stored state is fully refitted in the background once it is this old
+STATE_REFIT_DAYS = 30
+# Stored states of another version are refitted (2: fitted on decoded local dates)
+STATE_VERSION = "2"
+# Days on each side of the target date pooled by the climatology
+CLIMATOLOGY_WINDOW = 7
+# Smoothing (level, seasonal) used by calculate_forecast. The models have no trend
+# Untuned (alpha, gamma); smoothing_for tunes them per cell
+TEMP_SMOOTHING = (0.0, 0.1)
+RAIN_SMOOTHING = (0.1, 0.3)
+REALIZATIONS = 10_000
+# Past days pooled by estimate_analogs
+ANALOG_COUNT = 20
+# Recent days fetched to find the latest observed analog window
+ANALOG_RECENT_DAYS = 21
+# Return period of the levels reported by estimate_extremes
+RETURN_YEARS = 10
+# Fast mode: Holt-Winters on weekly means, spread back onto days by the climatology
+FAST_RESAMPLE_DAYS = 7
+FAST_SEASONAL_PERIODS = 52
+# Archive, fits and climatology are cached per cell of this grid (see weather_grid)
+ARCHIVE_GRID = os.environ.get("WEATHER_ARCHIVE_GRID", "era5_land")
+
+# In-memory cache of per-location models: (kind, location key) -> (built date, model)
+_LOCATION_MODELS: Dict[Tuple[str, str], Tuple[date, Any]] = {}
+# Final archive chunks by cache file, kept encoded and decoded on access
+_ARCHIVE_CHUNKS: Dict[Path, Dict[str, weather_codec.EncodedSeries]] = {}
+# Futures of the background jobs currently running by key, see background_job
+_BACKGROUND_JOBS: Dict[Tuple[Any, ...], Future] = {}
+_BACKGROUND_LOCK = threading.Lock()
+
+
+def grid_cell(latitude: float, longitude: float) -> Tuple[float, float]:
+    """Cell of ARCHIVE_GRID whose archive and cached models serve a coordinate."""
+    return weather_grid.snap_to_grid(latitude, longitude, ARCHIVE_GRID)
+
+
+def estimate_result(
+    temperature: float,
+    rain: float,
+    chance_of_rain: float | None = None
 ) -> Dict[str, float]:
-    """Estimate weather from another model after 7 days, instead of using open-meteo like live_weather_data function in weather_forecast.py"""
-    last_updated_date = date.today() - relativedelta(days=5) # Docs say 5 day lag but in reality less date(2025, 10, 2)
+    """Shape an estimated temperature/rain pair like live_weather_data output.
+
+    The chance of rain is an empirical wet-day frequency in %, NaN when unknown.
+    """
+    temperature, rain = float(temperature), float(rain)
+    if chance_of_rain is None:
+        chance_of_rain = np.nan
+    return {
+        "Temperature": np.round(temperature, 3),
+        "Rainfall": np.round(rain),
+        "Chance of Rain": np.round(chance_of_rain, 3),
+        "Max Temperature of Day": np.round(temperature, 3),
+        "Min Temperature of Day": np.round(temperature, 3)
+    }
+
+
+def decode_daily(daily: Any, utc_offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode a daily block into local datetime64[D] dates and a (variable, day) array.
+
+    Dates come straight from ``Time()``/``Interval()``; timestamps are GMT+0,
+    so they are shifted by the UTC offset to land on local calendar days. The
+    order of variables is the order they were requested in.
+    """
+    n_variables = daily.VariablesLength()
+    values = np.stack(
+        [daily.Variables(i).ValuesAsNumpy() for i in range(n_variables)]
+    ).astype(np.float32, copy=False)
+    seconds = daily.Time() + utc_offset + daily.Interval() * np.arange(values.shape[1])
+    return seconds.astype("datetime64[s]").astype("datetime64[D]"), values
+
 
-    future_days = (specified_date - last_updated_date).days
+def history_start(last_updated_date: date, years: int | None = None) -> date:
+    """First day of ``years`` (default HISTORY_YEARS) of archive, not before ERA5_START."""
+    years = HISTORY_YEARS if years is None else years
+    return max(last_updated_date - relativedelta(years=years), ERA5_START)
 
-    # Setup the Open-Meteo API client with cache and retry on error
-    cache_session = requests_cache.CachedSession('.cache', expire_after = 3600)
-    retry_session = retry(cache_session, retries = 5, backoff_factor = 0.2)
-    openmeteo = openmeteo_requests.Client(session = retry_session)
 
+def archive_chunks(start_date: date, end_date: date) -> List[Tuple[date, date, bool]]:
+    """Split a date range into chunks of ARCHIVE_CHUNK_YEARS or single years.
+
+    Blocks of ARCHIVE_CHUNK_YEARS that are final (ended more than
+    ARCHIVE_FINAL_DAYS ago) are widened to the whole block and flagged cacheable,
+    so decades of history cost a few requests and files and their cache key does
+    not move with the requested range. Otherwise the range is split into years:
+    final years are widened and cacheable, recent years only cover the
+    requested days.
+    """
+    final_before = date.today() - relativedelta(days=ARCHIVE_FINAL_DAYS)
+    chunks = []
+    year = start_date.year
+    while year <= end_date.year:
+        block_year = year - year % ARCHIVE_CHUNK_YEARS
+        block_end = date(block_year + ARCHIVE_CHUNK_YEARS - 1, 12, 31)
+        if block_end < final_before:
+            chunks.append((date(block_year, 1, 1), block_end, True))
+            year = block_end.year + 1
+            continue
+        year_start, year_end = date(year, 1, 1), date(year, 12, 31)
+        if year_end < final_before:
+            chunks.append((year_start, year_end, True))
+        else:
+            chunks.append((max(start_date, year_start), min(end_date, year_end), False))
+        year += 1
+    return chunks
+
+
+def _request_archive_chunk(
+    latitude: float,
+    longitude: float,
+    chunk_start: date,
+    chunk_end: date,
+    variables: List[str]
+) -> np.ndarray:
+    """Request one chunk as a (variable, day) array."""
     params = {
         "latitude": latitude,
         "longitude": longitude,
-        "start_date": (last_updated_date - relativedelta(years=10)).strftime("%Y-%m-%d"),
-        "end_date": last_updated_date.strftime("%Y-%m-%d"),
-        "daily": ["rain_sum", "temperature_2m_mean"],
+        "start_date": chunk_start.strftime("%Y-%m-%d"),
+        "end_date": chunk_end.strftime("%Y-%m-%d"),
+        "daily": variables,
         "timezone": "auto",
     }
-    responses = openmeteo.weather_api(WEATHER_HISTORY_API, params=params)
+    response = weather_client.get_client().weather_api(
+        WEATHER_HISTORY_API, params=params, timeout=ARCHIVE_TIMEOUT
+    )[0]
+    dates, values = decode_daily(response.Daily(), response.UtcOffsetSeconds())
+
+    # Place the decoded days on the requested calendar, in case the API trimmed any
+    n_days = (chunk_end - chunk_start).days + 1
+    chunk = np.full((len(variables), n_days), np.nan, dtype=np.float32)
+    offset = (dates - np.datetime64(chunk_start, "D")).astype(np.int64)
+    inside = (offset >= 0) & (offset < n_days)
+    chunk[:, offset[inside]] = values[:, inside]
+    return chunk
+
+
+def _archive_chunk(
+    latitude: float,
+    longitude: float,
+    chunk_start: date,
+    chunk_end: date,
+    variables: List[str],
+    cacheable: bool
+) -> np.ndarray:
+    """One chunk as a (variable, day) array, from the chunk cache when possible.
+
+    Cached chunks keep every variable ever requested, so asking for a new
+    variable merges it into the existing file. They are stored with
+    weather_codec, so values are quantized to the codec scale, and stay
+    encoded in memory once read. Multi-year blocks are first assembled from
+    single-year files cached before blocks existed, and those files are
+    removed once their block is stored.
+    """
+    if not cacheable:
+        return _request_archive_chunk(latitude, longitude, chunk_start, chunk_end, variables)
+
+    path = _chunk_path(latitude, longitude, chunk_start, chunk_end)
+    stored = _ARCHIVE_CHUNKS.get(path)
+    if stored is None:
+        stored = _load_chunk(latitude, longitude, chunk_start, chunk_end)
+    if not all(variable in stored for variable in variables):
+        values = _request_archive_chunk(latitude, longitude, chunk_start, chunk_end, variables)
+        stored = {**stored, **weather_codec.encode(dict(zip(variables, values)))}
+        _save_chunk(path, stored)
+        _remove_year_chunks(latitude, longitude, chunk_start, chunk_end)
+    _ARCHIVE_CHUNKS[path] = stored
+    return np.stack([stored[variable].decode() for variable in variables])
+
+
+def _chunk_path(latitude: float, longitude: float, chunk_start: date, chunk_end: date) -> Path:
+    """Cache file of one archive chunk of a location."""
+    return weather_storage.cache_path(
+        "archive",
+        weather_storage.location_key(latitude, longitude),
+        f"{chunk_start.isoformat()}_{chunk_end.isoformat()}.npz",
+    )
+
+
+def _year_paths(
+    latitude: float,
+    longitude: float,
+    chunk_start: date,
+    chunk_end: date
+) -> List[Path]:
+    """Single-year chunk files a multi-year block replaces."""
+    if chunk_end.year == chunk_start.year:
+        return []
+    return [
+        _chunk_path(latitude, longitude, date(year, 1, 1), date(year, 12, 31))
+        for year in range(chunk_start.year, chunk_end.year + 1)
+    ]
+
+
+def _load_chunk(
+    latitude: float,
+    longitude: float,
+    chunk_start: date,
+    chunk_end: date
+) -> Dict[str, weather_codec.EncodedSeries]:
+    """Encoded variables of a cached chunk, assembled from its year files if needed."""
+    path = _chunk_path(latitude, longitude, chunk_start, chunk_end)
+    if path.exists():
+        with np.load(path) as data:
+            return weather_codec.load_arrays(data)
+
+    year_paths = _year_paths(latitude, longitude, chunk_start, chunk_end)
+    if not year_paths or not all(year_path.exists() for year_path in year_paths):
+        return {}
+    years = []
+    for year_path in year_paths:
+        with np.load(year_path) as data:
+            years.append(weather_codec.from_arrays(data))
+    assembled = weather_codec.encode({
+        variable: np.concatenate([year[variable] for year in years])
+        for variable in years[0]
+        if all(variable in year for year in years)
+    })
+    if assembled:
+        _save_chunk(path, assembled)
+        _remove_year_chunks(latitude, longitude, chunk_start, chunk_end)
+    return assembled
+
+
+def _save_chunk(path: Path, encoded: Dict[str, weather_codec.EncodedSeries]) -> None:
+    """Atomically write the encoded variables of a chunk."""
+    weather_storage.save_npz(path, compressed=True, **weather_codec.to_arrays(encoded))
+
+
+def _remove_year_chunks(
+    latitude: float,
+    longitude: float,
+    chunk_start: date,
+    chunk_end: date
+) -> None:
+    """Delete single-year chunk files superseded by their block."""
+    for year_path in _year_paths(latitude, longitude, chunk_start, chunk_end):
+        year_path.unlink(missing_ok=True)
+
+
+def fetch_daily_archive(
+    latitude: float,
+    longitude: float,
+    start_date: date,
+    end_date: date,
+    variables: List[str] | None = None
+) -> Dict[str, Any]:
+    """Request daily variables between two dates (inclusive), local calendar days.
+
+    The range is split into year chunks downloaded in parallel. Each chunk is
+    copied straight into one preallocated buffer and finished years are cached
+    on their own, so a failed or repeated request only fetches missing chunks.
+    """
+    variables = list(variables or DAILY_VARIABLES)
+    n_days = (end_date - start_date).days + 1
+    buffer = np.full((len(variables), n_days), np.nan, dtype=np.float32)
+
+    chunks = archive_chunks(start_date, end_date)
+    with ThreadPoolExecutor(max_workers=ARCHIVE_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                _archive_chunk, latitude, longitude, chunk_start, chunk_end, variables, cacheable
+            ): chunk_start
+            for chunk_start, chunk_end, cacheable in chunks
+        }
+        for future, chunk_start in futures.items():
+            values = future.result()
+            # Chunks may be wider than the request, keep the overlapping days
+            offset = (chunk_start - start_date).days
+            first = max(-offset, 0)
+            last = min(values.shape[1], n_days - offset)
+            if last > first:
+                buffer[:, offset + first:offset + last] = values[:, first:last]
+
+    daily_data: Dict[str, Any] = {
+        "date": np.arange(start_date, end_date + relativedelta(days=1), dtype="datetime64[D]")
+    }
+    daily_data.update(zip(variables, buffer))
+    return daily_data
+
+
+def archive_dataframe(
+    latitude: float,
+    longitude: float,
+    start_date: date,
+    end_date: date,
+    variables: List[str] | None = None
+) -> Any:
+    """Daily archive as a pandas DataFrame indexed by date, for ad-hoc analysis.
+
+    pandas is imported here only, so the estimate path never pays its import.
+    """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    daily_data = fetch_daily_archive(latitude, longitude, start_date, end_date, variables)
+    return pd.DataFrame(daily_data).set_index("date")
+
+
+def _observed_values(daily_data: Dict[str, Any]) -> Tuple[np.ndarray, date | None]:
+    """Stack (temperature, rain) and drop the trailing days not published yet.
+
+    Returns the values and the date of the last observed day, or None when the
+    archive has nothing new.
+    """
+    values = np.stack(
+        [daily_data["temperature_2m_mean"], daily_data["rain_sum"]]
+    ).astype(np.float64)
+    observed = np.flatnonzero(~np.isnan(values).any(axis=0))
+    if observed.size == 0:
+        return values[:, :0], None
+    end = observed[-1] + 1
+    return values[:, :end], daily_data["date"][end - 1].item()
+
+
+def _state_path(latitude: float, longitude: float) -> Path:
+    """Where the Holt-Winters state of a location is persisted."""
+    key = weather_storage.location_key(latitude, longitude)
+    return weather_storage.cache_path("holtwinters", f"{key}.npz")
+
+
+def _load_state(
+    latitude: float,
+    longitude: float
+) -> Tuple[weather_holtwinters.HoltWintersState, Dict[str, str]]:
+    """Stored state of a location; a state of another STATE_VERSION counts as missing."""
+    state, metadata = weather_holtwinters.load_state(_state_path(latitude, longitude))
+    if metadata.get("version") != STATE_VERSION:
+        raise ValueError(f"Stale Holt-Winters state for {latitude}, {longitude}.")
+    return state, metadata
+
+
+def background_job(
+    key: Tuple[Any, ...],
+    target: Callable[..., Any],
+    *args: Any
+) -> Tuple[Future, bool]:
+    """Run target(*args) on a daemon thread unless a job with the same key is running.
+
+    Returns the future of the job with that key, new or already running, and
+    whether this call started it, so repeated requests for one cell never
+    stack runs and can share the running one's result. The future is resolved
+    before the key is released.
+    """
+    with _BACKGROUND_LOCK:
+        if key in _BACKGROUND_JOBS:
+            return _BACKGROUND_JOBS[key], False
+        future: Future = Future()
+        _BACKGROUND_JOBS[key] = future
+
+    def run() -> None:
+        try:
+            future.set_result(target(*args))
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with _BACKGROUND_LOCK:
+                _BACKGROUND_JOBS.pop(key, None)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future, True
+
+
+def _run_in_background(key: Tuple[Any, ...], target: Callable[..., Any], *args: Any) -> bool:
+    """Start a background_job and return whether a thread was started."""
+    return background_job(key, target, *args)[1]
+
+
+def _refit_state(
+    latitude: float,
+    longitude: float,
+    last_updated_date: date,
+    tune: bool = True
+) -> Tuple[weather_holtwinters.HoltWintersState, date]:
+    """Fit temperature and rain from scratch over the archive and persist the state.
+
+    With ``tune=False`` the fit uses the cached smoothing parameters of the
+    cell (or the defaults) instead of tuning them when they are due.
+    """
+    daily_data = fetch_daily_archive(
+        latitude,
+        longitude,
+        history_start(last_updated_date, FIT_YEARS),
+        last_updated_date,
+    )
+    values, last_date = _observed_values(daily_data)
+    if last_date is None:
+        raise ValueError(f"No archive data for {latitude}, {longitude}.")
+
+    smoothing = smoothing_for(latitude, longitude, last_updated_date, fetch=tune)
+    state = weather_holtwinters.fit(
+        values, SEASONAL_PERIODS, alpha=smoothing.alpha, gamma=smoothing.gamma
+    )
+    weather_holtwinters.save_state(
+        state,
+        _state_path(latitude, longitude),
+        version=STATE_VERSION,
+        last_date=last_date.isoformat(),
+        refit_date=date.today().isoformat(),
+    )
+    return state, last_date
+
+
+def _holt_winters_state(
+    latitude: float,
+    longitude: float,
+    last_updated_date: date
+) -> Tuple[weather_holtwinters.HoltWintersState, date]:
+    """Load the persisted state of a location and advance it through new archive days.
+
+    Only the days after the stored state are requested, so a daily refresh costs
+    O(new days). A missing state is fitted with the cached smoothing parameters;
+    tuning them, refitting once they differ from the state's, and the refit
+    every STATE_REFIT_DAYS run in the background and replace the state. At most
+    one refit per cell runs at a time.
+    """
+    path = _state_path(latitude, longitude)
+    try:
+        state, metadata = _load_state(latitude, longitude)
+        last_date = date.fromisoformat(metadata["last_date"])
+        refit_date = date.fromisoformat(metadata["refit_date"])
+    except (OSError, KeyError, ValueError):
+        state, last_date = _refit_state(latitude, longitude, last_updated_date, tune=False)
+        if not _model_cached("smoothing", latitude, longitude):
+            _run_in_background(
+                ("refit", latitude, longitude), _refit_state, latitude, longitude, last_updated_date
+            )
+        return state, last_date
+
+    smoothing = smoothing_for(latitude, longitude, fetch=False)
+    retuned = not (
+        np.allclose(state.alpha, smoothing.alpha) and np.allclose(state.gamma, smoothing.gamma)
+    )
+
+    if last_date < last_updated_date:
+        daily_data = fetch_daily_archive(
+            latitude, longitude, last_date + relativedelta(days=1), last_updated_date
+        )
+        values, new_last_date = _observed_values(daily_data)
+        if new_last_date is not None:
+            weather_holtwinters.smooth(state, values)
+            last_date = new_last_date
+            weather_holtwinters.save_state(
+                state,
+                path,
+                version=STATE_VERSION,
+                last_date=last_date.isoformat(),
+                refit_date=refit_date.isoformat(),
+            )
+
+    if retuned or (date.today() - refit_date).days >= STATE_REFIT_DAYS:
+        _run_in_background(
+            ("refit", latitude, longitude), _refit_state, latitude, longitude, last_updated_date
+        )
+
+    return state, last_date
+
+
+def _model_cached(kind: str, latitude: float, longitude: float) -> bool:
+    """Whether a per-location model of a grid cell is cached, however old."""
+    key = weather_storage.location_key(*grid_cell(latitude, longitude))
+    return (kind, key) in _LOCATION_MODELS or weather_storage.cache_path(kind, f"{key}.npz").exists()
+
+
+def _location_model(
+    kind: str,
+    latitude: float,
+    longitude: float,
+    last_updated_date: date | None,
+    build: Callable[[Dict[str, Any]], Any],
+    load: Callable[[Path], Any],
+    fetch: bool = True,
+) -> Any:
+    """Per-location model built from the archive, cached in memory and on disk.
+
+    The archive is fetched and the model built once; it is rebuilt after
+    STATE_REFIT_DAYS. Models provide ``save(path)``. With ``fetch=False`` only
+    caches are consulted and None is returned when nothing is cached.
+    """
+    if last_updated_date is None:
+        last_updated_date = date.today() - relativedelta(days=5)
+    key = weather_storage.location_key(latitude, longitude)
+
+    cached = _LOCATION_MODELS.get((kind, key))
+    if cached is not None and (date.today() - cached[0]).days < STATE_REFIT_DAYS:
+        return cached[1]
+
+    path = weather_storage.cache_path(kind, f"{key}.npz")
+    built_date = date.fromtimestamp(path.stat().st_mtime) if path.exists() else None
+    if built_date is not None and (date.today() - built_date).days < STATE_REFIT_DAYS:
+        model = load(path)
+    elif not fetch:
+        return load(path) if path.exists() else None
+    else:
+        model = build(
+            fetch_daily_archive(
+                latitude,
+                longitude,
+                history_start(last_updated_date),
+                last_updated_date,
+            )
+        )
+        model.save(path)
+        built_date = date.today()
+
+    _LOCATION_MODELS[(kind, key)] = (built_date, model)
+    return model
+
+
+def climatology_for(
+    latitude: float,
+    longitude: float,
+    last_updated_date: date | None = None,
+    fetch: bool = True
+) -> weather_climatology.Climatology:
+    """Day-of-year climatology of a location.
+
+    Returns None only with ``fetch=False`` when nothing is cached yet.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    return _location_model(
+        "climatology",
+        latitude,
+        longitude,
+        last_updated_date,
+        lambda daily_data: weather_climatology.Climatology.build(
+            daily_data["date"],
+            {variable: daily_data[variable] for variable in DAILY_VARIABLES},
+        ),
+        weather_climatology.Climatology.load,
+        fetch,
+    )
+
+
+def smoothing_for(
+    latitude: float,
+    longitude: float,
+    last_updated_date: date | None = None,
+    fetch: bool = True
+) -> weather_tuning.SmoothingParameters:
+    """Holt-Winters smoothing parameters tuned on the last FIT_YEARS of a location.
+
+    Falls back to TEMP_SMOOTHING and RAIN_SMOOTHING with ``fetch=False`` when
+    nothing is cached, or when the archive is too short to tune on.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    try:
+        smoothing = _location_model(
+            "smoothing",
+            latitude,
+            longitude,
+            last_updated_date,
+            lambda daily_data: weather_tuning.SmoothingParameters.tune(
+                _observed_values(daily_data)[0][:, -FIT_YEARS * 365:], SEASONAL_PERIODS
+            ),
+            weather_tuning.SmoothingParameters.load,
+            fetch,
+        )
+    except ValueError:
+        smoothing = None
+    if smoothing is None:
+        return weather_tuning.SmoothingParameters.default(TEMP_SMOOTHING, RAIN_SMOOTHING)
+    return smoothing
+
+
+def save_smoothing(
+    latitude: float,
+    longitude: float,
+    smoothing: weather_tuning.SmoothingParameters
+) -> None:
+    """Store parameters tuned elsewhere (e.g. weather_pool.tune_many) for a cell."""
+    latitude, longitude = grid_cell(latitude, longitude)
+    key = weather_storage.location_key(latitude, longitude)
+    smoothing.save(weather_storage.cache_path("smoothing", f"{key}.npz"))
+    _LOCATION_MODELS[("smoothing", key)] = (date.today(), smoothing)
+
+
+def generator_for(
+    latitude: float,
+    longitude: float,
+    last_updated_date: date | None = None,
+    fetch: bool = True
+) -> weather_generator.GeneratorParameters:
+    """Stochastic weather generator fitted to the archive of a location.
+
+    Returns None only with ``fetch=False`` when nothing is cached yet.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    return _location_model(
+        "generator",
+        latitude,
+        longitude,
+        last_updated_date,
+        lambda daily_data: weather_generator.GeneratorParameters.fit(
+            daily_data["date"],
+            daily_data["temperature_2m_mean"],
+            daily_data["rain_sum"],
+        ),
+        weather_generator.GeneratorParameters.load,
+        fetch,
+    )
+
+
+def analogs_for(
+    latitude: float,
+    longitude: float,
+    last_updated_date: date | None = None,
+    fetch: bool = True
+) -> weather_analogs.AnalogIndex:
+    """Analog index over the archive of a location.
 
-    # Process first location. Add a for-loop for multiple locations or weather models
-    response = responses[0]
-    # print(f"Coordinates: {response.Latitude()}°N {response.Longitude()}°E")
-    # print(f"Elevation: {response.Elevation()} m asl")
-    # print(f"Timezone: {response.Timezone()}{response.TimezoneAbbreviation()}")
-    # print(f"Timezone difference to GMT+0: {response.UtcOffsetSeconds()}s")
+    Returns None only with ``fetch=False`` when nothing is cached yet.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    return _location_model(
+        "analogs",
+        latitude,
+        longitude,
+        last_updated_date,
+        lambda daily_data: weather_analogs.AnalogIndex.build(daily_data["date"], daily_data),
+        weather_analogs.AnalogIndex.load,
+        fetch,
+    )
 
-    # Process daily data. The order of variables needs to be the same as requested.
-    daily = response.Daily()
-    daily_rain_sum = daily.Variables(0).ValuesAsNumpy()
-    daily_temperature_2m_mean = daily.Variables(1).ValuesAsNumpy()
 
-    # Create Pandas DataFrame
-    daily_data = {"date": pd.date_range(
-        start = pd.to_datetime(daily.Time(), unit = "s", utc = True),
-        end = pd.to_datetime(daily.TimeEnd(), unit = "s", utc = True),
-        freq = pd.Timedelta(seconds = daily.Interval()),
-        inclusive = "left"
-    )}
+def extremes_for(
+    latitude: float,
+    longitude: float,
+    last_updated_date: date | None = None,
+    fetch: bool = True
+) -> weather_extremes.ExtremeStatistics:
+    """Tail statistics of a location, precomputed from its archive.
+
+    Returns None only with ``fetch=False`` when nothing is cached yet.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    return _location_model(
+        "extremes",
+        latitude,
+        longitude,
+        last_updated_date,
+        lambda daily_data: weather_extremes.ExtremeStatistics.build(
+            weather_climatology.Climatology.build(
+                daily_data["date"],
+                {
+                    variable: daily_data[variable]
+                    for variable in weather_extremes.EXTREME_VARIABLES
+                },
+            )
+        ),
+        weather_extremes.ExtremeStatistics.load,
+        fetch,
+    )
+
 
-    daily_data["rain_sum"] = daily_rain_sum
-    daily_data["temperature_2m_mean"] = daily_temperature_2m_mean
+def _weather_conditions(summary: Dict[str, np.ndarray], index: int = 0) -> Dict[str, float]:
+    """Median wind, cloud and snow of a climatology summary, keyed like live_weather_data.
 
-    daily_dataframe = pd.DataFrame(data = daily_data)
-    daily_dataframe["date"] = pd.to_datetime(daily_dataframe["date"]).dt.tz_convert(None)
-    daily_dataframe = daily_dataframe.set_index("date")
+    The summary needs the 50th percentile. Variables missing from a
+    climatology cached before they were fetched are left out.
+    """
+    conditions = {}
+    for key, variable in CONDITION_VARIABLES:
+        median = summary.get(f"{variable} p50")
+        if median is not None and not np.isnan(median[index]):
+            conditions[key] = np.round(float(median[index]), 3)
+    return conditions
 
-    # baseline
-    # print(f"baseline: {daily_dataframe[(daily_dataframe.index.month==specified_date.month) & (daily_dataframe.index.day == specified_date.day)].mean()}")
 
-    # Holt Winter Exponential Smoothing
-    temp_model = ExponentialSmoothing(daily_data["temperature_2m_mean"], seasonal="add", seasonal_periods=365).fit(0.0, 0.2, 0.1)
-    temp_forecast = temp_model.forecast(steps=future_days)
+def _simulation_seed(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+    last_date: date
+) -> int:
+    """Generator seed of a cell, target day and archive end.
 
-    rain_model = ExponentialSmoothing(daily_data["rain_sum"], seasonal="add", seasonal_periods=365).fit(0.1, 0.3, 0.3)
-    rain_forecast = rain_model.forecast(steps=future_days)
+    Asking for the same day twice gives the same risk, until the archive grows.
+    """
+    key = f"{weather_storage.location_key(latitude, longitude)}_{specified_date}_{last_date}"
+    return zlib.crc32(key.encode())
 
-    # print(f"{[(temp, rain) for (temp, rain) in zip(temp_forecast, rain_forecast)]}")
 
+def estimate_rain_risk(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+    realizations: int = REALIZATIONS
+) -> Dict[str, float]:
+    """Rain probabilities and percentile bands from simulated realizations of the day."""
+    latitude, longitude = grid_cell(latitude, longitude)
+    generator = generator_for(latitude, longitude)
+    simulation = generator.simulate(
+        specified_date,
+        realizations,
+        seed=_simulation_seed(latitude, longitude, specified_date, generator.last_date),
+    )
+    return weather_generator.rain_risk(simulation)
+
+
+def estimate_climatology(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+    window: int = CLIMATOLOGY_WINDOW
+) -> Dict[str, float]:
+    """Estimate weather from the archive climatology of the target day.
+
+    Once the climatology is cached this is a handful of array reductions.
+    Besides the usual keys it reports 10th/90th percentile bands.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    summary = climatology_for(latitude, longitude).summary([specified_date], window)
+    result = estimate_result(
+        summary["temperature_2m_mean mean"][0],
+        summary["rain_sum mean"][0],
+        100 * summary["wet_day_frequency"][0],
+    )
+    result["Temperature P10"] = np.round(summary["temperature_2m_mean p10"][0], 3)
+    result["Temperature P90"] = np.round(summary["temperature_2m_mean p90"][0], 3)
+    result["Rainfall P90"] = np.round(summary["rain_sum p90"][0], 3)
+    result.update(_weather_conditions(summary))
+    result["Grid Latitude"] = latitude
+    result["Grid Longitude"] = longitude
+    return result
+
+
+def estimate_analogs(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+    k: int = ANALOG_COUNT
+) -> Dict[str, float]:
+    """Estimate weather from what followed the past weeks most like the latest one.
+
+    The latest observed archive week, fetched fresh since the index may be up
+    to STATE_REFIT_DAYS old, is matched against every week of the same season;
+    the estimate pools the k analogs at the lead of the target day. "Analog
+    Distance" is their mean distance in standardized units.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    index = analogs_for(latitude, longitude)
+    recent = fetch_daily_archive(
+        latitude,
+        longitude,
+        date.today() - relativedelta(days=ANALOG_RECENT_DAYS),
+        date.today() - relativedelta(days=1),
+        weather_analogs.FEATURE_VARIABLES,
+    )
+    values, last_date = _observed_values(recent)
+    feature = None
+    if last_date is not None and values.shape[1] >= index.window:
+        feature = index.window_feature(
+            recent["date"][:values.shape[1]],
+            dict(zip(weather_analogs.FEATURE_VARIABLES, values)),
+        )
+    if feature is None or np.isnan(feature).any():
+        # Nothing recent published yet, fall back to the last week of the index
+        observed = np.flatnonzero(~np.isnan(index.values).any(axis=0))
+        last_date, feature = index.dates[observed[-1]].item(), None
+    lead = max((specified_date - last_date).days, 1)
+
+    analogs = index.query(last_date, k, horizon=lead, feature=feature)
+    temperature, rain = analogs.at_lead(lead).T
+    result = estimate_result(
+        np.nanmean(temperature),
+        np.nanmean(rain),
+        100 * np.mean(rain >= weather_climatology.WET_DAY_THRESHOLD),
+    )
+    result["Analog Distance"] = np.round(float(analogs.distances.mean()), 3)
+    result["Grid Latitude"] = latitude
+    result["Grid Longitude"] = longitude
+    return result
+
+
+def estimate_extremes(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+    rain_threshold: float = 20.0
+) -> Dict[str, float]:
+    """Tail risks of the target day from the precomputed extreme-value statistics.
+
+    Reports the chance (%) of a day around the target reaching rain_threshold,
+    how many years pass on average between seasons where it happens, and the
+    RETURN_YEARS rain and temperature levels.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    extremes = extremes_for(latitude, longitude)
     return {
-        "Temperature": np.round(temp_forecast[-1], 3),
-        "Rainfall": np.round(rain_forecast[-1]),
-        "Chance of Rain": np.round(min(rain_forecast[-1] * 10, 100), 3),
-        "Max Temperature of Day": np.round(temp_forecast[-1], 3),
-        "Min Temperature of Day": np.round(temp_forecast[-1], 3)
+        f"P(rain >= {rain_threshold:g} mm)": np.round(
+            100 * extremes.exceedance_probability("rain_sum", specified_date, rain_threshold), 3
+        ),
+        "Rain Return Period": np.round(
+            extremes.return_period("rain_sum", specified_date, rain_threshold), 3
+        ),
+        f"Rainfall {RETURN_YEARS}-year Level": np.round(
+            extremes.return_level("rain_sum", specified_date, RETURN_YEARS), 3
+        ),
+        f"Temperature {RETURN_YEARS}-year Level": np.round(
+            extremes.return_level("temperature_2m_mean", specified_date, RETURN_YEARS), 3
+        ),
+        "Grid Latitude": latitude,
+        "Grid Longitude": longitude,
     }
 
+
+def estimate_from_tiles(
+    latitude: float,
+    longitude: float,
+    specified_date: date
+) -> Dict[str, float] | None:
+    """Estimate weather from a precomputed climatology tile, without any request.
+
+    Returns None when no tile covers the location.
+    """
+    values = weather_tiles.lookup(latitude, longitude, specified_date)
+    if values is None:
+        return None
+    result = estimate_result(
+        values["temperature_2m_mean"],
+        values["rain_sum"],
+        100 * values["wet_day_frequency"],
+    )
+    result["Chance of Heavy Rain"] = np.round(100 * values["heavy_rain_frequency"], 3)
+    result["Grid Latitude"], result["Grid Longitude"] = grid_cell(latitude, longitude)
+    return result
+
+
+def estimate_from_cache(
+    latitude: float,
+    longitude: float,
+    specified_date: date
+) -> Dict[str, float] | None:
+    """Estimate weather from the models already cached for the cell, without requests.
+
+    Uses the stored Holt-Winters state as is (not advanced to today) and the
+    cached climatology and generator. Returns None when nothing is cached.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    climatology = climatology_for(latitude, longitude, fetch=False)
+    generator = generator_for(latitude, longitude, fetch=False)
+    try:
+        state, metadata = _load_state(latitude, longitude)
+        last_date = date.fromisoformat(metadata["last_date"])
+    except (OSError, KeyError, ValueError):
+        state = None
+
+    summary = (
+        climatology.summary([specified_date], CLIMATOLOGY_WINDOW, percentiles=[50])
+        if climatology is not None else None
+    )
+    chance_of_rain = 100 * summary["wet_day_frequency"][0] if summary else None
+    if state is not None:
+        future_days = max((specified_date - last_date).days, 1)
+        temp_forecast, rain_forecast = weather_holtwinters.forecast(state, future_days)
+        result = estimate_result(temp_forecast[-1], rain_forecast[-1], chance_of_rain)
+    elif summary is not None:
+        result = estimate_result(
+            summary["temperature_2m_mean mean"][0],
+            summary["rain_sum mean"][0],
+            chance_of_rain,
+        )
+    else:
+        return None
+    if summary is not None:
+        result.update(_weather_conditions(summary))
+
+    if generator is not None and specified_date > generator.last_date:
+        seed = _simulation_seed(latitude, longitude, specified_date, generator.last_date)
+        risk = weather_generator.rain_risk(
+            generator.simulate(specified_date, REALIZATIONS, seed=seed)
+        )
+        result["Chance of Heavy Rain"] = np.round(
+            100 * risk[f"P(rain >= {weather_generator.HEAVY_RAIN:g} mm)"], 3
+        )
+    result["Grid Latitude"] = latitude
+    result["Grid Longitude"] = longitude
+    return result
+
+
+def build_climatology_tile(
+    name: str,
+    south: float,
+    west: float,
+    north: float,
+    east: float
+) -> Path:
+    """Build a climatology tile over a bounding box on the ARCHIVE_GRID cells.
+
+    Every cell's archive goes through climatology_for, so cells already cached
+    are not requested again.
+    """
+    resolution = weather_grid.GRID_RESOLUTION[ARCHIVE_GRID]
+    if resolution <= 0:
+        raise ValueError("Tiles need a snapping grid, ARCHIVE_GRID is 'none'.")
+    south, west = grid_cell(south, west)
+    north, east = grid_cell(north, east)
+    return weather_tiles.build_tile(
+        name, south, west, north, east, resolution, climatology_for
+    )
+
+
+def calculate_forecast(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+    prefer_tiles: bool = True
+) -> Dict[str, float]:
+    """Estimate weather from another model after 7 days, instead of using open-meteo like live_weather_data function in weather_forecast.py
+
+    With ``prefer_tiles``, a cell with neither a stored state nor a cached
+    climatology is answered from a climatology tile when one covers it, and
+    the full model is built in the background so the next call refines it.
+
+    Holt-Winters runs on the NumPy kernel, started from the first-cycle
+    heuristic of weather_holtwinters.initial_state instead of the initial
+    values statsmodels used to estimate. From the same start both agree to
+    1e-9; against the old estimated start, forecasts move by a fraction of a
+    degree with the same hold-out error (tests/test_weather_holtwinters.py).
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    last_updated_date = date.today() - relativedelta(days=5) # Docs say 5 day lag but in reality less date(2025, 10, 2)
+
+    if (
+        prefer_tiles
+        and not _state_path(latitude, longitude).exists()
+        and climatology_for(latitude, longitude, fetch=False) is None
+    ):
+        tile_estimate = estimate_from_tiles(latitude, longitude, specified_date)
+        if tile_estimate is not None:
+            _run_in_background(
+                ("forecast", latitude, longitude),
+                calculate_forecast, latitude, longitude, specified_date, False,
+            )
+            return tile_estimate
+
+    # Holt Winter Exponential Smoothing, advanced incrementally from the stored state
+    try:
+        state, last_date = _holt_winters_state(latitude, longitude, last_updated_date)
+    except openmeteo_requests.OpenMeteoRequestsError:
+        # Offline: answer from a precomputed climatology tile if one covers the place
+        tile_estimate = estimate_from_tiles(latitude, longitude, specified_date)
+        if tile_estimate is None:
+            raise
+        return tile_estimate
+    future_days = max((specified_date - last_date).days, 1)
+
+    temp_forecast, rain_forecast = weather_holtwinters.forecast(state, future_days)
+
+    # Chance of rain is the empirical wet-day frequency around the target day
+    summary = climatology_for(latitude, longitude, last_updated_date).summary(
+        [specified_date], CLIMATOLOGY_WINDOW
+    )
+
+    result = estimate_result(
+        temp_forecast[-1], rain_forecast[-1], 100 * summary["wet_day_frequency"][0]
+    )
+    result.update(_weather_conditions(summary))
+
+    # Risk bands from the stochastic weather generator
+    risk = estimate_rain_risk(latitude, longitude, specified_date)
+    result["Chance of Heavy Rain"] = np.round(
+        100 * risk[f"P(rain >= {weather_generator.HEAVY_RAIN:g} mm)"], 3
+    )
+    result["Rainfall P90"] = np.round(risk["rain p90"], 3)
+    result["Grid Latitude"] = latitude
+    result["Grid Longitude"] = longitude
+    return result
+
+
+def _daily_profile(
+    climatology: weather_climatology.Climatology,
+    last_date: date,
+    days: int
+) -> np.ndarray:
+    """Climatological (temperature, rain) of the ``days`` days after last_date."""
+    targets = (np.datetime64(last_date, "D") + np.arange(1, days + 1)).tolist()
+    summary = climatology.summary(targets, CLIMATOLOGY_WINDOW, percentiles=[])
+    return np.stack([summary["temperature_2m_mean mean"], summary["rain_sum mean"]])
+
+
+def _fast_forecast(
+    values: np.ndarray,
+    steps: int,
+    profile_for: Callable[[int], np.ndarray],
+    n_locations: int = 1
+) -> np.ndarray:
+    """Daily forecast of stacked (temperature..., rain...) series from a weekly fit.
+
+    The series are averaged into weeks, fitted with a 52-week season and the
+    weekly forecast is spread back onto days with ``profile_for(days)``, the
+    climatological daily profile of the forecast days in the same row order.
+    A 52-week year drifts 1.25 days a year against the calendar, which the
+    daily profile absorbs.
+    """
+    weekly = weather_holtwinters.resample(values, FAST_RESAMPLE_DAYS)
+    state = weather_holtwinters.fit(
+        weekly,
+        FAST_SEASONAL_PERIODS,
+        alpha=np.repeat([TEMP_SMOOTHING[0], RAIN_SMOOTHING[0]], n_locations),
+        gamma=np.repeat([TEMP_SMOOTHING[1], RAIN_SMOOTHING[1]], n_locations),
+    )
+    weeks = -(-steps // FAST_RESAMPLE_DAYS)
+    daily = weather_holtwinters.disaggregate(
+        weather_holtwinters.forecast(state, weeks),
+        profile_for(weeks * FAST_RESAMPLE_DAYS),
+        FAST_RESAMPLE_DAYS,
+    )
+    return daily[:, :steps]
+
+
+def calculate_forecast_fast(
+    latitude: float,
+    longitude: float,
+    specified_date: date
+) -> Dict[str, float]:
+    """Estimate weather like calculate_forecast from a weekly Holt-Winters fit.
+
+    Fitting 52 weekly slots instead of 365 daily ones is about 7 times faster,
+    at the accuracy cost reported by fast_fit_accuracy. Meant for previews and
+    batch sweeps; no state is persisted.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    last_updated_date = date.today() - relativedelta(days=5)
+    daily_data = fetch_daily_archive(
+        latitude,
+        longitude,
+        history_start(last_updated_date, FIT_YEARS),
+        last_updated_date,
+    )
+    values, last_date = _observed_values(daily_data)
+    if last_date is None:
+        raise ValueError(f"No archive data for {latitude}, {longitude}.")
+    climatology = climatology_for(latitude, longitude, last_updated_date)
+
+    steps = max((specified_date - last_date).days, 1)
+    temperature, rain = _fast_forecast(
+        values, steps, lambda days: _daily_profile(climatology, last_date, days)
+    )[:, -1]
+    summary = climatology.summary([specified_date], CLIMATOLOGY_WINDOW, percentiles=[])
+
+    result = estimate_result(temperature, rain, 100 * summary["wet_day_frequency"][0])
+    result["Grid Latitude"] = latitude
+    result["Grid Longitude"] = longitude
+    return result
+
+
+def fast_fit_accuracy(
+    latitude: float,
+    longitude: float,
+    holdout_days: int = 365
+) -> Dict[str, float]:
+    """Compare the weekly fast fit with the full daily fit on a hold-out window.
+
+    Both models are fitted on the archive minus its last ``holdout_days`` days
+    and forecast that window. Reports the fit times, the mean absolute error of
+    each against the observations and of the fast forecast against the daily one.
+    """
+    latitude, longitude = grid_cell(latitude, longitude)
+    last_updated_date = date.today() - relativedelta(days=5)
+    daily_data = fetch_daily_archive(
+        latitude,
+        longitude,
+        history_start(last_updated_date, FIT_YEARS),
+        last_updated_date,
+    )
+    values, last_date = _observed_values(daily_data)
+    if last_date is None:
+        raise ValueError(f"No archive data for {latitude}, {longitude}.")
+    train, observed = values[:, :-holdout_days], values[:, -holdout_days:]
+    train_dates = daily_data["date"][:train.shape[1]]
+    climatology = weather_climatology.Climatology.build(
+        train_dates, {"temperature_2m_mean": train[0], "rain_sum": train[1]}
+    )
+
+    started = time.perf_counter()
+    state = weather_holtwinters.fit(
+        train,
+        SEASONAL_PERIODS,
+        alpha=[TEMP_SMOOTHING[0], RAIN_SMOOTHING[0]],
+        gamma=[TEMP_SMOOTHING[1], RAIN_SMOOTHING[1]],
+    )
+    daily = weather_holtwinters.forecast(state, holdout_days)
+    daily_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fast = _fast_forecast(
+        train,
+        holdout_days,
+        lambda days: _daily_profile(climatology, train_dates[-1].item(), days),
+    )
+    fast_seconds = time.perf_counter() - started
+
+    daily_error = np.nanmean(np.abs(daily - observed), axis=1)
+    fast_error = np.nanmean(np.abs(fast - observed), axis=1)
+    difference = np.mean(np.abs(fast - daily), axis=1)
+    return {
+        "Daily Fit Seconds": daily_seconds,
+        "Fast Fit Seconds": fast_seconds,
+        "Daily Temperature MAE": float(daily_error[0]),
+        "Daily Rainfall MAE": float(daily_error[1]),
+        "Fast Temperature MAE": float(fast_error[0]),
+        "Fast Rainfall MAE": float(fast_error[1]),
+        "Fast vs Daily Temperature MAE": float(difference[0]),
+        "Fast vs Daily Rainfall MAE": float(difference[1]),
+    }
+
+
+def calculate_forecasts(
+    locations: List[Tuple[float, float]],
+    specified_date: date,
+    fast: bool = False
+) -> List[Dict[str, float]]:
+    """Estimate weather for many (latitude, longitude) pairs in one batched pass.
+
+    The archive is requested once for every location, then temperature and rain
+    of all locations are stacked into a (2N, time) array and fitted together
+    with the NumPy Holt-Winters kernel. With ``fast`` the batch is fitted on
+    weekly means and spread back onto days with each location's climatology.
+
+    Every response is placed on the local calendar of the request by its
+    decoded dates, and days after a location's last fully observed day are
+    blanked like calculate_forecast drops them. The kernel carries level and
+    season through those NaN days unchanged, so the batch forecasts each
+    location from its own last observation.
+    """
+    if not locations:
+        return []
+    locations = [grid_cell(latitude, longitude) for latitude, longitude in locations]
+
+    last_updated_date = date.today() - relativedelta(days=5)
+    start_date = history_start(last_updated_date, FIT_YEARS)
+
+    openmeteo = weather_client.get_client()
+    params = {
+        "latitude": [latitude for latitude, _ in locations],
+        "longitude": [longitude for _, longitude in locations],
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": last_updated_date.strftime("%Y-%m-%d"),
+        "daily": ["rain_sum", "temperature_2m_mean"],
+        "timezone": "auto",
+    }
+    responses = openmeteo.weather_api(WEATHER_HISTORY_API, params=params)
+    n_locations = len(responses)
+
+    calendar = np.arange(
+        start_date, last_updated_date + relativedelta(days=1), dtype="datetime64[D]"
+    )
+    # (temperature/rain, location, day) on the requested calendar
+    values = np.full((2, n_locations, calendar.size), np.nan)
+    for i, response in enumerate(responses):
+        dates, decoded = decode_daily(response.Daily(), response.UtcOffsetSeconds())
+        offset = (dates - calendar[0]).astype(np.int64)
+        inside = (offset >= 0) & (offset < calendar.size)
+        on_calendar = np.full((2, calendar.size), np.nan, dtype=np.float32)
+        on_calendar[:, offset[inside]] = decoded[:, inside]
+        observed, last_date = _observed_values(
+            {"date": calendar, "rain_sum": on_calendar[0], "temperature_2m_mean": on_calendar[1]}
+        )
+        if last_date is None:
+            raise ValueError(f"No archive data for {locations[i][0]}, {locations[i][1]}.")
+        values[:, i, :observed.shape[1]] = observed
+
+    # Days no location has published yet are dropped, later ones are carried
+    end = int(np.flatnonzero(~np.isnan(values).all(axis=(0, 1)))[-1]) + 1
+    values = values[:, :, :end]
+    last_date = calendar[end - 1].item()
+    future_days = max((specified_date - last_date).days, 1)
+    temperature, rain = values
+    # Chance of rain is the wet-day frequency around the target day, as in calculate_forecast
+    climatologies = [
+        weather_climatology.Climatology.build(
+            calendar[:end],
+            {"temperature_2m_mean": temperature[i], "rain_sum": rain[i]},
+        )
+        for i in range(n_locations)
+    ]
+
+    if fast:
+        def profile_for(days: int) -> np.ndarray:
+            profiles = [
+                _daily_profile(climatology, last_date, days)
+                for climatology in climatologies
+            ]
+            return np.concatenate(
+                [[profile[0] for profile in profiles], [profile[1] for profile in profiles]]
+            )
+
+        target = _fast_forecast(
+            np.concatenate([temperature, rain]), future_days, profile_for, n_locations
+        )[:, -1]
+    else:
+        # Tuned parameters where a cell has them cached, without tuning here
+        alpha, gamma = weather_tuning.stack([
+            smoothing_for(latitude, longitude, fetch=False) for latitude, longitude in locations
+        ])
+        state = weather_holtwinters.fit(
+            np.concatenate([temperature, rain]), SEASONAL_PERIODS, alpha=alpha, gamma=gamma
+        )
+        target = weather_holtwinters.forecast(state, future_days)[:, -1]
+
+    results = []
+    for i, (latitude, longitude) in enumerate(locations):
+        wet_day_frequency = climatologies[i].summary(
+            [specified_date], CLIMATOLOGY_WINDOW, percentiles=[]
+        )["wet_day_frequency"][0]
+        result = estimate_result(target[i], target[n_locations + i], 100 * wet_day_frequency)
+        result["Grid Latitude"] = latitude
+        result["Grid Longitude"] = longitude
+        results.append(result)
+    return results
+
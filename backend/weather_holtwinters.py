@@ -0,0 +1,215 @@
+"""Batched additive Holt-Winters smoothing over many series at once."""
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+ArrayLike = np.ndarray | float
+
+
+@dataclass
+class HoltWintersState:
+    """Filtered Holt-Winters state for a batch of series.
+
+    All arrays share the leading series axis. The seasonal ring buffer is
+    indexed with ``position % seasonal_periods``, where ``position`` counts the
+    observations consumed so far, so every series must be aligned in time.
+    """
+
+    level: np.ndarray
+    trend: np.ndarray
+    season: np.ndarray
+    alpha: np.ndarray
+    beta: np.ndarray
+    gamma: np.ndarray
+    position: int = 0
+
+    @property
+    def seasonal_periods(self) -> int:
+        """Length of the seasonal cycle."""
+        return int(self.season.shape[1])
+
+    @property
+    def n_series(self) -> int:
+        """Number of series in the batch."""
+        return int(self.level.shape[0])
+
+
+def _per_series(value: ArrayLike, n_series: int) -> np.ndarray:
+    """Broadcast a scalar or per-series smoothing parameter to shape (S,)."""
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (n_series,)).copy()
+
+
+def initial_state(
+    values: np.ndarray,
+    seasonal_periods: int,
+    alpha: ArrayLike,
+    gamma: ArrayLike,
+    beta: ArrayLike = 0.0,
+) -> HoltWintersState:
+    """Heuristic initial state from the first two seasonal cycles.
+
+    ``values`` has shape (series, time). A ``beta`` of 0 disables the trend
+    component for that series, which matches an ``ExponentialSmoothing`` model
+    built without ``trend``.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_series = values.shape[0]
+    m = seasonal_periods
+    if values.shape[1] < 2 * m:
+        raise ValueError(
+            f"Need at least two seasonal cycles ({2 * m} observations) to initialize."
+        )
+
+    first_cycle = values[:, :m]
+    second_cycle = values[:, m:2 * m]
+    with np.errstate(invalid="ignore"):
+        level = np.nanmean(first_cycle, axis=1)
+        slope = (np.nanmean(second_cycle, axis=1) - level) / m
+
+    beta = _per_series(beta, n_series)
+    trend = np.where(beta > 0, np.nan_to_num(slope), 0.0)
+    season = np.nan_to_num(first_cycle - level[:, None])
+
+    return HoltWintersState(
+        level=np.nan_to_num(level),
+        trend=trend,
+        season=season,
+        alpha=_per_series(alpha, n_series),
+        beta=beta,
+        gamma=_per_series(gamma, n_series),
+    )
+
+
+def smooth(state: HoltWintersState, values: np.ndarray) -> HoltWintersState:
+    """Advance the state in place through ``values`` of shape (series, time).
+
+    The recursion loops over time only; each step updates every series with a
+    handful of vector operations. Missing observations (NaN) carry the level
+    and trend forward and leave the seasonal slot untouched.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    if values.shape[0] != state.n_series:
+        raise ValueError(
+            f"Expected {state.n_series} series, got {values.shape[0]}."
+        )
+
+    m = state.seasonal_periods
+    alpha, beta, gamma = state.alpha, state.beta, state.gamma
+    level, trend, season = state.level, state.trend, state.season
+
+    for step in range(values.shape[1]):
+        slot = (state.position + step) % m
+        y = values[:, step]
+        observed = ~np.isnan(y)
+        seasonal = season[:, slot]
+        prior = level + trend
+
+        new_level = alpha * (y - seasonal) + (1.0 - alpha) * prior
+        new_trend = beta * (new_level - level) + (1.0 - beta) * trend
+        new_season = gamma * (y - prior) + (1.0 - gamma) * seasonal
+
+        level = np.where(observed, new_level, prior)
+        trend = np.where(observed, new_trend, trend)
+        season[:, slot] = np.where(observed, new_season, seasonal)
+
+    state.level = level
+    state.trend = trend
+    state.position += values.shape[1]
+    return state
+
+
+def fit(
+    values: np.ndarray,
+    seasonal_periods: int,
+    alpha: ArrayLike,
+    gamma: ArrayLike,
+    beta: ArrayLike = 0.0,
+) -> HoltWintersState:
+    """Initialize and filter a batch of series in a single vectorized pass."""
+    state = initial_state(values, seasonal_periods, alpha, gamma, beta)
+    return smooth(state, values)
+
+
+def forecast(state: HoltWintersState, steps: int) -> np.ndarray:
+    """Forecast ``steps`` ahead for every series, shape (series, steps)."""
+    horizon = np.arange(1, steps + 1)
+    slots = (state.position + horizon - 1) % state.seasonal_periods
+    return (
+        state.level[:, None]
+        + horizon[None, :] * state.trend[:, None]
+        + state.season[:, slots]
+    )
+
+
+def resample(values: np.ndarray, factor: int) -> np.ndarray:
+    """Means of ``factor`` consecutive steps, shape (series, time // factor).
+
+    Blocks are aligned to the end of the series so the last block ends on the
+    last observation; leading steps that do not fill a block are dropped.
+    Missing steps are ignored and a block with no observation stays NaN.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_blocks = values.shape[1] // factor
+    blocks = values[:, values.shape[1] - n_blocks * factor:].reshape(
+        values.shape[0], n_blocks, factor
+    )
+    observed = np.count_nonzero(~np.isnan(blocks), axis=2)
+    totals = np.nansum(blocks, axis=2)
+    return np.where(observed > 0, totals / np.maximum(observed, 1), np.nan)
+
+
+def disaggregate(block_forecast: np.ndarray, profile: np.ndarray, factor: int) -> np.ndarray:
+    """Spread block forecasts back onto single steps with a per-step profile.
+
+    ``block_forecast`` has shape (series, blocks) and ``profile`` the expected
+    value of every step, shape (series, blocks * factor), e.g. the daily
+    climatology. Each step gets its block forecast plus the deviation of the
+    profile from its block mean, so block means are preserved.
+    """
+    block_forecast = np.atleast_2d(block_forecast)
+    n_series, n_blocks = block_forecast.shape
+    profile = np.asarray(profile, dtype=np.float64).reshape(n_series, n_blocks, factor)
+    anomaly = profile - profile.mean(axis=2, keepdims=True)
+    return (block_forecast[:, :, None] + anomaly).reshape(n_series, n_blocks * factor)
+
+
+def save_state(state: HoltWintersState, path: Path, **metadata: str) -> None:
+    """Persist a state and string metadata atomically to an ``.npz`` file."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as file:
+        np.savez(
+            file,
+            level=state.level,
+            trend=state.trend,
+            season=state.season,
+            alpha=state.alpha,
+            beta=state.beta,
+            gamma=state.gamma,
+            position=np.int64(state.position),
+            metadata_keys=np.array(list(metadata.keys()), dtype=str),
+            metadata_values=np.array(list(metadata.values()), dtype=str),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_state(path: Path) -> Tuple[HoltWintersState, Dict[str, str]]:
+    """Load a state written by save_state together with its metadata."""
+    with np.load(path) as data:
+        state = HoltWintersState(
+            level=data["level"],
+            trend=data["trend"],
+            season=data["season"],
+            alpha=data["alpha"],
+            beta=data["beta"],
+            gamma=data["gamma"],
+            position=int(data["position"]),
+        )
+        metadata = dict(
+            zip(data["metadata_keys"].tolist(), data["metadata_values"].tolist())
+        )
+    return state, metadata
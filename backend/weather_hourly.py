@@ -0,0 +1,394 @@
+"""Hourly archive kept in a memory-mapped store per grid cell.
+
+Each cell has one ``.npy`` cube of shape (variable, day, hour) next to a JSON
+header with its first day, variables and the year chunks already filled.
+Year chunks are downloaded in parallel and written straight into the mapped
+cube, so a decade of hourly values never has to sit in memory as a whole.
+Reductions gather a day-of-year window and an hour-of-day window with one
+fancy index.
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from backend import weather_client, weather_climatology, weather_historic, weather_storage
+
+# Bump when the cube layout changes; older stores are rebuilt
+STORE_VERSION = 1
+HOURS = 24
+HOURLY_VARIABLES = [
+    "temperature_2m",
+    "precipitation",
+    "cloud_cover",
+    "wind_speed_10m",
+]
+# Hours with at least this much precipitation (mm) count as wet
+WET_HOUR_THRESHOLD = 0.1
+
+
+def _utc_offsets(seconds: np.ndarray, timezone: ZoneInfo) -> np.ndarray:
+    """UTC offset in force at every instant of an ascending series of epoch seconds.
+
+    The offset is looked up once a day; only the stretches between two lookups
+    that disagree, i.e. that hold a daylight saving change, are resolved hourly.
+    """
+    def offset_at(second: int) -> int:
+        offset = datetime.fromtimestamp(int(second), timezone).utcoffset()
+        return int(offset.total_seconds()) if offset is not None else 0
+
+    if seconds.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    probes = np.unique(np.append(np.arange(0, seconds.size, HOURS), seconds.size - 1))
+    probed = np.array([offset_at(seconds[index]) for index in probes], dtype=np.int64)
+    offsets = np.append(np.repeat(probed[:-1], np.diff(probes)), probed[-1])
+    changes = np.flatnonzero(probed[:-1] != probed[1:])
+    for first, last in zip(probes[changes], probes[changes + 1]):
+        offsets[first:last] = [offset_at(second) for second in seconds[first:last]]
+    return offsets
+
+
+def decode_hourly(
+    hourly: Any,
+    utc_offset: int = 0,
+    timezone: str | bytes | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode an hourly block into local datetime64[h] times and a (variable, hour) array.
+
+    ``utc_offset`` is the offset of the response, fixed at its first hour.
+    With the response's IANA ``timezone`` every hour gets the offset in force
+    at that instant instead, so hours after a daylight saving change land on
+    their local clock hour. The repeated autumn hour keeps its later value and
+    the skipped spring hour stays empty.
+    """
+    n_variables = hourly.VariablesLength()
+    values = np.stack(
+        [hourly.Variables(i).ValuesAsNumpy() for i in range(n_variables)]
+    ).astype(np.float32, copy=False)
+    seconds = hourly.Time() + hourly.Interval() * np.arange(values.shape[1])
+    if isinstance(timezone, bytes):
+        timezone = timezone.decode()
+    try:
+        offsets = _utc_offsets(seconds, ZoneInfo(timezone)) if timezone else utc_offset
+    except (ZoneInfoNotFoundError, ValueError):
+        offsets = utc_offset
+    local = seconds + offsets
+    return local.astype("datetime64[s]").astype("datetime64[h]"), values
+
+
+@dataclass
+class HourlyArchive:
+    """Header of a cell's hourly store; the cube is mapped on first use."""
+
+    path: Path = field(repr=False)
+    start: date
+    n_days: int
+    variables: List[str]
+    filled: List[str]
+    updated: str = ""
+    _cube: np.ndarray | None = field(default=None, repr=False)
+
+    @classmethod
+    def open(cls, header_path: Path) -> "HourlyArchive | None":
+        """Read a store header, or None if it belongs to another STORE_VERSION."""
+        header = json.loads(header_path.read_text(encoding="utf-8"))
+        if header.get("version") != STORE_VERSION:
+            return None
+        return cls(
+            path=header_path.with_name("cube.npy"),
+            start=date.fromisoformat(header["start"]),
+            n_days=header["n_days"],
+            variables=header["variables"],
+            filled=header["filled"],
+            updated=header.get("updated", ""),
+        )
+
+    @classmethod
+    def create(
+        cls,
+        directory: Path,
+        start: date,
+        n_days: int,
+        variables: List[str],
+    ) -> "HourlyArchive":
+        """Allocate an empty (all NaN) store on disk."""
+        directory.mkdir(parents=True, exist_ok=True)
+        cube = np.lib.format.open_memmap(
+            directory / "cube.npy",
+            mode="w+",
+            dtype=np.float32,
+            shape=(len(variables), n_days, HOURS),
+        )
+        cube[:] = np.nan
+        cube.flush()
+        del cube
+        archive = cls(
+            path=directory / "cube.npy",
+            start=start,
+            n_days=n_days,
+            variables=list(variables),
+            filled=[],
+        )
+        archive.save_header()
+        return archive
+
+    def resized(self, start: date, n_days: int) -> "HourlyArchive":
+        """Store over another range in place of this one, keeping the days both cover.
+
+        Chunks this store had filled stay filled when the new range holds no
+        day of them before this store's start; the others are fetched again.
+        """
+        old_path = self.path.with_name("cube.old.npy")
+        os.replace(self.path, old_path)
+        archive = HourlyArchive.create(self.path.parent, start, n_days, self.variables)
+
+        first = max(start, self.start)
+        last = min(start + relativedelta(days=n_days), self.start + relativedelta(days=self.n_days))
+        if last > first:
+            old_cube = np.load(old_path, mmap_mode="r")
+            cube = np.load(archive.path, mmap_mode="r+")
+            cube[:, (first - start).days:(last - start).days] = (
+                old_cube[:, (first - self.start).days:(last - self.start).days]
+            )
+            cube.flush()
+            del cube, old_cube
+        old_path.unlink()
+
+        archive.filled = [
+            chunk_start for chunk_start in self.filled
+            if max(date.fromisoformat(chunk_start), start) >= self.start
+        ]
+        archive.save_header()
+        return archive
+
+    def save_header(self) -> None:
+        """Write the header next to the cube atomically."""
+        header = {
+            "version": STORE_VERSION,
+            "start": self.start.isoformat(),
+            "n_days": self.n_days,
+            "variables": self.variables,
+            "filled": self.filled,
+            "updated": self.updated,
+        }
+        header_path = self.path.with_name("header.json")
+        tmp_path = header_path.with_name(f"header.json.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(header, indent=2), encoding="utf-8")
+        os.replace(tmp_path, header_path)
+
+    @property
+    def cube(self) -> np.ndarray:
+        """The (variable, day, hour) cube, mapped read-only."""
+        if self._cube is None:
+            self._cube = np.load(self.path, mmap_mode="r")
+        return self._cube
+
+    @property
+    def dates(self) -> np.ndarray:
+        """datetime64[D] date of every day row."""
+        return np.datetime64(self.start, "D") + np.arange(self.n_days)
+
+    def window_days(self, target: date, window: int) -> np.ndarray:
+        """Rows of the days within ±window calendar slots of the target, any year."""
+        slots = weather_climatology.day_of_year_slots(self.dates)
+        centre = int(weather_climatology.day_of_year_slots(np.datetime64(target, "D")))
+        distance = np.abs(slots - centre)
+        distance = np.minimum(distance, weather_climatology.CALENDAR_DAYS - distance)
+        return np.flatnonzero(distance <= window)
+
+    def samples(
+        self,
+        variable: str,
+        target: date,
+        hour: int,
+        window: int = 7,
+        hour_window: int = 1,
+    ) -> np.ndarray:
+        """Values within ±window days of the target's calendar slot and ±hour_window hours."""
+        days = self.window_days(target, window)
+        hours = (hour + np.arange(-hour_window, hour_window + 1)) % HOURS
+        values = self.cube[self.variables.index(variable)]
+        return values[days[:, None], hours[None, :]].ravel()
+
+    def summary(
+        self,
+        target: date,
+        hour: int,
+        window: int = 7,
+        hour_window: int = 1,
+        percentiles: Iterable[float] = (10, 50, 90),
+        wet_threshold: float = WET_HOUR_THRESHOLD,
+        rain_variable: str = "precipitation",
+    ) -> Dict[str, float]:
+        """Mean, percentiles and wet-hour frequency of every variable at an hour of a day.
+
+        Keys follow Climatology.summary: ``"<variable> mean"``,
+        ``"<variable> p<q>"`` and ``"wet_hour_frequency"`` in [0, 1].
+        """
+        percentiles = list(percentiles)
+        result: Dict[str, float] = {}
+        with np.errstate(invalid="ignore"):
+            for variable in self.variables:
+                samples = self.samples(variable, target, hour, window, hour_window)
+                samples = samples[~np.isnan(samples)]
+                if samples.size == 0:
+                    continue
+                result[f"{variable} mean"] = float(samples.mean())
+                if percentiles:
+                    for q, band in zip(percentiles, np.percentile(samples, percentiles)):
+                        result[f"{variable} p{q:g}"] = float(band)
+                if variable == rain_variable:
+                    result["wet_hour_frequency"] = float(np.mean(samples >= wet_threshold))
+        return result
+
+    def diurnal_cycle(self, variable: str, target: date, window: int = 7) -> np.ndarray:
+        """Mean of a variable for every hour of the day around the target, shape (24,)."""
+        values = self.cube[self.variables.index(variable)][self.window_days(target, window)]
+        with np.errstate(invalid="ignore"):
+            return np.nanmean(values, axis=0)
+
+
+def _request_hourly_chunk(
+    latitude: float,
+    longitude: float,
+    chunk_start: date,
+    chunk_end: date,
+    variables: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Request one chunk as local times and a (variable, hour) array."""
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": chunk_start.strftime("%Y-%m-%d"),
+        "end_date": chunk_end.strftime("%Y-%m-%d"),
+        "hourly": variables,
+        "timezone": "auto",
+    }
+    response = weather_client.get_client().weather_api(
+        weather_historic.WEATHER_HISTORY_API,
+        params=params,
+        timeout=weather_historic.ARCHIVE_TIMEOUT,
+    )[0]
+    return decode_hourly(response.Hourly(), response.UtcOffsetSeconds(), response.Timezone())
+
+
+def _store_dir(latitude: float, longitude: float) -> Path:
+    """Directory of a cell's hourly store."""
+    key = weather_storage.location_key(latitude, longitude)
+    directory = weather_storage.CACHE_DIR / "hourly" / key
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def hourly_chunks(start_date: date, end_date: date) -> List[Tuple[date, date, bool]]:
+    """Split a date range into calendar years clipped to it, flagged cacheable when final.
+
+    A year of hours is already one large request per variable, so unlike
+    weather_historic.archive_chunks years are never widened into decade blocks.
+    """
+    final_before = date.today() - relativedelta(days=weather_historic.ARCHIVE_FINAL_DAYS)
+    return [
+        (
+            max(start_date, date(year, 1, 1)),
+            min(end_date, date(year, 12, 31)),
+            date(year, 12, 31) < final_before,
+        )
+        for year in range(start_date.year, end_date.year + 1)
+    ]
+
+
+def fetch_hourly_archive(
+    latitude: float,
+    longitude: float,
+    years: int = weather_historic.HISTORY_YEARS,
+    variables: List[str] | None = None
+) -> HourlyArchive:
+    """Hourly archive of the grid cell of a coordinate, filled chunk by chunk.
+
+    The store covers whole calendar years from ``years`` ago to the end of the
+    current one, requested one year at a time (hourly_chunks). Finished years
+    are downloaded once; recent ones are refreshed at most once a day. Chunks
+    are written into the mapped cube as they arrive. When the range moves (a new year, another ``years``) the days
+    already stored are carried over; only new variables rebuild the store.
+    """
+    latitude, longitude = weather_historic.grid_cell(latitude, longitude)
+    variables = list(variables or HOURLY_VARIABLES)
+    today = date.today()
+    start = max(date(today.year - years, 1, 1), weather_historic.ERA5_START)
+    n_days = (date(today.year, 12, 31) - start).days + 1
+
+    directory = _store_dir(latitude, longitude)
+    header_path = directory / "header.json"
+    archive = HourlyArchive.open(header_path) if header_path.exists() else None
+    if archive is None or archive.variables != variables:
+        archive = HourlyArchive.create(directory, start, n_days, variables)
+    elif (archive.start, archive.n_days) != (start, n_days):
+        archive = archive.resized(start, n_days)
+
+    last_updated_date = today - relativedelta(days=5)
+    chunks = [
+        (chunk_start, chunk_end, cacheable)
+        for chunk_start, chunk_end, cacheable
+        in hourly_chunks(start, last_updated_date)
+        if chunk_start.isoformat() not in archive.filled
+        and (cacheable or archive.updated != today.isoformat())
+    ]
+    if not chunks:
+        return archive
+
+    cube = np.load(archive.path, mmap_mode="r+")
+    by_hour = cube.reshape(len(variables), n_days * HOURS)
+    first_hour = np.datetime64(start, "h")
+    with ThreadPoolExecutor(max_workers=weather_historic.ARCHIVE_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                _request_hourly_chunk, latitude, longitude, chunk_start, chunk_end, variables
+            ): (chunk_start, cacheable)
+            for chunk_start, chunk_end, cacheable in chunks
+        }
+        for future, (chunk_start, cacheable) in futures.items():
+            times, values = future.result()
+            offset = (times - first_hour).astype(np.int64)
+            inside = (offset >= 0) & (offset < by_hour.shape[1])
+            by_hour[:, offset[inside]] = values[:, inside]
+            if cacheable:
+                archive.filled.append(chunk_start.isoformat())
+    cube.flush()
+    del by_hour, cube
+
+    archive.updated = today.isoformat()
+    archive.save_header()
+    archive._cube = None
+    return archive
+
+
+def estimate_hour(
+    latitude: float,
+    longitude: float,
+    specified_date: date,
+    hour: int,
+    window: int = weather_historic.CLIMATOLOGY_WINDOW,
+    hour_window: int = 1
+) -> Dict[str, float]:
+    """Conditions expected at an hour of the target day from the hourly archive.
+
+    Besides the summary keys it reports "Chance of Rain" as the percentage of
+    wet hours in the window and the grid cell that served the estimate.
+    """
+    archive = fetch_hourly_archive(latitude, longitude)
+    result = archive.summary(specified_date, hour, window, hour_window)
+    if "wet_hour_frequency" in result:
+        result["Chance of Rain"] = round(100 * result["wet_hour_frequency"], 3)
+    result["Grid Latitude"], result["Grid Longitude"] = weather_historic.grid_cell(
+        latitude, longitude
+    )
+    return result
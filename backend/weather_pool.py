@@ -0,0 +1,234 @@
+"""Multi-process batch estimator over archives held in shared memory.
+
+The parent fetches each grid cell's archive once and places the (cell,
+variable, day) block in ``multiprocessing.shared_memory``. Worker processes
+attach to it when they start and read their cell through a NumPy view, so
+tasks only carry a cell index and target dates. archive_pool is shared with
+other batch jobs such as weather_backtest.
+
+Workers are started with the platform's default method, which is "spawn" on
+Windows and macOS: each worker re-imports the calling script, so scripts
+using archive_pool, estimate_many or tune_many must run them under an
+``if __name__ == "__main__":`` guard.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from backend import weather_climatology, weather_historic, weather_holtwinters, weather_tuning
+
+# Rows of the shared archive block
+POOL_VARIABLES = ["temperature_2m_mean", "rain_sum"]
+
+# Set in every worker by _attach_archive
+_shared: shared_memory.SharedMemory | None = None
+_archive: np.ndarray | None = None
+_dates: np.ndarray | None = None
+
+
+def _attach_shared(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block owned by the parent without registering it for cleanup.
+
+    Workers share the parent's resource tracker, and a block registered by
+    attaching is unlinked (with a leak warning) when any process exits. Only
+    archive_pool, which created it, unlinks the block. Unregistering after
+    attaching would remove the parent's own registration instead, so
+    registration is skipped while attaching (``track=False`` from Python 3.13).
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _attach_archive(name: str, shape: Tuple[int, int, int], start_date: date) -> None:
+    """Worker initializer: map the shared archive block without copying it."""
+    global _shared, _archive, _dates
+    _shared = _attach_shared(name)
+    _archive = np.ndarray(shape, dtype=np.float32, buffer=_shared.buf)
+    _dates = np.datetime64(start_date, "D") + np.arange(shape[2])
+
+
+def attached_archive() -> Tuple[np.ndarray, np.ndarray]:
+    """The (cell, variable, day) block and its dates, inside an archive_pool worker."""
+    if _archive is None or _dates is None:
+        raise RuntimeError("The shared archive is not attached in this worker.")
+    return _archive, _dates
+
+
+def fetch_archives(
+    cells: Sequence[Tuple[float, float]],
+    start_date: date,
+    end_date: date,
+    variables: Sequence[str] = POOL_VARIABLES,
+) -> np.ndarray:
+    """Archives of many grid cells as one (cell, variable, day) float32 block."""
+    archive = np.empty(
+        (len(cells), len(variables), (end_date - start_date).days + 1), dtype=np.float32
+    )
+    for index, (latitude, longitude) in enumerate(cells):
+        daily_data = weather_historic.fetch_daily_archive(
+            latitude, longitude, start_date, end_date, list(variables)
+        )
+        for row, variable in enumerate(variables):
+            archive[index, row] = daily_data[variable]
+    return archive
+
+
+@contextmanager
+def archive_pool(
+    archive: np.ndarray,
+    start_date: date,
+    processes: int | None = None,
+) -> Iterator[ProcessPoolExecutor]:
+    """Process pool whose workers map one shared copy of a (cell, variable, day) block.
+
+    Workers read it through attached_archive; the block is freed on exit.
+    Callers in a script need the ``__main__`` guard described in the module
+    docstring.
+    """
+    shared = shared_memory.SharedMemory(create=True, size=max(archive.nbytes, 1))
+    try:
+        np.ndarray(archive.shape, dtype=np.float32, buffer=shared.buf)[:] = archive
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_attach_archive,
+            initargs=(shared.name, archive.shape, start_date),
+        ) as executor:
+            yield executor
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def _estimate_cell(
+    task: Tuple[int, List[date], weather_tuning.SmoothingParameters]
+) -> List[Dict[str, float]]:
+    """Fit one cell from the shared block and estimate all its target dates."""
+    cell, targets, smoothing = task
+    archive, dates = attached_archive()
+    temperature, rain = archive[cell]
+    # Statistics use the whole history, Holt-Winters only the last FIT_YEARS
+    fit_days = weather_historic.FIT_YEARS * 365
+
+    state = weather_holtwinters.fit(
+        archive[cell][:, -fit_days:],
+        weather_historic.SEASONAL_PERIODS,
+        alpha=smoothing.alpha,
+        gamma=smoothing.gamma,
+    )
+    last_date = dates[-1].item()
+    horizons = [max((target - last_date).days, 1) for target in targets]
+    forecast = weather_holtwinters.forecast(state, max(horizons))
+
+    climatology = weather_climatology.Climatology.build(
+        dates, {"temperature_2m_mean": temperature, "rain_sum": rain}
+    )
+    summary = climatology.summary(
+        targets, weather_historic.CLIMATOLOGY_WINDOW, percentiles=[]
+    )
+
+    return [
+        weather_historic.estimate_result(
+            forecast[0, horizon - 1],
+            forecast[1, horizon - 1],
+            100 * summary["wet_day_frequency"][i],
+        )
+        for i, horizon in enumerate(horizons)
+    ]
+
+
+def estimate_many(
+    jobs: Sequence[Tuple[float, float, date]],
+    processes: int | None = None,
+) -> List[Dict[str, float]]:
+    """Estimate many (latitude, longitude, date) jobs across a process pool.
+
+    Jobs in the same grid cell share one archive and one fit. Results come back
+    in the order of ``jobs``.
+    """
+    if not jobs:
+        return []
+
+    cells: List[Tuple[float, float]] = []
+    cell_targets: Dict[Tuple[float, float], List[date]] = {}
+    job_slots = []
+    for latitude, longitude, target in jobs:
+        cell = weather_historic.grid_cell(latitude, longitude)
+        if cell not in cell_targets:
+            cells.append(cell)
+            cell_targets[cell] = []
+        job_slots.append((cell, len(cell_targets[cell])))
+        cell_targets[cell].append(target)
+
+    last_updated_date = date.today() - relativedelta(days=5)
+    start_date = weather_historic.history_start(last_updated_date)
+    archive = fetch_archives(cells, start_date, last_updated_date)
+    with archive_pool(archive, start_date, processes) as executor:
+        cell_results = dict(
+            zip(
+                cells,
+                executor.map(
+                    _estimate_cell,
+                    [
+                        (
+                            index,
+                            cell_targets[cell],
+                            weather_historic.smoothing_for(*cell, fetch=False),
+                        )
+                        for index, cell in enumerate(cells)
+                    ],
+                ),
+            )
+        )
+
+    results = []
+    for cell, position in job_slots:
+        result = dict(cell_results[cell][position])
+        result["Grid Latitude"], result["Grid Longitude"] = cell
+        results.append(result)
+    return results
+
+
+def _tune_cell(cell: int) -> weather_tuning.SmoothingParameters:
+    """Tune the smoothing parameters of one cell of the shared block."""
+    archive, _ = attached_archive()
+    return weather_tuning.SmoothingParameters.tune(
+        archive[cell][:, -weather_historic.FIT_YEARS * 365:], weather_historic.SEASONAL_PERIODS
+    )
+
+
+def tune_many(
+    locations: Sequence[Tuple[float, float]],
+    processes: int | None = None,
+) -> Dict[Tuple[float, float], weather_tuning.SmoothingParameters]:
+    """Tune the Holt-Winters smoothing of many locations across a process pool.
+
+    Each grid cell is tuned once and its winners are stored, so
+    calculate_forecast, calculate_forecasts and estimate_many fit with them
+    from then on.
+    """
+    cells = list(dict.fromkeys(
+        weather_historic.grid_cell(latitude, longitude) for latitude, longitude in locations
+    ))
+    if not cells:
+        return {}
+    last_updated_date = date.today() - relativedelta(days=5)
+    start_date = weather_historic.history_start(last_updated_date, weather_historic.FIT_YEARS)
+    archive = fetch_archives(cells, start_date, last_updated_date)
+    with archive_pool(archive, start_date, processes) as executor:
+        tuned = dict(zip(cells, executor.map(_tune_cell, range(len(cells)))))
+    for (latitude, longitude), smoothing in tuned.items():
+        weather_historic.save_smoothing(latitude, longitude, smoothing)
+    return tuned
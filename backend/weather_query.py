@@ -0,0 +1,212 @@
+"""Columnar queries over the cached daily archives of many sites.
+
+An ``ArchiveTable`` holds one (site, day) column per variable on a shared
+calendar, plus row indexes by month, year and calendar slot built once with a
+stable argsort. Each filter marks the rows of its index entries in a boolean
+mask and the masks are intersected, so a query such as "rainy days in June
+across 40 sites" finds its June rows by index instead of comparing dates, and
+every aggregation reduces all sites at once.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from backend import weather_climatology, weather_historic
+
+SEASONS = {
+    "DJF": (12, 1, 2),
+    "MAM": (3, 4, 5),
+    "JJA": (6, 7, 8),
+    "SON": (9, 10, 11),
+}
+
+
+def _nan_count(values: np.ndarray) -> np.ndarray:
+    """Observed days per site."""
+    return np.count_nonzero(~np.isnan(values), axis=1).astype(np.float64)
+
+
+def _nan_reduce(reduce: Callable[..., np.ndarray]) -> Callable[[np.ndarray], np.ndarray]:
+    """Wrap a NaN-aware reduction so sites without data give NaN quietly."""
+    def reduced(values: np.ndarray) -> np.ndarray:
+        result = np.full(values.shape[0], np.nan)
+        has_data = ~np.isnan(values).all(axis=1)
+        if has_data.any():
+            result[has_data] = reduce(values[has_data], axis=1)
+        return result
+    return reduced
+
+
+REDUCTIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "mean": _nan_reduce(np.nanmean),
+    "sum": _nan_reduce(np.nansum),
+    "min": _nan_reduce(np.nanmin),
+    "max": _nan_reduce(np.nanmax),
+    "std": _nan_reduce(np.nanstd),
+    "count": _nan_count,
+}
+
+
+def _group_index(keys: np.ndarray) -> Dict[int, np.ndarray]:
+    """Rows of every key value, from one stable argsort."""
+    order = np.argsort(keys, kind="stable")
+    values, starts = np.unique(keys[order], return_index=True)
+    return {
+        int(value): rows
+        for value, rows in zip(values, np.split(order, starts[1:]))
+    }
+
+
+@dataclass
+class ArchiveTable:
+    """Daily archives of many sites as (site, day) columns on one calendar."""
+
+    sites: List[Tuple[float, float]]
+    dates: np.ndarray
+    columns: Dict[str, np.ndarray]
+    by_month: Dict[int, np.ndarray] = field(default_factory=dict, repr=False)
+    by_year: Dict[int, np.ndarray] = field(default_factory=dict, repr=False)
+    by_slot: Dict[int, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        """Build the month, year and calendar slot indexes once."""
+        months = self.dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        years = self.dates.astype("datetime64[Y]").astype(np.int64) + 1970
+        self.by_month = _group_index(months)
+        self.by_year = _group_index(years)
+        self.by_slot = _group_index(weather_climatology.day_of_year_slots(self.dates))
+
+    @classmethod
+    def load(
+        cls,
+        locations: Sequence[Tuple[float, float]],
+        start_date: date,
+        end_date: date,
+        variables: List[str] | None = None,
+    ) -> "ArchiveTable":
+        """Assemble the archives of many locations, from the chunk cache where possible.
+
+        Locations are snapped to their grid cells; sites sharing a cell are
+        loaded once.
+        """
+        variables = list(variables or weather_historic.DAILY_VARIABLES)
+        sites = list(dict.fromkeys(
+            weather_historic.grid_cell(latitude, longitude) for latitude, longitude in locations
+        ))
+        n_days = (end_date - start_date).days + 1
+        columns = {
+            variable: np.full((len(sites), n_days), np.nan, dtype=np.float32)
+            for variable in variables
+        }
+        for index, (latitude, longitude) in enumerate(sites):
+            daily_data = weather_historic.fetch_daily_archive(
+                latitude, longitude, start_date, end_date, variables
+            )
+            for variable in variables:
+                columns[variable][index] = daily_data[variable]
+        return cls(
+            sites=sites,
+            dates=np.arange(start_date, end_date + np.timedelta64(1, "D"), dtype="datetime64[D]"),
+            columns=columns,
+        )
+
+    def select(
+        self,
+        months: Iterable[int] | None = None,
+        season: str | None = None,
+        years: Iterable[int] | None = None,
+        days_of_year: Iterable[int] | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> np.ndarray:
+        """Sorted rows matching every given filter; no filter selects every row.
+
+        ``season`` is a key of SEASONS and ``days_of_year`` are calendar slots
+        (0-365, see weather_climatology.day_of_year_slots). Like the other
+        filters, a season narrows ``months`` rather than adding to them.
+        """
+        selected = np.ones(self.dates.size, dtype=bool)
+        for index, keys in (
+            (self.by_month, months),
+            (self.by_month, SEASONS[season] if season is not None else None),
+            (self.by_year, years),
+            (self.by_slot, days_of_year),
+        ):
+            if keys is None:
+                continue
+            mask = np.zeros(self.dates.size, dtype=bool)
+            for key in keys:
+                mask[index.get(int(key), np.zeros(0, dtype=np.int64))] = True
+            selected &= mask
+        if start_date is not None:
+            selected[:max((start_date - self.dates[0].item()).days, 0)] = False
+        if end_date is not None:
+            selected[max((end_date - self.dates[0].item()).days + 1, 0):] = False
+        return np.flatnonzero(selected)
+
+    def aggregate(
+        self,
+        variable: str,
+        rows: np.ndarray | None = None,
+        how: str = "mean",
+        threshold: float | None = None,
+    ) -> np.ndarray:
+        """Reduce a variable over the selected rows for every site, shape (site,).
+
+        With ``threshold``, counts the days reaching it instead (e.g. rainy days).
+        """
+        values = self.columns[variable] if rows is None else self.columns[variable][:, rows]
+        if threshold is not None:
+            return np.count_nonzero(values >= threshold, axis=1).astype(np.float64)
+        return REDUCTIONS[how](values)
+
+    def group_by(
+        self,
+        variable: str,
+        key: str = "year",
+        rows: np.ndarray | None = None,
+        how: str = "mean",
+        threshold: float | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Aggregate per site and per year, month or calendar slot.
+
+        Returns the group keys and a (site, group) array. Each group only
+        touches the intersection of its index slice with ``rows``.
+        """
+        index = {"year": self.by_year, "month": self.by_month, "slot": self.by_slot}[key]
+        keep = None
+        if rows is not None:
+            keep = np.zeros(self.dates.size, dtype=bool)
+            keep[rows] = True
+        groups, results = [], []
+        for group, group_rows in index.items():
+            if keep is not None:
+                group_rows = group_rows[keep[group_rows]]
+            if group_rows.size == 0:
+                continue
+            groups.append(group)
+            results.append(self.aggregate(variable, group_rows, how, threshold))
+        if not results:
+            return np.zeros(0, dtype=np.int64), np.zeros((len(self.sites), 0))
+        return np.array(groups), np.stack(results, axis=1)
+
+    def by_site(self, values: np.ndarray) -> Dict[Tuple[float, float], Any]:
+        """Label a per-site result with its grid cell."""
+        return dict(zip(self.sites, values.tolist()))
+
+    def dataframe(self, variable: str, rows: np.ndarray | None = None) -> Any:
+        """One variable as a pandas DataFrame (dates × sites), for ad-hoc analysis.
+
+        pandas is imported here only, like weather_historic.archive_dataframe.
+        """
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+
+        rows = np.arange(self.dates.size) if rows is None else rows
+        return pd.DataFrame(
+            self.columns[variable][:, rows].T,
+            index=self.dates[rows],
+            columns=pd.MultiIndex.from_tuples(self.sites, names=["latitude", "longitude"]),
+        )
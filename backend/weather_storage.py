@@ -0,0 +1,39 @@
+"""Local on-disk locations for cached weather data."""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# Override with WEATHER_CACHE_DIR, e.g. to keep caches next to a portable build
+CACHE_DIR = Path(
+    os.environ.get(
+        "WEATHER_CACHE_DIR",
+        Path.home() / ".cache" / "nasa_space_app_2025",
+    )
+)
+
+
+def location_key(latitude: float, longitude: float) -> str:
+    """File-name friendly key for a coordinate pair."""
+    return f"{latitude:.4f}_{longitude:.4f}"
+
+
+def cache_path(*parts: str) -> Path:
+    """Path of a cache file below CACHE_DIR, creating parent folders."""
+    path = CACHE_DIR.joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def save_npz(path: Path, compressed: bool = False, **arrays: Any) -> None:
+    """Write arrays to an ``.npz`` file atomically, so readers never see a partial file."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as file:
+            (np.savez_compressed if compressed else np.savez)(file, **arrays)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
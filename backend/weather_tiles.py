@@ -0,0 +1,188 @@
+"""Precomputed, memory-mapped climatology tiles.
+
+A tile covers a bounding box on a regular grid and stores one cube of shape
+(latitude, longitude, calendar slot, statistic) as a ``.npy`` file next to a
+JSON header. Readers open the cube with ``mmap_mode="r"``, so a lookup only
+pages in the few bytes of one cell and day.
+"""
+
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from backend import weather_climatology, weather_generator, weather_storage
+
+# Bump when the cube layout or statistics change; older tiles are ignored
+TILE_VERSION = 1
+TILE_STATISTICS = [
+    "temperature_2m_mean",
+    "rain_sum",
+    "wet_day_frequency",
+    "heavy_rain_frequency",
+]
+# Cache tiles first, then tiles shipped with the app for offline first launch
+TILE_DIRS = [
+    weather_storage.CACHE_DIR / "tiles",
+    Path(__file__).resolve().parent.parent / "resources" / "tiles",
+]
+
+
+@dataclass
+class ClimatologyTile:
+    """Header of a tile; the cube is mapped on first lookup."""
+
+    path: Path = field(repr=False)
+    south: float
+    west: float
+    resolution: float
+    n_latitude: int
+    n_longitude: int
+    statistics: List[str]
+    _cube: np.ndarray | None = field(default=None, repr=False)
+
+    @classmethod
+    def open(cls, header_path: Path) -> "ClimatologyTile | None":
+        """Read a tile header, or None if it belongs to another TILE_VERSION."""
+        header = json.loads(header_path.read_text(encoding="utf-8"))
+        if header.get("version") != TILE_VERSION:
+            return None
+        return cls(
+            path=header_path.with_name("cube.npy"),
+            south=header["south"],
+            west=header["west"],
+            resolution=header["resolution"],
+            n_latitude=header["n_latitude"],
+            n_longitude=header["n_longitude"],
+            statistics=header["statistics"],
+        )
+
+    def cell_index(self, latitude: float, longitude: float) -> tuple[int, int] | None:
+        """Row and column of the cell nearest to a coordinate, if inside the tile."""
+        row = int(round((latitude - self.south) / self.resolution))
+        column = int(round((longitude - self.west) / self.resolution))
+        if 0 <= row < self.n_latitude and 0 <= column < self.n_longitude:
+            return row, column
+        return None
+
+    def lookup(
+        self,
+        latitude: float,
+        longitude: float,
+        target: date,
+    ) -> Dict[str, float] | None:
+        """Statistics of the target day at a coordinate, or None outside the tile."""
+        index = self.cell_index(latitude, longitude)
+        if index is None:
+            return None
+        if self._cube is None:
+            self._cube = np.load(self.path, mmap_mode="r")
+        slot = int(weather_climatology.day_of_year_slots(np.datetime64(target, "D")))
+        values = self._cube[index[0], index[1], slot]
+        if np.isnan(values).all():
+            return None
+        return {name: float(value) for name, value in zip(self.statistics, values)}
+
+
+def build_tile(
+    name: str,
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    resolution: float,
+    climatology_at: Callable[[float, float], weather_climatology.Climatology | None],
+    window: int = 7,
+    directory: Path = TILE_DIRS[0],
+) -> Path:
+    """Summarize the climatology of every cell in a bounding box into a tile.
+
+    ``climatology_at`` returns the climatology at a grid node (None leaves its
+    cell empty). All 366 calendar slots of a cell are summarized in one
+    vectorized call and written straight into the memory-mapped cube.
+    """
+    n_latitude = int(round((north - south) / resolution)) + 1
+    n_longitude = int(round((east - west) / resolution)) + 1
+    tile_dir = directory / name
+    tile_dir.mkdir(parents=True, exist_ok=True)
+
+    cube = np.lib.format.open_memmap(
+        tile_dir / "cube.npy",
+        mode="w+",
+        dtype=np.float32,
+        shape=(
+            n_latitude,
+            n_longitude,
+            weather_climatology.CALENDAR_DAYS,
+            len(TILE_STATISTICS),
+        ),
+    )
+    cube[:] = np.nan
+    # A leap year visits every calendar slot once, in order
+    every_slot = np.arange("2000-01-01", "2001-01-01", dtype="datetime64[D]").tolist()
+
+    for row in range(n_latitude):
+        for column in range(n_longitude):
+            climatology = climatology_at(
+                round(south + row * resolution, 4),
+                round(west + column * resolution, 4),
+            )
+            if climatology is None:
+                continue
+            summary = climatology.summary(every_slot, window, percentiles=[])
+            rain = climatology.samples("rain_sum", every_slot, window)
+            heavy = np.count_nonzero(rain >= weather_generator.HEAVY_RAIN, axis=1)
+            observed = np.maximum(np.count_nonzero(~np.isnan(rain), axis=1), 1)
+            cube[row, column] = np.stack(
+                [
+                    summary["temperature_2m_mean mean"],
+                    summary["rain_sum mean"],
+                    summary["wet_day_frequency"],
+                    heavy / observed,
+                ],
+                axis=-1,
+            )
+    cube.flush()
+    del cube
+
+    header = {
+        "version": TILE_VERSION,
+        "south": south,
+        "west": west,
+        "resolution": resolution,
+        "n_latitude": n_latitude,
+        "n_longitude": n_longitude,
+        "statistics": TILE_STATISTICS,
+        "window": window,
+        "built": date.today().isoformat(),
+    }
+    (tile_dir / "header.json").write_text(json.dumps(header, indent=2), encoding="utf-8")
+    return tile_dir
+
+
+_TILES: List[ClimatologyTile] | None = None
+
+
+def available_tiles(reload: bool = False) -> List[ClimatologyTile]:
+    """Tiles of the current version found in TILE_DIRS, scanned once."""
+    global _TILES
+    if _TILES is None or reload:
+        _TILES = []
+        for directory in TILE_DIRS:
+            for header_path in sorted(directory.glob("*/header.json")):
+                tile = ClimatologyTile.open(header_path)
+                if tile is not None:
+                    _TILES.append(tile)
+    return _TILES
+
+
+def lookup(latitude: float, longitude: float, target: date) -> Dict[str, float] | None:
+    """Statistics of the target day from the first tile covering a coordinate."""
+    for tile in available_tiles():
+        values = tile.lookup(latitude, longitude, target)
+        if values is not None:
+            return values
+    return None
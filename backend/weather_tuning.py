@@ -0,0 +1,123 @@
+"""Per-cell tuning of the Holt-Winters smoothing parameters.
+
+Every candidate (alpha, gamma) pair becomes one more series of the batched
+kernel, so the whole grid of candidates for temperature and rain is filtered
+in the single pass a normal fit costs. Candidates are scored by their mean
+absolute error over a hold-out window: rolling origins every
+TUNING_STEP_DAYS, each forecasting the next TUNING_HORIZON days, with the
+state smoothed through the observations between origins.
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from backend import weather_holtwinters, weather_storage
+
+ALPHA_GRID = (0.0, 0.02, 0.05, 0.1, 0.2, 0.3)
+GAMMA_GRID = (0.0, 0.05, 0.1, 0.2, 0.3)
+HOLDOUT_DAYS = 365
+TUNING_HORIZON = 30
+TUNING_STEP_DAYS = 7
+
+
+@dataclass
+class SmoothingParameters:
+    """Tuned (alpha, gamma) of temperature and rain and the hold-out MAE they reached.
+
+    ``alpha`` and ``gamma`` are in (temperature, rain) order, like the series
+    of a weather_holtwinters fit.
+    """
+
+    alpha: np.ndarray
+    gamma: np.ndarray
+    error: np.ndarray
+
+    @classmethod
+    def tune(
+        cls,
+        values: np.ndarray,
+        seasonal_periods: int,
+        alphas: Sequence[float] = ALPHA_GRID,
+        gammas: Sequence[float] = GAMMA_GRID,
+        holdout_days: int = HOLDOUT_DAYS,
+    ) -> "SmoothingParameters":
+        """Pick the best grid candidate of each series of ``values`` (series, day).
+
+        Trailing days without observations are dropped first, so the hold-out
+        window ends on the last published day.
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        observed = np.flatnonzero(~np.isnan(values).all(axis=0))
+        if observed.size == 0:
+            raise ValueError("No observations to tune on.")
+        values = values[:, :observed[-1] + 1]
+        if values.shape[1] - holdout_days < 2 * seasonal_periods:
+            raise ValueError(
+                f"Need {2 * seasonal_periods} days before a {holdout_days}-day hold-out."
+            )
+
+        candidates = np.array(list(product(alphas, gammas)))
+        n_series, n_candidates = values.shape[0], candidates.shape[0]
+        # Series-major batch: rows [s * C, (s + 1) * C) are the candidates of series s
+        batch = np.repeat(values, n_candidates, axis=0)
+        train, holdout = batch[:, :-holdout_days], batch[:, -holdout_days:]
+        state = weather_holtwinters.fit(
+            train,
+            seasonal_periods,
+            alpha=np.tile(candidates[:, 0], n_series),
+            gamma=np.tile(candidates[:, 1], n_series),
+        )
+
+        total = np.zeros(batch.shape[0])
+        count = np.zeros(batch.shape[0])
+        origins = range(0, holdout_days - TUNING_HORIZON + 1, TUNING_STEP_DAYS)
+        for origin in origins:
+            error = np.abs(
+                weather_holtwinters.forecast(state, TUNING_HORIZON)
+                - holdout[:, origin:origin + TUNING_HORIZON]
+            )
+            total += np.nansum(error, axis=1)
+            count += np.count_nonzero(~np.isnan(error), axis=1)
+            weather_holtwinters.smooth(state, holdout[:, origin:origin + TUNING_STEP_DAYS])
+
+        error = (total / np.maximum(count, 1)).reshape(n_series, n_candidates)
+        best = np.argmin(error, axis=1)
+        return cls(
+            alpha=candidates[best, 0],
+            gamma=candidates[best, 1],
+            error=error[np.arange(n_series), best],
+        )
+
+    @classmethod
+    def default(
+        cls,
+        temperature: Tuple[float, float],
+        rain: Tuple[float, float],
+    ) -> "SmoothingParameters":
+        """Untuned parameters from (alpha, gamma) pairs."""
+        return cls(
+            alpha=np.array([temperature[0], rain[0]]),
+            gamma=np.array([temperature[1], rain[1]]),
+            error=np.full(2, np.nan),
+        )
+
+    def save(self, path: Path) -> None:
+        """Persist the parameters to an ``.npz`` file."""
+        weather_storage.save_npz(path, alpha=self.alpha, gamma=self.gamma, error=self.error)
+
+    @classmethod
+    def load(cls, path: Path) -> "SmoothingParameters":
+        """Load parameters written by save."""
+        with np.load(path) as data:
+            return cls(alpha=data["alpha"], gamma=data["gamma"], error=data["error"])
+
+
+def stack(parameters: List[SmoothingParameters]) -> Tuple[np.ndarray, np.ndarray]:
+    """alpha and gamma of a (temperature..., rain...) batch, one entry per location."""
+    alpha = np.stack([item.alpha for item in parameters], axis=1).ravel()
+    gamma = np.stack([item.gamma for item in parameters], axis=1).ravel()
+    return alpha, gamma
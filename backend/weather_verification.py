@@ -0,0 +1,389 @@
+"""Verification of stored forecasts and estimates against the daily archive.
+
+Forecasts are flattened into one record per (source, cell, lead day, valid
+day), where the source is a forecast model or an estimate method. The archive
+of every cell is fetched once over the valid days and gathered onto the
+records by index; the sums behind MAE, bias and the Brier score of rain are
+then reduced per (source, cell, lead) group with ``np.bincount``. Coarser
+tables (per source and lead, per source, ...) are regrouped from those sums.
+Scores of the forecast history store are cached per cell and valid day, so
+only days observed since the last call are fetched and scored.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from backend import (
+    weather_climatology,
+    weather_forecast,
+    weather_forecast_store,
+    weather_historic,
+    weather_storage,
+)
+
+# Archive days younger than this are not published yet
+OBSERVATION_LAG_DAYS = 5
+# Daily forecast variable verified against each archive variable
+FORECAST_VARIABLES = {
+    "temperature": "temperature_2m_mean",
+    "rain": "precipitation_sum",
+    "chance": "precipitation_probability_max",
+}
+# Archive variable observing each verified variable; forecast precipitation includes snowfall
+OBSERVED_VARIABLES = {"temperature": "temperature_2m_mean", "rain": "precipitation_sum"}
+# Estimates model rain without snowfall (see weather_historic.DAILY_VARIABLES)
+ESTIMATE_OBSERVED_VARIABLES = {**OBSERVED_VARIABLES, "rain": "rain_sum"}
+GROUP_KEYS = ["source", "latitude", "longitude", "lead"]
+# Groups of the store cache: one per valid day besides the GROUP_KEYS
+CACHE_KEYS = GROUP_KEYS + ["valid"]
+
+
+@dataclass
+class ForecastSet:
+    """Flat forecast records; chance of rain is a probability (0-1), NaN if unknown."""
+
+    sources: np.ndarray
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    leads: np.ndarray
+    valid: np.ndarray
+    temperature: np.ndarray
+    rain: np.ndarray
+    chance: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.leads.size)
+
+    def subset(self, rows: np.ndarray) -> "ForecastSet":
+        """The records selected by an index or boolean mask."""
+        return ForecastSet(**{item.name: getattr(self, item.name)[rows] for item in fields(self)})
+
+    def key(self, name: str) -> np.ndarray:
+        """Records' values of a group key of GROUP_KEYS or CACHE_KEYS."""
+        return {
+            "source": self.sources,
+            "latitude": self.latitudes,
+            "longitude": self.longitudes,
+            "lead": self.leads,
+            "valid": self.valid,
+        }[name]
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List[Any]]) -> "ForecastSet":
+        """Build from lists keyed by field name, with the canonical dtypes."""
+        return cls(
+            sources=np.array(columns["sources"], dtype=str),
+            latitudes=np.array(columns["latitudes"], dtype=np.float64),
+            longitudes=np.array(columns["longitudes"], dtype=np.float64),
+            leads=np.array(columns["leads"], dtype=np.int64),
+            valid=np.array(columns["valid"], dtype="datetime64[D]"),
+            temperature=np.array(columns["temperature"], dtype=np.float32),
+            rain=np.array(columns["rain"], dtype=np.float32),
+            chance=np.array(columns["chance"], dtype=np.float32),
+        )
+
+    @classmethod
+    def from_store(
+        cls,
+        store: weather_forecast_store.ForecastStore | None = None,
+        models: Sequence[str] | None = None,
+        since: datetime | None = None,
+        cells: Sequence[str] | None = None,
+    ) -> "ForecastSet":
+        """Every daily forecast of the forecast history store, or of some of its cells.
+
+        The lead of a day is its position in the run's daily block, so the day
+        a forecast was fetched on has lead 0.
+        """
+        store = store or weather_forecast_store.get_store()
+        columns: Dict[str, List[Any]] = {item.name: [] for item in fields(cls)}
+        for cell, model in store.cells():
+            if models is not None and model not in models:
+                continue
+            if cells is not None and cell not in cells:
+                continue
+            latitude, longitude = (float(part) for part in cell.split("_"))
+            for run in store.daily_runs(cell, model, since):
+                n_days = run.values.shape[1]
+                columns["sources"].append(np.full(n_days, model))
+                columns["latitudes"].append(np.full(n_days, latitude))
+                columns["longitudes"].append(np.full(n_days, longitude))
+                columns["leads"].append(np.arange(n_days))
+                columns["valid"].append(run.start + np.arange(n_days))
+                columns["temperature"].append(run.series(FORECAST_VARIABLES["temperature"]))
+                columns["rain"].append(run.series(FORECAST_VARIABLES["rain"]))
+                columns["chance"].append(run.series(FORECAST_VARIABLES["chance"]) / 100.0)
+        return cls.from_columns({
+            name: np.concatenate(parts) if parts else []
+            for name, parts in columns.items()
+        })
+
+    @classmethod
+    def from_estimates(cls, records: Iterable[Dict[str, Any]]) -> "ForecastSet":
+        """Records of estimates shaped like estimate_result output.
+
+        Each record holds "Source", "Latitude", "Longitude", "Issued" and
+        "Valid" dates besides the estimate keys "Temperature", "Rainfall" and,
+        optionally, "Chance of Rain" in %. Verify them against
+        ESTIMATE_OBSERVED_VARIABLES.
+        """
+        columns: Dict[str, List[Any]] = {item.name: [] for item in fields(cls)}
+        for record in records:
+            columns["sources"].append(record["Source"])
+            columns["latitudes"].append(record["Latitude"])
+            columns["longitudes"].append(record["Longitude"])
+            columns["leads"].append((record["Valid"] - record["Issued"]).days)
+            columns["valid"].append(record["Valid"])
+            columns["temperature"].append(record["Temperature"])
+            columns["rain"].append(record["Rainfall"])
+            chance = record.get("Chance of Rain")
+            columns["chance"].append(np.nan if chance is None else chance / 100.0)
+        return cls.from_columns(columns)
+
+
+def observe(
+    forecasts: ForecastSet,
+    fetch: Callable[..., Dict[str, Any]] = weather_historic.fetch_daily_archive,
+    variables: Dict[str, str] = OBSERVED_VARIABLES,
+) -> Dict[str, np.ndarray]:
+    """Archive observations of every record's cell and valid day, NaN if not published.
+
+    Returns one array per key of ``variables``, observed by its archive
+    variable. Each distinct cell is fetched once, over the valid days of its
+    records.
+    """
+    observed = {
+        name: np.full(len(forecasts), np.nan, dtype=np.float32) for name in variables
+    }
+    latest = date.today() - relativedelta(days=OBSERVATION_LAG_DAYS)
+    cells, inverse = np.unique(
+        np.stack([forecasts.latitudes, forecasts.longitudes], axis=1), axis=0, return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+    for index, (latitude, longitude) in enumerate(cells):
+        rows = np.flatnonzero(inverse == index)
+        first = forecasts.valid[rows].min().item()
+        last = min(forecasts.valid[rows].max().item(), latest)
+        if last < first:
+            continue
+        daily_data = fetch(
+            *weather_historic.grid_cell(latitude, longitude), first, last, list(variables.values())
+        )
+        offset = (forecasts.valid[rows] - np.datetime64(first, "D")).astype(np.int64)
+        inside = offset <= (last - first).days
+        for name, variable in variables.items():
+            observed[name][rows[inside]] = daily_data[variable][offset[inside]]
+    return observed
+
+
+def _group(keys: Sequence[np.ndarray]) -> tuple[List[np.ndarray], np.ndarray]:
+    """Distinct key combinations and the group of every row."""
+    codes = np.zeros(keys[0].size, dtype=np.int64)
+    for key in keys:
+        values, inverse = np.unique(key, return_inverse=True)
+        codes = codes * values.size + inverse.reshape(-1)
+    _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    return [key[first] for key in keys], inverse.reshape(-1)
+
+
+@dataclass
+class Scores:
+    """Per-group sums of verified forecasts, with the scores derived from them.
+
+    ``keys`` holds the group key arrays (a subset of CACHE_KEYS) and ``sums``
+    the counts and error sums per variable, all of shape (group,).
+    """
+
+    keys: Dict[str, np.ndarray]
+    sums: Dict[str, np.ndarray]
+
+    @classmethod
+    def compute(
+        cls,
+        forecasts: ForecastSet,
+        observed: Dict[str, np.ndarray],
+        by: Sequence[str] = GROUP_KEYS,
+    ) -> "Scores":
+        """Reduce every record into its (source, cell, lead) group, or its ``by`` group.
+
+        ``observed`` holds the "temperature" and "rain" observed on every record.
+        """
+        temperature_error = forecasts.temperature - observed["temperature"]
+        rain_error = forecasts.rain - observed["rain"]
+        wet = (observed["rain"] >= weather_climatology.WET_DAY_THRESHOLD).astype(np.float32)
+        chance_error = np.where(np.isnan(observed["rain"]), np.nan, forecasts.chance - wet)
+
+        keys, inverse = _group([forecasts.key(name) for name in by])
+        n_groups = keys[0].size
+
+        def total(values: np.ndarray) -> np.ndarray:
+            valid = ~np.isnan(values)
+            return np.bincount(inverse[valid], values[valid].astype(np.float64), minlength=n_groups)
+
+        def count(values: np.ndarray) -> np.ndarray:
+            return np.bincount(inverse, ~np.isnan(values), minlength=n_groups)
+
+        return cls(
+            keys=dict(zip(by, keys)),
+            sums={
+                "temperature n": count(temperature_error),
+                "temperature abs error": total(np.abs(temperature_error)),
+                "temperature error": total(temperature_error),
+                "rain n": count(rain_error),
+                "rain abs error": total(np.abs(rain_error)),
+                "rain error": total(rain_error),
+                "chance n": count(chance_error),
+                "chance squared error": total(chance_error ** 2),
+            },
+        )
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["Scores"]) -> "Scores":
+        """Groups of several scores with the same keys, as one."""
+        return cls(
+            keys={name: np.concatenate([part.keys[name] for part in parts]) for name in parts[0].keys},
+            sums={name: np.concatenate([part.sums[name] for part in parts]) for name in parts[0].sums},
+        )
+
+    def subset(self, groups: np.ndarray) -> "Scores":
+        """The groups selected by an index or boolean mask."""
+        return Scores(
+            keys={name: values[groups] for name, values in self.keys.items()},
+            sums={name: values[groups] for name, values in self.sums.items()},
+        )
+
+    def regroup(self, by: Sequence[str]) -> "Scores":
+        """Coarser scores, e.g. ``by=["source", "lead"]`` pools every location."""
+        keys, inverse = _group([self.keys[name] for name in by])
+        return Scores(
+            keys=dict(zip(by, keys)),
+            sums={
+                name: np.bincount(inverse, values, minlength=keys[0].size)
+                for name, values in self.sums.items()
+            },
+        )
+
+    def scores(self) -> Dict[str, np.ndarray]:
+        """MAE and bias of temperature and rain and the Brier score of rain, per group."""
+        def ratio(total: str, count: str) -> np.ndarray:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(self.sums[count] > 0, self.sums[total] / self.sums[count], np.nan)
+
+        return {
+            "Temperature MAE": ratio("temperature abs error", "temperature n"),
+            "Temperature Bias": ratio("temperature error", "temperature n"),
+            "Rainfall MAE": ratio("rain abs error", "rain n"),
+            "Rainfall Bias": ratio("rain error", "rain n"),
+            "Rain Brier Score": ratio("chance squared error", "chance n"),
+            "Verified Days": self.sums["temperature n"].astype(np.int64),
+        }
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One dict per group with its keys and scores, ready for a table."""
+        columns = {**self.keys, **self.scores()}
+        return [
+            {name: values[index].item() for name, values in columns.items()}
+            for index in range(next(iter(self.keys.values())).size)
+        ]
+
+    def save(self, path: Path) -> None:
+        """Persist the sums to an ``.npz`` file."""
+        weather_storage.save_npz(
+            path,
+            **{f"key {name}": values for name, values in self.keys.items()},
+            **{f"sum {name}": values for name, values in self.sums.items()},
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "Scores":
+        """Load scores written by save."""
+        with np.load(path) as data:
+            return cls(
+                keys={name[4:]: data[name] for name in data.files if name.startswith("key ")},
+                sums={name[4:]: data[name] for name in data.files if name.startswith("sum ")},
+            )
+
+
+def verify(
+    forecasts: ForecastSet,
+    fetch: Callable[..., Dict[str, Any]] = weather_historic.fetch_daily_archive,
+    variables: Dict[str, str] = OBSERVED_VARIABLES,
+) -> Scores:
+    """Scores of a forecast set against the archive ``variables``."""
+    return Scores.compute(forecasts, observe(forecasts, fetch, variables))
+
+
+def _cell_scores(
+    store: weather_forecast_store.ForecastStore,
+    cell: str,
+    fetch: Callable[..., Dict[str, Any]],
+) -> Scores:
+    """Scores of the store's forecasts of a cell per valid day, from its cache file.
+
+    A day is only scored once it may be observed, and no run fetched later
+    can reach back to it, so only the runs reaching past the last cached day
+    are read. Days less than ARCHIVE_FINAL_DAYS old may still be revised by
+    the archive; they are evicted and rescored when the cache is from an
+    earlier day.
+    """
+    today = date.today()
+    latest = np.datetime64(today - relativedelta(days=OBSERVATION_LAG_DAYS), "D")
+    final_before = np.datetime64(
+        today - relativedelta(days=weather_historic.ARCHIVE_FINAL_DAYS), "D"
+    )
+    path = weather_storage.cache_path("verification", f"{cell}.npz")
+    kept = []
+    since = None
+    if path.exists():
+        cached = Scores.load(path)
+        if date.fromtimestamp(path.stat().st_mtime) == today:
+            return cached
+        final = cached.subset(cached.keys["valid"] < final_before)
+        if final.keys["valid"].size:
+            kept.append(final)
+            scored_until = final.keys["valid"].max().item()
+            since = datetime.combine(
+                scored_until - relativedelta(days=weather_forecast.FORECAST_DAYS),
+                datetime.min.time(),
+            )
+
+    forecasts = ForecastSet.from_store(store, since=since, cells=[cell])
+    pending = forecasts.valid <= latest
+    if kept:
+        pending &= forecasts.valid > kept[0].keys["valid"].max()
+    forecasts = forecasts.subset(pending)
+    scores = Scores.concatenate(
+        kept + [Scores.compute(forecasts, observe(forecasts, fetch), CACHE_KEYS)]
+    )
+    scores.save(path)
+    return scores
+
+
+def verify_store(
+    models: Sequence[str] | None = None,
+    since: datetime | None = None,
+    store: weather_forecast_store.ForecastStore | None = None,
+    fetch: Callable[..., Dict[str, Any]] = weather_historic.fetch_daily_archive,
+) -> Scores:
+    """Scores of the forecasts in the forecast history store, from the per-cell caches.
+
+    ``models`` and ``since`` (the earliest fetch day) select the forecasts
+    scored; the caches always hold every model.
+    """
+    store = store or weather_forecast_store.get_store()
+    cells = sorted({cell for cell, _ in store.cells()})
+    if not cells:
+        return verify(ForecastSet.from_store(store), fetch)
+    scores = Scores.concatenate([_cell_scores(store, cell, fetch) for cell in cells])
+    selected = np.ones(scores.keys["lead"].size, dtype=bool)
+    if models is not None:
+        selected &= np.isin(scores.keys["source"], list(models))
+    if since is not None:
+        issued = scores.keys["valid"] - scores.keys["lead"].astype("timedelta64[D]")
+        selected &= issued >= np.datetime64(since.date(), "D")
+    return scores.subset(selected).regroup(GROUP_KEYS)
@@ -0,0 +1,124 @@
+"""Micro-benchmark: pandas vs NumPy decoding of a ten-year daily archive block.
+
+Run from the repository root: ``python benchmarks/decode_benchmark.py``.
+The daily block is a stand-in exposing the same accessors as the Open-Meteo
+flatbuffer, so only the decode work itself is measured.
+"""
+
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend import weather_historic  # noqa: E402
+
+DAYS = 3653
+REPEATS = 200
+
+
+class _Variable:
+    """Stand-in for VariableWithValues."""
+
+    def __init__(self, values: np.ndarray) -> None:
+        self._values = values
+
+    def ValuesAsNumpy(self) -> np.ndarray:  # noqa: N802
+        return self._values
+
+
+class _Daily:
+    """Stand-in for VariablesWithTime holding rain and mean temperature."""
+
+    def __init__(self, days: int) -> None:
+        rng = np.random.default_rng(0)
+        self._start = 1_445_385_600
+        self._days = days
+        self._variables = [
+            _Variable(rng.gamma(0.5, 4.0, days).astype(np.float32)),
+            _Variable(rng.normal(12.0, 6.0, days).astype(np.float32)),
+        ]
+
+    def Time(self) -> int:  # noqa: N802
+        return self._start
+
+    def TimeEnd(self) -> int:  # noqa: N802
+        return self._start + 86400 * self._days
+
+    def Interval(self) -> int:  # noqa: N802
+        return 86400
+
+    def Variables(self, index: int) -> _Variable:  # noqa: N802
+        return self._variables[index]
+
+    def VariablesLength(self) -> int:  # noqa: N802
+        return len(self._variables)
+
+
+def pandas_decode(daily: Any) -> Any:
+    """The DataFrame path calculate_forecast used before the NumPy decode."""
+    import pandas as pd
+
+    daily_data = {"date": pd.date_range(
+        start=pd.to_datetime(daily.Time(), unit="s", utc=True),
+        end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
+        freq=pd.Timedelta(seconds=daily.Interval()),
+        inclusive="left"
+    )}
+    daily_data["rain_sum"] = daily.Variables(0).ValuesAsNumpy()
+    daily_data["temperature_2m_mean"] = daily.Variables(1).ValuesAsNumpy()
+    dataframe = pd.DataFrame(data=daily_data)
+    dataframe["date"] = pd.to_datetime(dataframe["date"]).dt.tz_convert(None)
+    return dataframe.set_index("date")
+
+
+def numpy_decode(daily: Any) -> Any:
+    """The datetime64/float32 path of weather_historic."""
+    return weather_historic.decode_daily(daily)
+
+
+def measure(decode: Callable[[Any], Any], daily: Any) -> tuple[float, int]:
+    """Mean decode time in microseconds and peak traced memory in bytes."""
+    decode(daily)
+    seconds = timeit.timeit(lambda: decode(daily), number=REPEATS) / REPEATS
+    tracemalloc.start()
+    decode(daily)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds * 1e6, peak
+
+
+def import_time(module: str) -> float:
+    """Wall time in milliseconds of importing a module in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print((time.perf_counter() - start) * 1e3)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    return float(result.stdout.strip())
+
+
+def main() -> None:
+    """Print decode time, peak memory and import cost of both paths."""
+    daily = _Daily(DAYS)
+    print(f"{DAYS} days x 2 variables, mean of {REPEATS} runs")
+    for name, decode in (("pandas", pandas_decode), ("numpy", numpy_decode)):
+        micros, peak = measure(decode, daily)
+        print(f"{name:>7}: {micros:9.1f} µs  peak {peak / 1024:8.1f} KiB")
+    print(f"import pandas:                   {import_time('pandas'):7.1f} ms")
+    print(f"import backend.weather_historic: {import_time('backend.weather_historic'):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Shared fixtures: an isolated cache directory and an offline Open-Meteo client."""
+
+import os
+import tempfile
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+# Module-level paths (tiles, HTTP cache) are derived from this at import time
+os.environ.setdefault("WEATHER_CACHE_DIR", tempfile.mkdtemp(prefix="weather_cache_"))
+
+from backend import weather_client, weather_historic, weather_storage  # noqa: E402
+
+
+class FakeVariable:
+    """One variable of a fake response block."""
+
+    def __init__(self, values: np.ndarray) -> None:
+        self.values = values
+
+    def ValuesAsNumpy(self) -> np.ndarray:  # noqa: N802
+        return self.values
+
+
+class FakeBlock:
+    """Daily or hourly block of a fake response."""
+
+    def __init__(self, variables: List[np.ndarray], start: int, interval: int) -> None:
+        self.variables = [FakeVariable(values) for values in variables]
+        self.start = start
+        self.interval = interval
+
+    def Variables(self, index: int) -> FakeVariable:  # noqa: N802
+        return self.variables[index]
+
+    def VariablesLength(self) -> int:  # noqa: N802
+        return len(self.variables)
+
+    def Time(self) -> int:  # noqa: N802
+        return self.start
+
+    def TimeEnd(self) -> int:  # noqa: N802
+        return self.start + self.variables[0].values.size * self.interval
+
+    def Interval(self) -> int:  # noqa: N802
+        return self.interval
+
+
+class FakeResponse:
+    """Response of one location, shaped like an openmeteo_requests response."""
+
+    def __init__(self, daily: FakeBlock, latitude: float, longitude: float, utc_offset: int):
+        self.daily = daily
+        self.latitude = latitude
+        self.longitude = longitude
+        self.utc_offset = utc_offset
+
+    def Daily(self) -> FakeBlock:  # noqa: N802
+        return self.daily
+
+    def Latitude(self) -> float:  # noqa: N802
+        return self.latitude
+
+    def Longitude(self) -> float:  # noqa: N802
+        return self.longitude
+
+    def UtcOffsetSeconds(self) -> int:  # noqa: N802
+        return self.utc_offset
+
+
+def _noise(days: np.ndarray, latitude: float, salt: float) -> np.ndarray:
+    """Pseudo-random values in [0, 1) that only depend on the day and place."""
+    phase = np.sin(days * 12.9898 + latitude * 78.233 + salt) * 43758.5453
+    return phase - np.floor(phase)
+
+
+def daily_series(variable: str, latitude: float, days: np.ndarray) -> np.ndarray:
+    """Seasonal series of a variable on day ordinals, quantized like the codec."""
+    season = np.sin(2 * np.pi * (days - 100) / 365.25)
+    if variable in ("rain_sum", "precipitation_sum", "snowfall_sum"):
+        wet = _noise(days, latitude, 1.0) < 0.35 + 0.15 * season
+        values = np.where(wet, -6.0 * np.log1p(-0.95 * _noise(days, latitude, 2.0)), 0.0)
+    elif variable.startswith("temperature"):
+        values = 12 + latitude / 10 + 8 * season + 4 * (_noise(days, latitude, 3.0) - 0.5)
+    else:
+        values = 10 + 5 * season + 10 * _noise(days, latitude, 4.0)
+    return np.round(values, 1).astype(np.float32)
+
+
+class FakeClient:
+    """Offline archive API: every value depends only on (latitude, day, variable).
+
+    ``utc_offset`` is reported by every response and its timestamps are
+    shifted accordingly. ``trailing_missing`` maps a latitude to the number of
+    days before ``today - 5`` whose temperature is not published yet.
+    """
+
+    def __init__(self) -> None:
+        self.utc_offset = 0
+        self.trailing_missing: Dict[float, int] = {}
+        self.requests: List[Dict[str, Any]] = []
+
+    def weather_api(self, url: str, params: Dict[str, Any], **kwargs: Any) -> List[FakeResponse]:
+        self.requests.append(params)
+        latitudes, longitudes = params["latitude"], params["longitude"]
+        if not isinstance(latitudes, list):
+            latitudes, longitudes = [latitudes], [longitudes]
+        start = date.fromisoformat(params["start_date"])
+        end = date.fromisoformat(params["end_date"])
+        variables = params["daily"]
+        days = np.arange(start.toordinal(), end.toordinal() + 1)
+        midnight = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+
+        responses = []
+        for latitude, longitude in zip(latitudes, longitudes):
+            columns = [daily_series(variable, latitude, days) for variable in variables]
+            missing = self.trailing_missing.get(latitude, 0)
+            published = date.today().toordinal() - 5 - missing
+            for variable, values in zip(variables, columns):
+                if variable.startswith("temperature"):
+                    values[days > published] = np.nan
+            block = FakeBlock(columns, int(midnight.timestamp()) - self.utc_offset, 86400)
+            responses.append(FakeResponse(block, latitude, longitude, self.utc_offset))
+        return responses
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Every test starts with empty on-disk and in-memory caches."""
+    monkeypatch.setattr(weather_storage, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(weather_historic, "_LOCATION_MODELS", {})
+    monkeypatch.setattr(weather_historic, "_ARCHIVE_CHUNKS", {})
+    return tmp_path
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    """Route every Open-Meteo request to a FakeClient."""
+    client = FakeClient()
+    monkeypatch.setattr(weather_client, "get_client", lambda: client)
+    return client
@@ -0,0 +1,56 @@
+"""Analog queries, against the offline archive."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from backend import weather_analogs, weather_historic
+
+LATITUDE, LONGITUDE = weather_historic.grid_cell(48.2, 16.4)
+
+
+def test_query_before_the_first_full_window_is_rejected(fake_client):
+    index = weather_historic.analogs_for(LATITUDE, LONGITUDE)
+    first = index.dates[0].item()
+    with pytest.raises(ValueError):
+        index.query(first + relativedelta(days=index.window - 2))
+    assert index.query(first + relativedelta(days=index.window + 400), k=3).dates.size == 3
+
+
+def test_window_feature_matches_the_index(fake_client):
+    index = weather_historic.analogs_for(LATITUDE, LONGITUDE)
+    values = dict(zip(weather_analogs.FEATURE_VARIABLES, index.values[:, 400:500]))
+    feature = index.window_feature(index.dates[400:500], values)
+    np.testing.assert_allclose(feature, index.features()[500 - index.window], rtol=1e-6)
+
+
+def test_estimate_queries_the_latest_archive_week(fake_client, monkeypatch):
+    # An index built 25 days ago, still within STATE_REFIT_DAYS
+    stale = date.today() - relativedelta(days=25)
+    index = weather_historic.analogs_for(LATITUDE, LONGITUDE, last_updated_date=stale)
+    assert index.dates[-1].item() == stale
+
+    queries = []
+    query = weather_analogs.AnalogIndex.query
+
+    def spy(self, end_date, *args, **kwargs):
+        queries.append((end_date, kwargs.get("feature")))
+        return query(self, end_date, *args, **kwargs)
+
+    monkeypatch.setattr(weather_analogs.AnalogIndex, "query", spy)
+    target = date.today() + relativedelta(days=3)
+    result = weather_historic.estimate_analogs(LATITUDE, LONGITUDE, target, k=5)
+
+    published = date.today() - relativedelta(days=5)
+    (end_date, feature), = queries
+    assert end_date == published
+    recent = weather_historic.fetch_daily_archive(
+        LATITUDE, LONGITUDE, published - relativedelta(days=index.window - 1), published,
+        weather_analogs.FEATURE_VARIABLES,
+    )
+    np.testing.assert_allclose(
+        feature, index.window_feature(recent["date"], recent), rtol=1e-6
+    )
+    assert np.isfinite(result["Analog Distance"])
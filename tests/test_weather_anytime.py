@@ -0,0 +1,47 @@
+"""Anytime estimates share one full run per cell and date and never block on it."""
+
+import threading
+import time
+from datetime import date
+
+from backend import weather_anytime, weather_historic
+
+
+def test_refreshes_share_the_running_full_model(monkeypatch):
+    release = threading.Event()
+    runs = []
+
+    def calculate_forecast(latitude, longitude, specified_date, prefer_tiles):
+        runs.append((latitude, longitude))
+        release.wait(5)
+        return {"Temperature": 20.0, "Rainfall": 1.0}
+
+    monkeypatch.setattr(weather_historic, "calculate_forecast", calculate_forecast)
+    monkeypatch.setattr(weather_historic, "estimate_from_cache", lambda *args: None)
+    monkeypatch.setattr(weather_historic, "estimate_from_tiles", lambda *args: None)
+    refined = []
+    delivered = threading.Semaphore(0)
+
+    def on_refine(result):
+        refined.append(result)
+        delivered.release()
+
+    started = time.monotonic()
+    placeholders = [
+        weather_anytime.estimate_anytime(
+            48.21, 16.37, date(2030, 6, 1), budget=0.05, on_refine=on_refine
+        )
+        for _ in range(3)
+    ]
+    assert time.monotonic() - started < 1.0
+    assert all(
+        placeholder["Fidelity"] == weather_anytime.FIDELITY_PENDING
+        and "Temperature" not in placeholder
+        for placeholder in placeholders
+    )
+
+    release.set()
+    for _ in placeholders:
+        assert delivered.acquire(timeout=5)
+    assert runs == [weather_historic.grid_cell(48.21, 16.37)]
+    assert [result["Fidelity"] for result in refined] == [weather_anytime.FIDELITY_FULL] * 3
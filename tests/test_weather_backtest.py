@@ -0,0 +1,27 @@
+"""Backtest estimators only see the archive up to each origin."""
+
+from datetime import date
+
+import numpy as np
+from conftest import daily_series
+
+from backend import weather_backtest
+
+# Day ordinals of 2000-2012
+DAYS = date(2000, 1, 1).toordinal() + np.arange(13 * 365)
+
+
+def test_holt_winters_does_not_see_past_its_origins():
+    values = np.stack([
+        daily_series("temperature_2m_mean", 48.2, DAYS),
+        daily_series("rain_sum", 48.2, DAYS),
+    ]).astype(np.float64)
+    origins = np.arange(11 * 365, 11 * 365 + 100, weather_backtest.ORIGIN_STEP_DAYS)
+    leads = np.array(weather_backtest.BACKTEST_LEADS)
+    forecast = weather_backtest.holt_winters_estimator(None, values, origins, leads)
+
+    changed = values.copy()
+    changed[:, origins[3] + 1:] += 5.0
+    perturbed = weather_backtest.holt_winters_estimator(None, changed, origins, leads)
+    np.testing.assert_array_equal(perturbed[:4], forecast[:4])
+    assert not np.allclose(perturbed[4:, :2], forecast[4:, :2])
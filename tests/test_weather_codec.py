@@ -0,0 +1,87 @@
+"""Codec round trips and the size it saves over float32."""
+
+import io
+from datetime import date
+
+import numpy as np
+import pytest
+from conftest import daily_series
+
+from backend import weather_codec, weather_historic
+
+# Day ordinals of 2000-2009
+DECADE = date(2000, 1, 1).toordinal() + np.arange(3653)
+
+
+def _quantized(variable: str, values: np.ndarray) -> np.ndarray:
+    """What a lossless codec must give back: the values on the codec scale."""
+    scale = weather_codec.SCALES.get(variable, weather_codec.DEFAULT_SCALE)
+    values = np.asarray(values, dtype=np.float64)
+    quantized = np.round(np.where(np.isnan(values), 0.0, values) / scale).astype(np.int64)
+    return np.where(np.isnan(values), np.nan, (quantized * scale).astype(np.float32))
+
+
+def _npz_size(arrays, compressed: bool = True) -> int:
+    buffer = io.BytesIO()
+    (np.savez_compressed if compressed else np.savez)(buffer, **arrays)
+    return buffer.tell()
+
+
+def _round_trip(values):
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **weather_codec.to_arrays(weather_codec.encode(values)))
+    buffer.seek(0)
+    with np.load(buffer) as data:
+        return weather_codec.from_arrays(data)
+
+
+SERIES = {
+    "temperature_2m_mean": np.array([10.0, 10.1, np.nan, np.nan, 9.9, 40.0, -35.2, 12.34, 12.36]),
+    "cloud_cover_mean": np.array([np.nan, np.nan, 0.0, 100.0, 0.0, 55.5, np.nan]),
+    "rain_sum": np.concatenate([[np.nan, 0.0, 3.2], np.zeros(600), [150.0, np.nan, np.nan, 0.04]]),
+    "snowfall_sum": np.concatenate([np.zeros(256), [0.07, 0.0, 2.345], np.zeros(255), [1.0]]),
+    "precipitation_sum": np.zeros(0),
+}
+
+
+@pytest.mark.parametrize("variable", SERIES)
+def test_round_trip_is_lossless_on_the_codec_scale(variable):
+    values = SERIES[variable]
+    decoded = weather_codec.encode_series(variable, values).decode()
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, _quantized(variable, values))
+    np.testing.assert_array_equal(_round_trip({variable: values})[variable], decoded)
+
+
+def test_archive_chunk_round_trip_and_size():
+    values = {
+        variable: daily_series(variable, 48.2, DECADE)
+        for variable in weather_historic.DAILY_VARIABLES
+    }
+    values["temperature_2m_mean"][-5:] = np.nan
+    decoded = _round_trip(values)
+    for variable, series in values.items():
+        np.testing.assert_array_equal(decoded[variable], _quantized(variable, series))
+
+    # A decade chunk of every daily variable, against storing it as float32
+    encoded = weather_codec.encode(values)
+    encoded_size = _npz_size(weather_codec.to_arrays(encoded))
+    assert 4 * encoded_size <= _npz_size(values, compressed=False)
+    assert encoded_size < 0.7 * _npz_size(values)
+    # Held in memory, run-length pairs take three bytes per wet day
+    assert 3 * sum(series.nbytes for series in encoded.values()) <= sum(
+        series.nbytes for series in values.values()
+    )
+    assert all(series.values.dtype == np.int16 for series in encoded.values())
+
+
+def test_older_codec_versions_read_as_empty():
+    arrays = weather_codec.to_arrays(weather_codec.encode(SERIES))
+    arrays[f"codec{weather_codec.SEPARATOR}version"] = np.array(1)
+    assert weather_codec.load_arrays(arrays) == {}
+    assert weather_codec.from_arrays(arrays) == {}
+
+
+def test_values_outside_int16_are_rejected():
+    with pytest.raises(ValueError):
+        weather_codec.encode_series("temperature_2m_mean", np.array([0.0, 5000.0]))
@@ -0,0 +1,178 @@
+"""WeatherData state handling that does not need the network."""
+
+import threading
+from datetime import date
+
+import numpy as np
+
+from backend import weather_forecast, weather_historic
+
+
+def _estimate(temperature: float) -> dict:
+    return {
+        "Temperature": temperature,
+        "Rainfall": 0.0,
+        "Chance of Rain": 10.0,
+        "Grid Latitude": 1.0,
+        "Grid Longitude": 2.0,
+    }
+
+
+def test_refined_estimate_is_handed_over_not_applied(monkeypatch):
+    refinements = []
+
+    def estimate_anytime(latitude, longitude, specified_date, budget, on_refine, on_error):
+        on_refine(_estimate(20.0))
+        return _estimate(10.0)
+
+    monkeypatch.setattr(weather_forecast.weather_anytime, "estimate_anytime", estimate_anytime)
+    weather_data = weather_forecast.WeatherData(
+        est_input_date=date.today().isoformat(), est_input_date_check=True
+    )
+    weather_data.on_estimate_refined = lambda request, result: refinements.append(
+        (request, result)
+    )
+
+    weather_data.est_weather_cache = weather_data.est_weather_data()
+    assert weather_data.est_weather_cache["Temperature"] == 10.0
+    (request, result), = refinements
+
+    assert weather_data.apply_refined_estimate(request, result)
+    assert weather_data.est_weather_cache["Temperature"] == 20.0
+    assert not weather_data.apply_refined_estimate((0.0, 0.0, "2000-01-01"), _estimate(30.0))
+    assert weather_data.est_weather_cache["Temperature"] == 20.0
+
+
+def _daily_forecast(**overrides) -> dict:
+    daily = {variable: [1.0, 2.0] for variable in weather_forecast.FORECAST_ESTIMATE_KEYS.values()}
+    daily["time"] = ["2025-06-01", "2025-06-02"]
+    daily.update(overrides)
+    return {"daily": daily, "latitude": 1.0, "longitude": 2.0}
+
+
+def test_forecast_estimate_needs_every_value():
+    estimate = weather_forecast.estimate_from_forecast(_daily_forecast(), "2025-06-02")
+    assert estimate["Wind Speed"] == 2.0 and estimate["Rainfall"] == 2.0
+    assert weather_forecast.estimate_from_forecast(_daily_forecast(), "2025-06-03") is None
+
+    missing_cloud = _daily_forecast(cloud_cover_mean=[1.0, None])
+    assert weather_forecast.estimate_from_forecast(missing_cloud, "2025-06-02") is None
+    assert weather_forecast.estimate_from_forecast(missing_cloud, "2025-06-01") is not None
+
+
+def _summary(hours, chance) -> weather_forecast.weather_ensemble.EnsembleSummary:
+    """An ensemble summary with only an hourly chance of rain."""
+    return weather_forecast.weather_ensemble.EnsembleSummary(
+        times=np.array(hours, dtype="datetime64[h]"),
+        dates=np.array([hours[0][:10]], dtype="datetime64[D]"),
+        n_members=2,
+        percentiles=np.array([50.0]),
+        hourly_chance={"precipitation": np.array(chance)},
+        daily_chance={"precipitation": np.array([0.5])},
+        hourly_bands={"precipitation": np.zeros((1, len(hours)))},
+        daily_bands={"precipitation": np.zeros((1, 1))},
+    )
+
+
+def test_ensemble_is_fetched_on_a_worker_and_applied_later(monkeypatch):
+    hours = ["2025-06-01T09:00", "2025-06-01T10:00"]
+    monkeypatch.setattr(weather_forecast.weather_ensemble, "cached_summary", lambda *args: None)
+    monkeypatch.setattr(weather_forecast, "lookup_ensemble", lambda *args: _summary(hours, [0.2, 0.7]))
+    handed_over = []
+    fetched = threading.Event()
+
+    def on_ensemble_ready(request, summary):
+        handed_over.append((request, summary))
+        fetched.set()
+
+    weather_data = weather_forecast.WeatherData(
+        selected_date="2025-06-01", on_ensemble_ready=on_ensemble_ready
+    )
+    assert weather_data.current_ensemble() is None
+    assert fetched.wait(5)
+    # A refresh while the fetch is in flight does not start another one
+    weather_data.current_ensemble()
+    (request, summary), = handed_over
+    assert weather_data.ensemble_cache is None
+
+    weather_data.weather_cache = {
+        "Today": "2025-06-01",
+        "Hour": hours[1],
+        "Temperature": 20.0,
+        "Max Temperature of Day": 22.0,
+        "Min Temperature of Day": 12.0,
+        "Wind Speed": 5.0,
+        "Chance of Rain": 10,
+        "Cloud Cover": 30.0,
+        "Sum snowfall": 0.0,
+        "UV Index": 3.0,
+    }
+    assert weather_data.apply_ensemble(request, summary)
+    assert weather_data.weather_cache["Chance of Rain"] == 70.0
+    assert "Precipitation ☔🌧️: 70.0 %" in weather_data.weather_message
+    assert not weather_data.apply_ensemble((0.0, 0.0, "gfs_seamless"), summary)
+
+
+def test_nearby_locations_share_an_ensemble_summary(monkeypatch):
+    ensemble = weather_forecast.weather_ensemble
+    hours = ["2025-06-01T09:00"]
+    fetched = []
+
+    class Members:
+        def digest(self):
+            return "members"
+
+        def summarize(self):
+            return _summary(hours, [0.4])
+
+    def fetch_ensemble(latitude, longitude, model):
+        fetched.append((latitude, longitude))
+        return Members()
+
+    monkeypatch.setattr(ensemble, "_SUMMARIES", {})
+    monkeypatch.setattr(ensemble, "fetch_ensemble", fetch_ensemble)
+    assert ensemble.cached_summary(48.21, 16.37, "ecmwf_ifs") is None
+    ensemble.summary_for(48.21, 16.37, "ecmwf_ifs")
+    ensemble.summary_for(48.22, 16.38, "ecmwf_ifs")
+    assert fetched == [weather_historic.grid_cell(48.21, 16.37)]
+    assert ensemble.cached_summary(48.18, 16.41, "ecmwf_ifs") is not None
+
+
+def test_pending_estimate_is_shown_until_refined(monkeypatch):
+    pending = {"Fidelity": "pending", "Grid Latitude": 1.0, "Grid Longitude": 2.0}
+    monkeypatch.setattr(
+        weather_forecast.weather_anytime, "estimate_anytime", lambda *args, **kwargs: pending
+    )
+    weather_data = weather_forecast.WeatherData(
+        est_input_date=date.today().isoformat(), est_input_date_check=True
+    )
+    weather_data.est_weather_cache = weather_data.est_weather_data()
+    weather_data.update_est_message()
+    assert "Estimating" in weather_data.weather_message
+
+    assert weather_data.apply_refined_estimate(weather_data._est_request, _estimate(20.0))
+    assert "Temperature 🌡️: 20.0 °C" in weather_data.weather_message
+
+
+def test_forecast_is_recorded_off_the_live_path(monkeypatch):
+    release, recorded = threading.Event(), []
+
+    class SlowStore:
+        def record(self, weather_data, model):
+            release.wait(5)
+            recorded.append(model)
+            raise TypeError("malformed daily block")
+
+    data = {"daily": {"time": None}}
+    monkeypatch.setattr(weather_forecast, "fetch_api_data", lambda *args, **kwargs: data)
+    monkeypatch.setattr(weather_forecast.weather_forecast_store, "get_store", SlowStore)
+    assert weather_forecast.lookup_live_weather(48.2, 16.4, "ecmwf_ifs") is data
+    assert not recorded
+
+    # Joins the running write, which swallows the TypeError
+    release.set()
+    future, _ = weather_historic.background_job(
+        ("record_forecast", 48.2, 16.4, "ecmwf_ifs"), lambda: None
+    )
+    assert future.result(5) is None
+    assert recorded == ["ecmwf_ifs"]
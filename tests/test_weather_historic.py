@@ -0,0 +1,191 @@
+"""Archive-backed estimates, run against the offline client of conftest."""
+
+import threading
+from datetime import date
+
+import numpy as np
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from backend import weather_codec, weather_historic, weather_holtwinters, weather_tuning
+
+LOCATIONS = [(48.2, 16.4), (-33.9, 151.2)]
+
+
+@pytest.fixture
+def default_smoothing():
+    """Untuned parameters for every location, so neither path tunes."""
+    for latitude, longitude in LOCATIONS:
+        weather_historic.save_smoothing(
+            latitude,
+            longitude,
+            weather_tuning.SmoothingParameters.default(
+                weather_historic.TEMP_SMOOTHING, weather_historic.RAIN_SMOOTHING
+            ),
+        )
+
+
+@pytest.mark.parametrize(
+    ("utc_offset", "trailing_missing"),
+    [(0, {}), (36000, {}), (-18000, {LOCATIONS[1][0]: 3})],
+)
+def test_batch_matches_single_location(
+    fake_client, default_smoothing, utc_offset, trailing_missing
+):
+    fake_client.utc_offset = utc_offset
+    fake_client.trailing_missing = trailing_missing
+    target = date.today() + relativedelta(days=40)
+
+    batch = weather_historic.calculate_forecasts(LOCATIONS, target)
+    for (latitude, longitude), result in zip(LOCATIONS, batch):
+        single = weather_historic.calculate_forecast(latitude, longitude, target)
+        assert (result["Grid Latitude"], result["Grid Longitude"]) == (
+            single["Grid Latitude"],
+            single["Grid Longitude"],
+        )
+        # Only the codec quantization of cached archive chunks differs
+        np.testing.assert_allclose(result["Temperature"], single["Temperature"], atol=1e-3)
+        np.testing.assert_allclose(result["Rainfall"], single["Rainfall"], atol=1e-3)
+        # Both report the climatological wet-day frequency of the same years
+        np.testing.assert_allclose(result["Chance of Rain"], single["Chance of Rain"], atol=1e-3)
+
+
+def test_batch_requires_archive_data(fake_client):
+    fake_client.trailing_missing = {LOCATIONS[0][0]: 10 ** 5}
+    with pytest.raises(ValueError):
+        weather_historic.calculate_forecasts(LOCATIONS, date.today())
+
+
+def test_state_of_another_version_is_refitted(fake_client, default_smoothing):
+    latitude, longitude = weather_historic.grid_cell(*LOCATIONS[0])
+    last_updated_date = date.today() - relativedelta(days=5)
+    state, _ = weather_historic._holt_winters_state(latitude, longitude, last_updated_date)
+    path = weather_historic._state_path(latitude, longitude)
+    weather_holtwinters.save_state(
+        state, path, last_date=last_updated_date.isoformat(), refit_date="2000-01-01"
+    )
+
+    requests = len(fake_client.requests)
+    weather_historic._holt_winters_state(latitude, longitude, last_updated_date)
+    _, metadata = weather_holtwinters.load_state(path)
+    assert metadata["version"] == weather_historic.STATE_VERSION
+    assert metadata["refit_date"] == date.today().isoformat()
+    assert len(fake_client.requests) > requests
+
+
+def test_retuned_parameters_refit_in_the_background(fake_client, default_smoothing, monkeypatch):
+    latitude, longitude = weather_historic.grid_cell(*LOCATIONS[0])
+    last_updated_date = date.today() - relativedelta(days=5)
+    state, _ = weather_historic._holt_winters_state(latitude, longitude, last_updated_date)
+    tuned = weather_tuning.SmoothingParameters.default((0.05, 0.2), (0.2, 0.1))
+    weather_historic.save_smoothing(latitude, longitude, tuned)
+    jobs = []
+    monkeypatch.setattr(weather_historic, "_run_in_background", lambda *args: jobs.append(args))
+
+    requests = len(fake_client.requests)
+    served, _ = weather_historic._holt_winters_state(latitude, longitude, last_updated_date)
+    np.testing.assert_array_equal(served.alpha, state.alpha)
+    assert len(fake_client.requests) == requests
+    assert [job[0] for job in jobs] == [("refit", latitude, longitude)]
+
+    refitted, _ = jobs[0][1](*jobs[0][2:])
+    np.testing.assert_array_equal(refitted.alpha, tuned.alpha)
+    np.testing.assert_array_equal(refitted.gamma, tuned.gamma)
+
+
+def test_background_jobs_do_not_stack():
+    started = []
+    release = threading.Event()
+
+    def job(name):
+        started.append(name)
+        release.wait(5)
+
+    assert weather_historic._run_in_background(("test", 1), job, "first")
+    assert not weather_historic._run_in_background(("test", 1), job, "second")
+    assert weather_historic._run_in_background(("test", 2), job, "other")
+    release.set()
+
+
+def test_rain_risk_is_reproducible(fake_client):
+    latitude, longitude = LOCATIONS[0]
+    target = date.today() + relativedelta(days=20)
+    first = weather_historic.estimate_rain_risk(latitude, longitude, target)
+    assert weather_historic.estimate_rain_risk(latitude, longitude, target) == first
+
+    weather_historic.climatology_for(latitude, longitude)
+    cached = weather_historic.estimate_from_cache(latitude, longitude, target)
+    assert weather_historic.estimate_from_cache(latitude, longitude, target) == cached
+
+
+def test_new_cell_is_answered_from_a_tile(fake_client, monkeypatch):
+    tile_values = {
+        "temperature_2m_mean": 21.0,
+        "rain_sum": 2.0,
+        "wet_day_frequency": 0.4,
+        "heavy_rain_frequency": 0.05,
+    }
+    monkeypatch.setattr(weather_historic.weather_tiles, "lookup", lambda *args: tile_values)
+    jobs = []
+    monkeypatch.setattr(weather_historic, "_run_in_background", lambda *args: jobs.append(args))
+    latitude, longitude = LOCATIONS[0]
+    target = date.today() + relativedelta(days=30)
+
+    result = weather_historic.calculate_forecast(latitude, longitude, target)
+    assert result["Temperature"] == 21.0
+    assert not fake_client.requests
+    assert len(jobs) == 1
+
+    # Once the cell has a model the tile is no longer used
+    weather_historic.climatology_for(latitude, longitude)
+    result = weather_historic.calculate_forecast(latitude, longitude, target)
+    assert "Wind Speed" in result
+    assert [job[0][0] for job in jobs].count("forecast") == 1
+
+
+def test_conditions_are_window_medians(fake_client):
+    latitude, longitude = LOCATIONS[0]
+    target = date.today() + relativedelta(days=60)
+    climatology = weather_historic.climatology_for(latitude, longitude)
+    samples = climatology.samples(
+        "wind_speed_10m_mean", [target], weather_historic.CLIMATOLOGY_WINDOW
+    )
+
+    result = weather_historic.estimate_from_cache(latitude, longitude, target)
+    np.testing.assert_allclose(result["Wind Speed"], np.nanmedian(samples), atol=1e-3)
+    assert "UV Index" not in result
+
+
+@pytest.mark.parametrize(("depth", "years"), [("25", 25), ("all", None), ("ten", 10), ("-3", 10)])
+def test_history_years(depth, years):
+    if years is None:
+        years = date.today().year - weather_historic.ERA5_START.year + 1
+    if years == weather_historic.DEFAULT_HISTORY_YEARS:
+        with pytest.warns(UserWarning):
+            assert weather_historic._history_years(depth) == years
+    else:
+        assert weather_historic._history_years(depth) == years
+
+
+def test_block_is_assembled_from_year_files(fake_client):
+    latitude, longitude = weather_historic.grid_cell(*LOCATIONS[0])
+    variables = ["rain_sum", "temperature_2m_mean"]
+    year_paths = []
+    for year in range(2000, 2010):
+        start, end = date(year, 1, 1), date(year, 12, 31)
+        values = weather_historic._request_archive_chunk(latitude, longitude, start, end, variables)
+        year_paths.append(weather_historic._chunk_path(latitude, longitude, start, end))
+        weather_historic._save_chunk(
+            year_paths[-1], weather_codec.encode(dict(zip(variables, values)))
+        )
+    requests = len(fake_client.requests)
+
+    block = weather_historic._archive_chunk(
+        latitude, longitude, date(2000, 1, 1), date(2009, 12, 31), variables, True
+    )
+    assert len(fake_client.requests) == requests
+    assert not any(path.exists() for path in year_paths)
+    expected = weather_historic._request_archive_chunk(
+        latitude, longitude, date(2000, 1, 1), date(2009, 12, 31), variables
+    )
+    np.testing.assert_allclose(block, expected, atol=1e-4)
@@ -0,0 +1,122 @@
+"""The NumPy Holt-Winters kernel against statsmodels and against itself."""
+
+import numpy as np
+import pytest
+
+from backend import weather_historic, weather_holtwinters
+
+statsmodels = pytest.importorskip("statsmodels.api")
+holtwinters = pytest.importorskip("statsmodels.tsa.holtwinters")
+
+MONTHS = 12
+ALPHA, GAMMA = 0.2, 0.3
+
+
+@pytest.fixture(scope="module")
+def sea_temperature() -> np.ndarray:
+    """Monthly El Nino sea surface temperatures, 1950-2010."""
+    data = statsmodels.datasets.elnino.load_pandas().data
+    return data.iloc[:, 1:].to_numpy(dtype=np.float64).ravel()
+
+
+def _reference(values: np.ndarray, state: weather_holtwinters.HoltWintersState):
+    """statsmodels fit started from the same initial level and season."""
+    model = holtwinters.ExponentialSmoothing(
+        values,
+        seasonal="add",
+        seasonal_periods=MONTHS,
+        initialization_method="known",
+        initial_level=float(state.level[0]),
+        initial_seasonal=state.season[0].copy(),
+    )
+    return model.fit(smoothing_level=ALPHA, smoothing_seasonal=GAMMA, optimized=False)
+
+
+def test_one_step_predictions_match_statsmodels(sea_temperature):
+    state = weather_holtwinters.initial_state(sea_temperature, MONTHS, ALPHA, GAMMA)
+    reference = _reference(sea_temperature, state)
+
+    predictions = np.empty_like(sea_temperature)
+    for t, value in enumerate(sea_temperature):
+        predictions[t] = weather_holtwinters.forecast(state, 1)[0, 0]
+        weather_holtwinters.smooth(state, np.array([[value]]))
+
+    np.testing.assert_allclose(predictions, reference.fittedvalues, atol=1e-9)
+    np.testing.assert_allclose(state.level[0], reference.level[-1], atol=1e-9)
+    n = sea_temperature.size
+    np.testing.assert_allclose(
+        state.season[0, np.arange(n - MONTHS, n) % MONTHS], reference.season[-MONTHS:], atol=1e-9
+    )
+
+
+def test_forecast_matches_statsmodels(sea_temperature):
+    state = weather_holtwinters.fit(sea_temperature, MONTHS, ALPHA, GAMMA)
+    initial = weather_holtwinters.initial_state(sea_temperature, MONTHS, ALPHA, GAMMA)
+    reference = _reference(sea_temperature, initial).forecast(3 * MONTHS)
+
+    # statsmodels refills the future seasonal slots from the one before the last
+    # update, so only horizons on a whole number of cycles use a stale index
+    horizons = np.arange(1, 3 * MONTHS + 1)
+    off_cycle = horizons % MONTHS != 0
+    np.testing.assert_allclose(
+        weather_holtwinters.forecast(state, 3 * MONTHS)[0, off_cycle],
+        reference[off_cycle],
+        atol=1e-9,
+    )
+
+
+def test_missing_values_carry_the_state(sea_temperature):
+    train, gap = sea_temperature[:-30], 7
+    state = weather_holtwinters.fit(train, MONTHS, ALPHA, GAMMA)
+    expected = weather_holtwinters.forecast(state, gap + 5)[:, gap:]
+
+    weather_holtwinters.smooth(state, np.full((1, gap), np.nan))
+    np.testing.assert_allclose(weather_holtwinters.forecast(state, 5), expected)
+
+
+def test_batch_matches_single_series(sea_temperature):
+    values = np.stack([sea_temperature, sea_temperature[::-1]])
+    batch = weather_holtwinters.fit(values, MONTHS, alpha=[0.1, 0.3], gamma=[0.2, 0.05])
+    for row, (alpha, gamma) in enumerate([(0.1, 0.2), (0.3, 0.05)]):
+        single = weather_holtwinters.fit(values[row], MONTHS, alpha, gamma)
+        np.testing.assert_allclose(
+            weather_holtwinters.forecast(batch, 20)[row],
+            weather_holtwinters.forecast(single, 20)[0],
+        )
+
+
+def test_state_round_trip(tmp_path, sea_temperature):
+    state = weather_holtwinters.fit(sea_temperature, MONTHS, ALPHA, GAMMA)
+    path = tmp_path / "state.npz"
+    weather_holtwinters.save_state(state, path, last_date="2010-12-31")
+
+    loaded, metadata = weather_holtwinters.load_state(path)
+    assert metadata == {"last_date": "2010-12-31"}
+    assert loaded.position == state.position
+    np.testing.assert_array_equal(
+        weather_holtwinters.forecast(loaded, 30), weather_holtwinters.forecast(state, 30)
+    )
+
+
+def test_heuristic_start_close_to_estimated_start(sea_temperature):
+    """The kernel replaced a statsmodels fit that estimated its initial values.
+
+    With the temperature defaults the level is never updated (alpha 0), so the
+    start matters most. Our first-cycle start moves the two-year forecast of
+    this series by 0.003 degrees off whole cycles (0.02 on them, see
+    test_forecast_matches_statsmodels) with the same hold-out error.
+    """
+    alpha, gamma = weather_historic.TEMP_SMOOTHING
+    train, holdout = sea_temperature[:-2 * MONTHS], sea_temperature[-2 * MONTHS:]
+    state = weather_holtwinters.fit(train, MONTHS, alpha, gamma)
+    ours = weather_holtwinters.forecast(state, holdout.size)[0]
+    reference = (
+        holtwinters.ExponentialSmoothing(train, seasonal="add", seasonal_periods=MONTHS)
+        .fit(smoothing_level=alpha, smoothing_seasonal=gamma)
+        .forecast(holdout.size)
+    )
+
+    off_cycle = np.arange(1, holdout.size + 1) % MONTHS != 0
+    assert np.max(np.abs(ours - reference)[off_cycle]) < 0.01
+    assert np.max(np.abs(ours - reference)) < 0.05
+    assert np.mean(np.abs(ours - holdout)) <= np.mean(np.abs(reference - holdout)) + 0.01
@@ -0,0 +1,79 @@
+"""Hourly store decoding and range changes, without requests."""
+
+from datetime import date, datetime, timezone
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from backend import weather_hourly
+
+
+class _Variable:
+    def __init__(self, values):
+        self.values = values
+
+    def ValuesAsNumpy(self):  # noqa: N802
+        return self.values
+
+
+class _Hourly:
+    """Hourly block starting at a UTC instant."""
+
+    def __init__(self, start: datetime, n_hours: int):
+        self.start = int(start.timestamp())
+        self.values = np.arange(n_hours, dtype=np.float32)
+
+    def VariablesLength(self):  # noqa: N802
+        return 1
+
+    def Variables(self, index):  # noqa: N802
+        return _Variable(self.values)
+
+    def Time(self):  # noqa: N802
+        return self.start
+
+    def Interval(self):  # noqa: N802
+        return 3600
+
+
+def test_hours_follow_daylight_saving():
+    # Vienna leaves summer time at 01:00 UTC on 2024-10-27
+    hourly = _Hourly(datetime(2024, 10, 25, 22, tzinfo=timezone.utc), 4 * 24)
+    times, values = weather_hourly.decode_hourly(hourly, 7200, "Europe/Vienna")
+    assert times[0] == np.datetime64("2024-10-26T00", "h")
+    assert times[-1] == np.datetime64("2024-10-29T22", "h")
+    # Both 02:00 hours of the change map onto the same local hour
+    assert np.count_nonzero(times == np.datetime64("2024-10-27T02", "h")) == 2
+
+    fixed, _ = weather_hourly.decode_hourly(hourly, 7200)
+    assert fixed[-1] == np.datetime64("2024-10-29T23", "h")
+    unknown, _ = weather_hourly.decode_hourly(hourly, 7200, b"Not/AZone")
+    np.testing.assert_array_equal(unknown, fixed)
+
+
+def test_resized_store_keeps_overlapping_days(tmp_path):
+    archive = weather_hourly.HourlyArchive.create(tmp_path, date(2021, 1, 1), 365 + 365, ["x"])
+    cube = np.load(archive.path, mmap_mode="r+")
+    cube[0] = np.arange(cube.shape[1])[:, None]
+    cube.flush()
+    del cube
+    # A decade block reaching back before the store, and one year inside it
+    archive.filled = ["2020-01-01", "2022-01-01"]
+    archive.save_header()
+
+    resized = archive.resized(date(2020, 1, 1), 366 + 365 + 365)
+    assert resized.filled == ["2022-01-01"]
+    assert (resized.start, resized.n_days) == (date(2020, 1, 1), 1096)
+    assert np.isnan(resized.cube[0, :366]).all()
+    np.testing.assert_array_equal(resized.cube[0, 366:, 0], np.arange(730))
+    reopened = weather_hourly.HourlyArchive.open(tmp_path / "header.json")
+    assert reopened.filled == ["2022-01-01"] and reopened.n_days == 1096
+
+
+def test_chunks_are_years_clipped_to_the_store():
+    end = date.today() - relativedelta(days=5)
+    chunks = weather_hourly.hourly_chunks(date(2016, 3, 1), end)
+    assert chunks[0] == (date(2016, 3, 1), date(2016, 12, 31), True)
+    assert [chunk_start.year for chunk_start, _, _ in chunks] == list(range(2016, end.year + 1))
+    assert all(chunk_start.year == chunk_end.year for chunk_start, chunk_end, _ in chunks)
+    assert chunks[-1] == (date(end.year, 1, 1), end, False)
@@ -0,0 +1,29 @@
+"""Shared-memory process pool."""
+
+from datetime import date
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from backend import weather_pool
+
+
+def test_workers_read_the_shared_block():
+    archive = np.arange(2 * 2 * 5, dtype=np.float32).reshape(2, 2, 5)
+    with weather_pool.archive_pool(archive, date(2020, 1, 1), processes=2) as executor:
+        block, dates = executor.submit(weather_pool.attached_archive).result()
+    np.testing.assert_array_equal(block, archive)
+    assert dates[0] == np.datetime64("2020-01-01") and dates.size == 5
+
+
+def test_attaching_does_not_register_the_block(monkeypatch):
+    owner = shared_memory.SharedMemory(create=True, size=16)
+    registered = []
+    monkeypatch.setattr(resource_tracker, "register", lambda *args: registered.append(args))
+    try:
+        attached = weather_pool._attach_shared(owner.name)
+        attached.close()
+        assert not registered
+    finally:
+        owner.close()
+        owner.unlink()
@@ -0,0 +1,32 @@
+"""Row selection of ArchiveTable."""
+
+from datetime import date
+
+import numpy as np
+
+from backend import weather_query
+
+
+def _table() -> weather_query.ArchiveTable:
+    dates = np.arange("2019-01-01", "2021-01-01", dtype="datetime64[D]")
+    return weather_query.ArchiveTable(
+        sites=[(0.0, 0.0)],
+        dates=dates,
+        columns={"rain_sum": np.ones((1, dates.size), dtype=np.float32)},
+    )
+
+
+def _months(table, rows):
+    return set((table.dates[rows].astype("datetime64[M]").astype(np.int64) % 12 + 1).tolist())
+
+
+def test_filters_intersect():
+    table = _table()
+    assert _months(table, table.select(season="JJA")) == {6, 7, 8}
+    assert _months(table, table.select(months=[6, 9], season="JJA")) == {6}
+    assert table.select(months=[1], season="JJA").size == 0
+
+    rows = table.select(season="DJF", years=[2020], end_date=date(2020, 1, 31))
+    assert table.dates[rows][0] == np.datetime64("2020-01-01")
+    assert table.dates[rows][-1] == np.datetime64("2020-01-31")
+    assert table.select().size == table.dates.size
@@ -0,0 +1,24 @@
+"""Atomic cache writes."""
+
+import numpy as np
+import pytest
+
+from backend import weather_storage
+
+
+class Unwritable:
+    """An array-like that fails once the file is already half written."""
+
+    def __array__(self, *args, **kwargs):
+        raise RuntimeError("disk full")
+
+
+def test_failed_save_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "model.npz"
+    weather_storage.save_npz(path, values=np.arange(3))
+
+    with pytest.raises(RuntimeError):
+        weather_storage.save_npz(path, values=np.arange(5), later=Unwritable())
+    assert [item.name for item in tmp_path.iterdir()] == ["model.npz"]
+    with np.load(path) as data:
+        np.testing.assert_array_equal(data["values"], np.arange(3))
@@ -0,0 +1,104 @@
+"""Verification of stored forecasts and its per-cell cache."""
+
+import os
+import time
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from backend import weather_forecast_store, weather_historic, weather_verification
+
+FORECAST_DAYS = 16
+
+
+def _weather_data(issued: date, offset: float) -> dict:
+    """A forecast response with a daily block starting on the day it was fetched."""
+    days = [(issued + relativedelta(days=day)).isoformat() for day in range(FORECAST_DAYS)]
+    ramp = np.arange(FORECAST_DAYS, dtype=np.float64)
+    return {
+        "latitude": 48.2,
+        "longitude": 16.4,
+        "utc_offset_seconds": 0,
+        "hourly": {"time": [f"{issued.isoformat()}T00:00"], "temperature_2m": [offset]},
+        "daily": {
+            "time": days,
+            "temperature_2m_mean": list(15 + offset + ramp / 4),
+            "precipitation_sum": list(ramp % 3),
+            "precipitation_probability_max": list(10 * (ramp % 5)),
+        },
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A store holding a run every 10 days over the last 150 days."""
+    store = weather_forecast_store.ForecastStore(tmp_path / "history.sqlite")
+    for age in range(150, 0, -10):
+        issued = date.today() - relativedelta(days=age)
+        fetched_at = datetime(issued.year, issued.month, issued.day, 6, tzinfo=timezone.utc)
+        store.record(_weather_data(issued, age / 100), "ecmwf_ifs025", fetched_at)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def fetches(fake_client):
+    """Archive fetches made through weather_historic, as (start, end, variables)."""
+    calls = []
+
+    def fetch(latitude, longitude, start_date, end_date, variables):
+        calls.append((start_date, end_date, variables))
+        return weather_historic.fetch_daily_archive(
+            latitude, longitude, start_date, end_date, variables
+        )
+
+    fetch.calls = calls
+    return fetch
+
+
+def _table(scores):
+    return sorted(
+        (row["source"], row["lead"], row["Verified Days"], round(row["Temperature MAE"], 4),
+         round(row["Rainfall Bias"], 4), round(row["Rain Brier Score"], 4))
+        for row in scores.rows()
+    )
+
+
+def test_store_scores_match_uncached_and_observe_precipitation(store, fetches):
+    expected = weather_verification.verify(
+        weather_verification.ForecastSet.from_store(store), fetches
+    )
+    assert all("precipitation_sum" in variables for _, _, variables in fetches.calls)
+    assert _table(weather_verification.verify_store(store=store, fetch=fetches)) == _table(expected)
+
+
+def test_store_cache_only_rescores_provisional_days(store, fetches):
+    first = weather_verification.verify_store(store=store, fetch=fetches)
+    assert fetches.calls
+    del fetches.calls[:]
+
+    # Read back as is on the same day
+    assert _table(weather_verification.verify_store(store=store, fetch=fetches)) == _table(first)
+    assert not fetches.calls
+
+    # On a later day, only the days the archive may still revise are fetched again
+    path = weather_verification.weather_storage.cache_path("verification", "48.2000_16.4000.npz")
+    yesterday = time.time() - 86400
+    os.utime(path, (yesterday, yesterday))
+    again = weather_verification.verify_store(store=store, fetch=fetches)
+    final_before = date.today() - relativedelta(days=weather_historic.ARCHIVE_FINAL_DAYS)
+    assert fetches.calls
+    assert all(start >= final_before for start, _, _ in fetches.calls)
+    assert _table(again) == _table(first)
+
+
+def test_store_scores_filter_models_and_issue_day(store, fetches):
+    since = datetime.combine(date.today() - relativedelta(days=60), datetime.min.time())
+    scores = weather_verification.verify_store(since=since, store=store, fetch=fetches)
+    expected = weather_verification.verify(
+        weather_verification.ForecastSet.from_store(store, since=since), fetches
+    )
+    assert _table(scores) == _table(expected)
+    assert not weather_verification.verify_store(models=["gfs"], store=store, fetch=fetches).rows()